@@ -2,6 +2,8 @@
 import argparse
 import asyncio
 import json
+import os
+import re
 import sys
 import time
 from datetime import datetime
@@ -10,9 +12,16 @@ from typing import Any, Dict, List, Optional
 from src.environment.battle import BattleEnvironment
 from src.environment.research import ResearchEnvironment
 from src.logger import logger
-from src.schema import AgentState
 from src.tool.tts_tool import TTSTool
+from src.tool.financial_deep_search.http_client import http_client
+from src.tool.financial_deep_search.market_data import prefetch_market_data
+from src.agent.pool import AgentPool
 from src.agent.report import ReportAgent
+from src.config import config
+from src.utils.checkpoint import PHASES, checkpoint_store
+from src.utils.cache import data_cache, pin_cache
+from src.utils.executor import shutdown_blocking_executor
+from src.utils.single_flight import flights
 from src.utils.report_manager import report_manager
 from src.console import visualizer, clear_screen
 from rich.console import Console
@@ -25,23 +34,60 @@ class EnhancedFinGeniusAnalyzer:
     
     def __init__(self):
         self.start_time = time.time()
-        self.total_tool_calls = 0
-        self.total_llm_calls = 0
-
-    async def analyze_stock(self, stock_code: str, max_steps: int = 3, debate_rounds: int = 2) -> Dict[str, Any]:
-        """Run complete stock analysis with enhanced visualization"""
+        # Background tasks producing reports / TTS (awaited by wait_for_artifacts)
+        self._artifact_tasks: List[asyncio.Task] = []
+
+    async def analyze_stock(
+        self,
+        stock_code: str,
+        max_steps: int = 3,
+        debate_rounds: int = 2,
+        show_banner: bool = True,
+        tts: bool = False,
+        resume_from: str = "research",
+    ) -> Dict[str, Any]:
+        """Run complete stock analysis with enhanced visualization.
+
+        Results are returned once the vote is tallied; reports and the optional
+        TTS announcement keep running in the background (see wait_for_artifacts).
+        Research and battle results are checkpointed; ``resume_from`` ("battle"
+        or "report") reuses the checkpoints of the earlier phases when present.
+        """
+        started_at = time.time()
+        # Call counters of this stock's pipeline (batch workers run pipelines concurrently)
+        usage = {"tool_calls": 0, "llm_calls": 0}
+        # Specialist agents are created once and shared by research and battle
+        agent_pool = AgentPool()
         try:
             # Clear screen and show logo
-            clear_screen()
-            visualizer.show_logo()
+            if show_banner:
+                clear_screen()
+                visualizer.show_logo()
             
             # Show analysis start
             visualizer.show_section_header("开始股票分析", "🚀")
             visualizer.show_progress_update("初始化分析环境", f"目标股票: {stock_code}")
             
+            research_params = self._research_checkpoint_params(max_steps)
+            battle_params = self._battle_checkpoint_params(research_params, debate_rounds)
+            resume_index = PHASES.index(resume_from)
+
             # Research phase
             visualizer.show_section_header("研究阶段", "🔍")
-            research_results = await self._run_research_phase(stock_code, max_steps)
+            research_results = None
+            if resume_index > PHASES.index("research"):
+                research_results = checkpoint_store.load("research", stock_code, research_params)
+                if research_results:
+                    visualizer.show_progress_update("从检查点恢复研究结果", f"股票: {stock_code}")
+                else:
+                    visualizer.show_progress_update("未找到研究检查点", "重新执行研究阶段")
+
+            if not research_results:
+                research_results = await self._run_research_phase(
+                    stock_code, max_steps, agent_pool, usage
+                )
+                if research_results and "error" not in research_results:
+                    checkpoint_store.save("research", stock_code, research_results, research_params)
             
             if not research_results:
                 visualizer.show_error("研究阶段失败", "无法获取足够的分析数据")
@@ -52,20 +98,39 @@ class EnhancedFinGeniusAnalyzer:
             
             # Battle phase
             visualizer.show_section_header("专家辩论阶段", "⚔️")
-            battle_results = await self._run_battle_phase(research_results, max_steps, debate_rounds)
+            battle_results = None
+            if resume_index > PHASES.index("battle"):
+                battle_results = checkpoint_store.load("battle", stock_code, battle_params)
+                if battle_results:
+                    visualizer.show_progress_update("从检查点恢复辩论结果", f"股票: {stock_code}")
+                else:
+                    visualizer.show_progress_update("未找到辩论检查点", "重新执行辩论阶段")
+
+            if not battle_results:
+                if not len(agent_pool):
+                    # Research was restored from a checkpoint: create the experts without re-running it
+                    await ResearchEnvironment.create(max_steps=max_steps, agent_pool=agent_pool)
+                battle_results = await self._run_battle_phase(
+                    research_results, max_steps, debate_rounds, agent_pool, usage
+                )
+                if battle_results:
+                    checkpoint_store.save("battle", stock_code, battle_results, battle_params)
             
             if battle_results:
                 visualizer.show_debate_summary(battle_results)
             
-            # Generate reports
-            await self._generate_reports(stock_code, research_results, battle_results)
-            
             # Final results
-            final_results = self._prepare_final_results(stock_code, research_results, battle_results)
+            final_results = self._prepare_final_results(
+                stock_code, research_results, battle_results, usage, started_at
+            )
+
+            # Generate reports (and TTS) in the background
+            self._start_artifacts(stock_code, research_results, battle_results, final_results, tts)
             
             # Show completion
-            total_time = time.time() - self.start_time
-            visualizer.show_completion(total_time)
+            if show_banner:
+                total_time = time.time() - self.start_time
+                visualizer.show_completion(total_time)
             
             return final_results
             
@@ -73,13 +138,133 @@ class EnhancedFinGeniusAnalyzer:
             visualizer.show_error(str(e), "股票分析过程中出现错误")
             logger.error(f"Analysis failed: {str(e)}")
             return {"error": str(e), "stock_code": stock_code}
+        finally:
+            await agent_pool.close()
+
+    @staticmethod
+    def _research_checkpoint_params(max_steps: int) -> Dict[str, Any]:
+        """Settings that affect research results (hashed into the checkpoint key)"""
+        return {
+            "max_steps": max_steps,
+            "models": {name: settings.model for name, settings in config.llm.items()},
+        }
 
-    async def _run_research_phase(self, stock_code: str, max_steps: int) -> Dict[str, Any]:
+    @staticmethod
+    def _battle_checkpoint_params(research_params: Dict[str, Any], debate_rounds: int) -> Dict[str, Any]:
+        """Settings that affect battle results (hashed into the checkpoint key)"""
+        return {
+            "research": research_params,
+            "debate_rounds": debate_rounds,
+            "battle": config.battle_config.model_dump(),
+        }
+
+    async def analyze_batch(
+        self,
+        stock_codes: List[str],
+        output_path: str,
+        max_steps: int = 3,
+        debate_rounds: int = 2,
+        workers: int = 2,
+        resume_from: str = "research",
+    ) -> Dict[str, Any]:
+        """
+        Analyze a watchlist on a bounded work queue.
+
+        Market-wide data is prefetched once and pinned for the whole batch, so
+        every stock pipeline shares it. One JSONL record is appended to
+        ``output_path`` as soon as each stock finishes.
+        """
+        clear_screen()
+        visualizer.show_logo()
+        visualizer.show_section_header("批量分析", "📋")
+        visualizer.show_progress_update(
+            "初始化批量任务", f"股票数量: {len(stock_codes)}，并发流水线: {workers}"
+        )
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for index, code in enumerate(stock_codes):
+            queue.put_nowait((index, code))
+
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        write_lock = asyncio.Lock()
+        summary = {
+            "total": len(stock_codes),
+            "succeeded": 0,
+            "failed": 0,
+            "output": output_path,
+            "total_tool_calls": 0,
+            "total_llm_calls": 0,
+        }
+
+        with pin_cache(), open(output_path, "a", encoding="utf-8") as sink:
+            visualizer.show_progress_update("预取全市场数据", "板块、指数资金流、龙虎榜、大单...")
+            prefetched = await prefetch_market_data()
+            ready = sum(1 for ok in prefetched.values() if ok)
+            visualizer.show_progress_update("全市场数据就绪", f"{ready}/{len(prefetched)} 项")
+
+            async def worker(worker_id: int):
+                while True:
+                    try:
+                        index, code = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    try:
+                        visualizer.show_progress_update(
+                            f"开始分析 [{index + 1}/{len(stock_codes)}]",
+                            f"股票: {code}（流水线 {worker_id}）",
+                        )
+                        try:
+                            result = await self.analyze_stock(
+                                code,
+                                max_steps,
+                                debate_rounds,
+                                show_banner=False,
+                                resume_from=resume_from,
+                            )
+                        except Exception as e:
+                            logger.error(f"Batch analysis failed for {code}: {str(e)}")
+                            result = {"error": str(e), "stock_code": code}
+
+                        async with write_lock:
+                            sink.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+                            sink.flush()
+                            if "error" in result:
+                                summary["failed"] += 1
+                            else:
+                                summary["succeeded"] += 1
+                            summary["total_tool_calls"] += result.get("total_tool_calls", 0)
+                            summary["total_llm_calls"] += result.get("total_llm_calls", 0)
+                    finally:
+                        queue.task_done()
+
+            await asyncio.gather(
+                *(worker(worker_id) for worker_id in range(1, max(1, workers) + 1))
+            )
+
+        await self.wait_for_artifacts()
+
+        visualizer.show_progress_update(
+            "批量分析完成",
+            f"成功 {summary['succeeded']}，失败 {summary['failed']}，结果: {output_path}",
+        )
+        visualizer.show_progress_update("数据缓存命中", data_cache.summary())
+        summary["cache"] = data_cache.stats()
+        visualizer.show_completion(time.time() - self.start_time)
+        return summary
+
+    async def _run_research_phase(
+        self, stock_code: str, max_steps: int, agent_pool: AgentPool, usage: Dict[str, int]
+    ) -> Dict[str, Any]:
         """Run research phase with enhanced visualization"""
         try:
             # Create research environment
             visualizer.show_progress_update("创建研究环境")
-            research_env = await ResearchEnvironment.create(max_steps=max_steps)
+            research_env = await ResearchEnvironment.create(
+                max_steps=max_steps, agent_pool=agent_pool
+            )
             
             # Show registered agents
             agent_names = [
@@ -97,7 +282,12 @@ class EnhancedFinGeniusAnalyzer:
                     visualizer.show_progress_update(f"注册研究员", f"专家: {agent.name}")
             
             # Run research with tool call visualization
-            visualizer.show_progress_update("开始深度研究", "多专家顺序分析中（每3秒一个）...")
+            if research_env.concurrent:
+                visualizer.show_progress_update(
+                    "开始深度研究", f"多专家并发分析中（最多同时{research_env.max_concurrency}位）..."
+                )
+            else:
+                visualizer.show_progress_update("开始深度研究", "多专家顺序分析中...")
             
             # Enhance agents with visualization
             self._enhance_agents_with_visualization(research_env)
@@ -106,9 +296,9 @@ class EnhancedFinGeniusAnalyzer:
             
             # Update counters
             if hasattr(research_env, 'tool_calls'):
-                self.total_tool_calls += research_env.tool_calls
+                usage["tool_calls"] += research_env.tool_calls
             if hasattr(research_env, 'llm_calls'):
-                self.total_llm_calls += research_env.llm_calls
+                usage["llm_calls"] += research_env.llm_calls
             
             await research_env.cleanup()
             return results
@@ -117,15 +307,21 @@ class EnhancedFinGeniusAnalyzer:
             visualizer.show_error(f"研究阶段错误: {str(e)}")
             return {}
 
-    async def _run_battle_phase(self, research_results: Dict[str, Any], max_steps: int, debate_rounds: int) -> Dict[str, Any]:
+    async def _run_battle_phase(
+        self,
+        research_results: Dict[str, Any],
+        max_steps: int,
+        debate_rounds: int,
+        agent_pool: AgentPool,
+        usage: Dict[str, int],
+    ) -> Dict[str, Any]:
         """Run battle phase with enhanced visualization"""
         try:
             # Create battle environment
             visualizer.show_progress_update("创建辩论环境")
             battle_env = await BattleEnvironment.create(max_steps=max_steps, debate_rounds=debate_rounds)
             
-            # Register agents for battle
-            research_env = await ResearchEnvironment.create(max_steps=max_steps)
+            # Register the research agents (distilled research context kept) for battle
             agent_names = [
                 "sentiment_agent",
                 "risk_control_agent",
@@ -135,13 +331,9 @@ class EnhancedFinGeniusAnalyzer:
                 "big_deal_analysis_agent",
             ]
             
-            for name in agent_names:
-                agent = research_env.get_agent(name)
-                if agent:
-                    agent.current_step = 0
-                    agent.state = AgentState.IDLE
-                    battle_env.register_agent(agent)
-                    visualizer.show_progress_update(f"注册辩论专家", f"专家: {agent.name}")
+            for agent in agent_pool.checkout(agent_names):
+                battle_env.register_agent(agent)
+                visualizer.show_progress_update(f"注册辩论专家", f"专家: {agent.name}")
             
             # Enhance agents with visualization for battle
             self._enhance_battle_agents_with_visualization(battle_env)
@@ -152,11 +344,10 @@ class EnhancedFinGeniusAnalyzer:
             
             # Update counters
             if hasattr(battle_env, 'tool_calls'):
-                self.total_tool_calls += battle_env.tool_calls
+                usage["tool_calls"] += battle_env.tool_calls
             if hasattr(battle_env, 'llm_calls'):
-                self.total_llm_calls += battle_env.llm_calls
+                usage["llm_calls"] += battle_env.llm_calls
             
-            await research_env.cleanup()
             await battle_env.cleanup()
             return results
             
@@ -189,136 +380,180 @@ class EnhancedFinGeniusAnalyzer:
             
             battle_env._broadcast_message = enhanced_broadcast
 
-    async def _generate_reports(self, stock_code: str, research_result: Dict[str, Any], battle_result: Dict[str, Any]):
-        """Generate reports with progress visualization"""
+    def _start_artifacts(
+        self,
+        stock_code: str,
+        research_result: Dict[str, Any],
+        battle_result: Dict[str, Any],
+        final_results: Dict[str, Any],
+        tts: bool = False,
+    ) -> None:
+        """Start HTML report, JSON persistence and TTS as concurrent background tasks.
+
+        The caller gets its results right away; use wait_for_artifacts() as the
+        completion barrier before exiting.
+        """
+        visualizer.show_progress_update("生成分析报告", "HTML报告、JSON数据并行生成中...")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        jobs = [
+            self._generate_html_report(stock_code, research_result, battle_result, timestamp),
+            asyncio.to_thread(self._save_debate_json, stock_code, battle_result, timestamp),
+            asyncio.to_thread(self._save_vote_json, stock_code, battle_result, timestamp),
+        ]
+        if tts:
+            os.makedirs("results", exist_ok=True)
+            jobs.append(announce_result_with_tts(final_results))
+
+        self._artifact_tasks.extend(asyncio.create_task(job) for job in jobs)
+
+    async def wait_for_artifacts(self) -> None:
+        """Completion barrier: wait until all background artifact tasks have finished."""
+        if not self._artifact_tasks:
+            return
+
+        tasks, self._artifact_tasks = self._artifact_tasks, []
+        visualizer.show_progress_update("等待报告生成完成", f"剩余 {len(tasks)} 项任务")
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        failures = [result for result in results if isinstance(result, Exception)]
+        for error in failures:
+            logger.error(f"生成报告失败: {str(error)}")
+        if failures:
+            visualizer.show_error(f"{len(failures)} 项报告生成失败")
+        else:
+            visualizer.show_progress_update("报告生成完成", "所有文件已保存")
+
+    async def _generate_html_report(
+        self, stock_code: str, research_result: Dict[str, Any], battle_result: Dict[str, Any], timestamp: str
+    ) -> None:
+        """Generate the HTML report through the report agent"""
+        logger.info("生成HTML报告...")
+        report_agent = await ReportAgent.create(max_steps=3)
+        
+        # Prepare report data
+        summary = "\n\n".join([
+            f"金融专家对{stock_code}的研究结果如下：",
+            f"情感分析：{research_result.get('sentiment', '暂无数据')}",
+            f"风险分析：{research_result.get('risk', '暂无数据')}",
+            f"游资分析：{research_result.get('hot_money', '暂无数据')}",
+            f"技术面分析：{research_result.get('technical', '暂无数据')}",
+            f"筹码分析：{research_result.get('chip_analysis', '暂无数据')}",
+            f"大单异动分析：{research_result.get('big_deal', '暂无数据')}",
+            f"博弈结果：{battle_result.get('final_decision', '无结果')}",
+            f"投票统计：{battle_result.get('vote_count', {})}"
+        ])
+        
+        # Calculate vote percentages
+        bull_cnt = battle_result.get('vote_count', {}).get('bullish', 0)
+        bear_cnt = battle_result.get('vote_count', {}).get('bearish', 0)
+        total_votes = bull_cnt + bear_cnt
+        bull_pct = round(bull_cnt / total_votes * 100, 1) if total_votes else 0
+        bear_pct = round(bear_cnt / total_votes * 100, 1) if total_votes else 0
+
+        # Generate HTML report
+        html_filename = f"report_{stock_code}_{timestamp}.html"
+        html_path = f"report/{html_filename}"
+
+        html_request = f"""
+        基于股票{stock_code}的综合分析，生成一份美观的HTML报告。
+        
+        请在报告中包含以下模块，并按顺序呈现：
+        1. 标题及股票基本信息
+        2. 博弈结果与投票统计（先展示投票结论与统计）
+           • 最终结论：{battle_result.get('final_decision', '未知')}
+           • 看涨票数：{bull_cnt}（{bull_pct}%）
+           • 看跌票数：{bear_cnt}（{bear_pct}%）
+        3. 各项研究分析结果（情感、风险、游资、技术面、筹码、大单异动）
+        4. 辩论对话过程：按照时间顺序，以聊天气泡或时间线形式展示 `battle_results.debate_history` 中的发言，**必须完整呈现全部发言，不得删减省略**；清晰标注轮次、专家名称、发言内容与时间戳。
+        5. 任何你认为有助于读者理解的图表或可视化。
+        
+        重要：请确保页面最底部保留 AI 免责声明。
+        """
+        
         try:
-            visualizer.show_progress_update("生成分析报告", "创建HTML报告和JSON数据...")
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            
-            # Generate HTML report
-            logger.info("生成HTML报告...")
-            report_agent = await ReportAgent.create(max_steps=3)
-            
-            # Prepare report data
-            summary = "\n\n".join([
-                f"金融专家对{stock_code}的研究结果如下：",
-                f"情感分析：{research_result.get('sentiment', '暂无数据')}",
-                f"风险分析：{research_result.get('risk', '暂无数据')}",
-                f"游资分析：{research_result.get('hot_money', '暂无数据')}",
-                f"技术面分析：{research_result.get('technical', '暂无数据')}",
-                f"筹码分析：{research_result.get('chip_analysis', '暂无数据')}",
-                f"大单异动分析：{research_result.get('big_deal', '暂无数据')}",
-                f"博弈结果：{battle_result.get('final_decision', '无结果')}",
-                f"投票统计：{battle_result.get('vote_count', {})}"
-            ])
-            
-            # Calculate vote percentages
-            bull_cnt = battle_result.get('vote_count', {}).get('bullish', 0)
-            bear_cnt = battle_result.get('vote_count', {}).get('bearish', 0)
-            total_votes = bull_cnt + bear_cnt
-            bull_pct = round(bull_cnt / total_votes * 100, 1) if total_votes else 0
-            bear_pct = round(bear_cnt / total_votes * 100, 1) if total_votes else 0
-
-            # Generate HTML report
-            html_filename = f"report_{stock_code}_{timestamp}.html"
-            html_path = f"report/{html_filename}"
-
-            html_request = f"""
-            基于股票{stock_code}的综合分析，生成一份美观的HTML报告。
-            
-            请在报告中包含以下模块，并按顺序呈现：
-            1. 标题及股票基本信息
-            2. 博弈结果与投票统计（先展示投票结论与统计）
-               • 最终结论：{battle_result.get('final_decision', '未知')}
-               • 看涨票数：{bull_cnt}（{bull_pct}%）
-               • 看跌票数：{bear_cnt}（{bear_pct}%）
-            3. 各项研究分析结果（情感、风险、游资、技术面、筹码、大单异动）
-            4. 辩论对话过程：按照时间顺序，以聊天气泡或时间线形式展示 `battle_results.debate_history` 中的发言，**必须完整呈现全部发言，不得删减省略**；清晰标注轮次、专家名称、发言内容与时间戳。
-            5. 任何你认为有助于读者理解的图表或可视化。
-            
-            重要：请确保页面最底部保留 AI 免责声明。
-            """
-            
-            try:
-                if report_agent and report_agent.available_tools:
-                    await report_agent.available_tools.execute(
-                        name="create_html",
-                        tool_input={
-                            "request": html_request,
-                            "output_path": html_path,
-                            "data": {
-                                "stock_code": stock_code,
-                                "research_results": research_result,
-                                "battle_results": battle_result,
-                                "timestamp": timestamp
-                            }
+            if report_agent and report_agent.available_tools:
+                await report_agent.available_tools.execute(
+                    name="create_html",
+                    tool_input={
+                        "request": html_request,
+                        "output_path": html_path,
+                        "data": {
+                            "stock_code": stock_code,
+                            "research_results": research_result,
+                            "battle_results": battle_result,
+                            "timestamp": timestamp
                         }
-                    )
-                    visualizer.show_progress_update("HTML报告生成完成", f"文件: {html_path}")
-                else:
-                    logger.error("无法创建报告Agent或工具集")
-            except Exception as e:
-                logger.error(f"生成HTML报告失败: {str(e)}")
-            
-            # Save debate JSON
-            visualizer.show_progress_update("保存辩论记录", "JSON格式...")
-            debate_data = {
-                "stock_code": stock_code,
-                "timestamp": timestamp,
+                    }
+                )
+                visualizer.show_progress_update("HTML报告生成完成", f"文件: {html_path}")
+            else:
+                logger.error("无法创建报告Agent或工具集")
+        except Exception as e:
+            logger.error(f"生成HTML报告失败: {str(e)}")
+
+    def _save_debate_json(self, stock_code: str, battle_result: Dict[str, Any], timestamp: str) -> None:
+        """Save the debate dialog as JSON"""
+        visualizer.show_progress_update("保存辩论记录", "JSON格式...")
+        debate_data = {
+            "stock_code": stock_code,
+            "timestamp": timestamp,
+            "debate_rounds": battle_result.get("debate_rounds", 0),
+            "agent_order": battle_result.get("agent_order", []),
+            "debate_history": battle_result.get("debate_history", []),
+            "battle_highlights": battle_result.get("battle_highlights", [])
+        }
+        
+        report_manager.save_debate_report(
+            stock_code=stock_code,
+            debate_data=debate_data,
+            metadata={
+                "type": "debate_dialog",
                 "debate_rounds": battle_result.get("debate_rounds", 0),
-                "agent_order": battle_result.get("agent_order", []),
-                "debate_history": battle_result.get("debate_history", []),
-                "battle_highlights": battle_result.get("battle_highlights", [])
+                "participants": len(battle_result.get("agent_order", []))
             }
-            
-            report_manager.save_debate_report(
-                stock_code=stock_code,
-                debate_data=debate_data,
-                metadata={
-                    "type": "debate_dialog",
-                    "debate_rounds": battle_result.get("debate_rounds", 0),
-                    "participants": len(battle_result.get("agent_order", []))
-                }
-            )
-            
-            # Save vote results JSON
-            visualizer.show_progress_update("保存投票结果", "JSON格式...")
-            vote_data = {
-                "stock_code": stock_code,
-                "timestamp": timestamp,
+        )
+
+    def _save_vote_json(self, stock_code: str, battle_result: Dict[str, Any], timestamp: str) -> None:
+        """Save the vote results as JSON"""
+        visualizer.show_progress_update("保存投票结果", "JSON格式...")
+        vote_data = {
+            "stock_code": stock_code,
+            "timestamp": timestamp,
+            "final_decision": battle_result.get("final_decision", "No decision"),
+            "vote_count": battle_result.get("vote_count", {}),
+            "agent_order": battle_result.get("agent_order", []),
+            "vote_details": {
+                "bullish": battle_result.get("vote_count", {}).get("bullish", 0),
+                "bearish": battle_result.get("vote_count", {}).get("bearish", 0),
+                "total_agents": len(battle_result.get("agent_order", []))
+            }
+        }
+        
+        report_manager.save_vote_report(
+            stock_code=stock_code,
+            vote_data=vote_data,
+            metadata={
+                "type": "vote_results",
                 "final_decision": battle_result.get("final_decision", "No decision"),
-                "vote_count": battle_result.get("vote_count", {}),
-                "agent_order": battle_result.get("agent_order", []),
-                "vote_details": {
-                    "bullish": battle_result.get("vote_count", {}).get("bullish", 0),
-                    "bearish": battle_result.get("vote_count", {}).get("bearish", 0),
-                    "total_agents": len(battle_result.get("agent_order", []))
-                }
+                "total_votes": sum(battle_result.get("vote_count", {}).values())
             }
-            
-            report_manager.save_vote_report(
-                stock_code=stock_code,
-                vote_data=vote_data,
-                metadata={
-                    "type": "vote_results",
-                    "final_decision": battle_result.get("final_decision", "No decision"),
-                    "total_votes": sum(battle_result.get("vote_count", {}).values())
-                }
-            )
-            
-            visualizer.show_progress_update("报告生成完成", "所有文件已保存")
-            
-        except Exception as e:
-            visualizer.show_error(f"生成报告失败: {str(e)}")
-
-    def _prepare_final_results(self, stock_code: str, research_results: Dict[str, Any], battle_results: Dict[str, Any]) -> Dict[str, Any]:
+        )
+
+    def _prepare_final_results(
+        self,
+        stock_code: str,
+        research_results: Dict[str, Any],
+        battle_results: Dict[str, Any],
+        usage: Dict[str, int],
+        started_at: Optional[float] = None,
+    ) -> Dict[str, Any]:
         """Prepare final analysis results"""
         final_results = {
             "stock_code": stock_code,
-            "analysis_time": time.time() - self.start_time,
-            "total_tool_calls": self.total_tool_calls,
-            "total_llm_calls": self.total_llm_calls
+            "analysis_time": time.time() - (started_at or self.start_time),
+            "total_tool_calls": usage["tool_calls"],
+            "total_llm_calls": usage["llm_calls"]
         }
         
         # Merge research results
@@ -381,6 +616,20 @@ async def announce_result_with_tts(results: Dict[str, Any]):
         logger.error(f"语音播报失败: {str(e)}")
 
 
+def load_watchlist(path: str) -> List[str]:
+    """Read stock codes from a watchlist file (one or more per line, '#' starts a comment)."""
+    codes: List[str] = []
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            for code in re.split(r"[\s,，]+", line):
+                if code and code not in seen:
+                    seen.add(code)
+                    codes.append(code)
+    return codes
+
+
 def display_results(results: Dict[str, Any], output_format: str = "text", output_file: str | None = None):
     """Display or save research results."""
     # Handle JSON output
@@ -410,7 +659,27 @@ def display_results(results: Dict[str, Any], output_format: str = "text", output
 async def main():
     """Main entry point for the application."""
     parser = argparse.ArgumentParser(description="FinGenius Stock Research")
-    parser.add_argument("stock_code", help="Stock code to research (e.g., AAPL, MSFT)")
+    parser.add_argument(
+        "stock_code", nargs="?", help="Stock code to research (e.g., AAPL, MSFT)"
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Analyze every stock code listed in FILE and write one JSONL record per stock",
+    )
+    parser.add_argument(
+        "--batch-workers",
+        type=int,
+        default=2,
+        help="Number of stock pipelines running concurrently in batch mode (default: 2)",
+    )
+    parser.add_argument(
+        "--resume-from",
+        choices=list(PHASES),
+        default="research",
+        help="Phase to start from, reusing checkpointed results of earlier phases "
+        "for the same stock, trading day and settings (default: research)",
+    )
     parser.add_argument(
         "-f",
         "--format",
@@ -436,24 +705,44 @@ async def main():
     )
 
     args = parser.parse_args()
+    if not args.stock_code and not args.batch:
+        parser.error("either stock_code or --batch is required")
     analyzer = None
 
     try:
         # Create enhanced analyzer
         analyzer = EnhancedFinGeniusAnalyzer()
+
+        if args.batch:
+            stock_codes = load_watchlist(args.batch)
+            if not stock_codes:
+                visualizer.show_error("批量分析列表为空", args.batch)
+                return 1
+            output_path = args.output or (
+                f"results/batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+            )
+            summary = await analyzer.analyze_batch(
+                stock_codes,
+                output_path,
+                max_steps=args.max_steps,
+                debate_rounds=args.debate_rounds,
+                workers=args.batch_workers,
+                resume_from=args.resume_from,
+            )
+            return 0 if summary["failed"] == 0 else 1
         
         # Run analysis with beautiful visualization
-        results = await analyzer.analyze_stock(args.stock_code, args.max_steps, args.debate_rounds)
+        results = await analyzer.analyze_stock(
+            args.stock_code,
+            args.max_steps,
+            args.debate_rounds,
+            tts=args.tts,
+            resume_from=args.resume_from,
+        )
         
-        # Display results
+        # Display results while reports and TTS finish in the background
         display_results(results, args.format, args.output)
 
-        # TTS announcement if requested
-        if args.tts:
-            import os
-            os.makedirs("results", exist_ok=True)
-            await announce_result_with_tts(results)
-
     except KeyboardInterrupt:
         visualizer.show_error("分析被用户中断", "Ctrl+C")
         return 1
@@ -464,6 +753,8 @@ async def main():
     finally:
         # Clean up resources to prevent warnings
         if analyzer:
+            # Completion barrier for background reports / TTS
+            await analyzer.wait_for_artifacts()
             try:
                 # Force cleanup of any remaining async resources
                 import gc
@@ -473,6 +764,10 @@ async def main():
                 await asyncio.sleep(0.1)
             except:
                 pass
+        logger.info(f"数据缓存统计: {data_cache.summary()}；请求合并: {flights.summary()}")
+        # Release pooled HTTP connections
+        await http_client.close()
+        shutdown_blocking_executor()
 
     return 0
 
@@ -24,8 +24,8 @@ class BigDealAnalysisAgent(MCPAgent):
             Terminate(),
         )
     )
-    # 限制单次观察字符，防止内存过大导致 LLM 无法响应
-    max_observe: int = 10000
+    # 限制单次观察的 token 数，防止内存过大导致 LLM 无法响应
+    max_observe: int = 6000
     special_tool_names: List[str] = Field(default_factory=lambda: [Terminate().name])
 
     async def run(
@@ -24,7 +24,7 @@ class MCPAgent(ToolCallAgent):
 
     # Configuration values
     max_steps: int = Field(default=10)
-    max_observe: int = Field(default=10000)
+    max_observe: int = Field(default=4000, description="Token budget per tool observation")
     refresh_tools_interval: int = Field(
         default=5, description="Refresh tools every N steps"
     )
@@ -0,0 +1,92 @@
+import asyncio
+from typing import Dict, Iterable, List, Optional
+
+from src.agent.base import BaseAgent
+from src.agent.toolcall import ToolCallAgent
+from src.logger import logger
+from src.schema import AgentState, Message, Role
+
+
+class AgentPool:
+    """Pool of warmed-up specialist agents shared by the research and battle phases.
+
+    Agents added to the pool keep their tool / MCP connections open between runs.
+    The pool owns them and releases their resources in ``close``.
+    """
+
+    def __init__(self):
+        self._agents: Dict[str, BaseAgent] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._agents
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def add(self, agent: BaseAgent) -> None:
+        """Add an agent to the pool, keeping its connections alive across runs."""
+        if isinstance(agent, ToolCallAgent):
+            agent.keep_alive = True
+        self._agents[agent.name] = agent
+
+    def get(self, name: str) -> Optional[BaseAgent]:
+        """Get a pooled agent by name"""
+        return self._agents.get(name)
+
+    def checkout(self, names: Iterable[str]) -> List[BaseAgent]:
+        """Hand pooled agents to the next phase.
+
+        Each agent's memory is distilled to its research context and its run
+        state is reset so it can be registered into another environment.
+        """
+        agents = []
+        for name in names:
+            agent = self._agents.get(name)
+            if agent is None:
+                logger.warning(f"Agent {name} is not in the pool")
+                continue
+            removed = self.distill_memory(agent)
+            agent.current_step = 0
+            agent.state = AgentState.IDLE
+            logger.debug(f"Checked out {name} from pool ({removed} messages distilled)")
+            agents.append(agent)
+        return agents
+
+    @staticmethod
+    def distill_memory(agent: BaseAgent) -> int:
+        """Keep system context and the agent's own reasoning, drop tool payloads.
+
+        Tool results are replaced by the research report sent to every agent
+        in the next phase. Tool-call requests are kept only as plain assistant
+        text so the conversation stays valid without their tool responses.
+
+        Returns:
+            int: Number of messages removed
+        """
+        kept: List[Message] = []
+        for message in agent.memory.messages:
+            if message.role == Role.SYSTEM:
+                kept.append(message)
+            elif message.role == Role.ASSISTANT and message.content:
+                if message.tool_calls:
+                    message = Message.assistant_message(message.content)
+                kept.append(message)
+
+        removed = len(agent.memory.messages) - len(kept)
+        agent.memory.messages = kept
+        return removed
+
+    async def close(self) -> None:
+        """Release the resources of all pooled agents."""
+        agents = list(self._agents.values())
+        self._agents.clear()
+
+        cleanup_tasks = []
+        for agent in agents:
+            if isinstance(agent, ToolCallAgent):
+                agent.keep_alive = False
+            if hasattr(agent, "cleanup"):
+                cleanup_tasks.append(agent.cleanup())
+
+        if cleanup_tasks:
+            await asyncio.gather(*cleanup_tasks, return_exceptions=True)
@@ -18,6 +18,7 @@ from src.schema import (
     ToolChoice,
 )
 from src.tool import Terminate, ToolCollection
+from src.tool.base import ToolResult, serialize_output
 
 
 TOOL_CALL_REQUIRED = "Tool calls required but none provided"
@@ -46,8 +47,14 @@ class ToolCallAgent(ReActAgent):
     max_steps: int = 30
     current_step: int = 0
 
+    # Token budget for each tool observation, measured with the LLM tokenizer
     max_observe: Optional[Union[int, bool]] = None
 
+    keep_alive: bool = Field(
+        default=False,
+        description="Keep tool connections open after run; the owner (e.g. AgentPool) cleans up",
+    )
+
     async def think(self) -> bool:
         """Process current state and decide next actions using tools"""
         if self.next_step_prompt:
@@ -161,9 +168,6 @@ class ToolCallAgent(ReActAgent):
 
             result = await self.execute_tool(command)
 
-            if self.max_observe:
-                result = result[: self.max_observe]
-
             logger.info(
                 f"🎯 Tool '{command.function.name}' completed its mission! Result: {result}"
             )
@@ -207,7 +211,7 @@ class ToolCallAgent(ReActAgent):
 
                 # Format result for display
                 observation = (
-                    f"Observed output of cmd `{name}` executed:\n{str(result)}"
+                    f"Observed output of cmd `{name}` executed:\n{self._observe(result)}"
                     if result
                     else f"Cmd `{name}` completed with no output"
                 )
@@ -215,7 +219,7 @@ class ToolCallAgent(ReActAgent):
 
             # Format result for display (standard case)
             observation = (
-                f"Observed output of cmd `{name}` executed:\n{str(result)}"
+                f"Observed output of cmd `{name}` executed:\n{self._observe(result)}"
                 if result
                 else f"Cmd `{name}` completed with no output"
             )
@@ -232,6 +236,14 @@ class ToolCallAgent(ReActAgent):
             logger.exception(error_msg)
             return f"Error: {error_msg}"
 
+    def _observe(self, result: Any) -> str:
+        """Serialize a tool result compactly, fitted to the max_observe token budget"""
+        budget = None if isinstance(self.max_observe, bool) else self.max_observe
+        count_tokens = self.llm.count_tokens if self.llm else None
+        if isinstance(result, ToolResult):
+            return result.to_observation(budget, count_tokens)
+        return serialize_output(result, budget, count_tokens)
+
     async def _handle_special_tool(self, name: str, result: Any, **kwargs):
         """Handle special tool execution and state changes"""
         if not self._is_special_tool(name):
@@ -272,4 +284,5 @@ class ToolCallAgent(ReActAgent):
         try:
             return await super().run(request)
         finally:
-            await self.cleanup()
+            if not self.keep_alive:
+                await self.cleanup()
@@ -8,7 +8,7 @@ except ImportError:
     import tomli as tomllib
 
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -104,6 +104,65 @@ class TTSSettings(BaseModel):
     default_output_dir: str = Field("results", description="默认音频文件输出目录")
 
 
+class ResearchSettings(BaseModel):
+    """研究阶段执行配置"""
+
+    concurrent: bool = Field(True, description="是否并发运行各研究专家")
+    max_concurrency: int = Field(3, description="并发模式下同时运行的专家数量上限")
+    host_min_interval: float = Field(
+        0.3, description="同一上游主机两次请求之间的默认最小间隔（秒）"
+    )
+    host_intervals: Dict[str, float] = Field(
+        default_factory=dict, description="按主机覆盖的最小请求间隔（秒）"
+    )
+
+
+class BattleSettings(BaseModel):
+    """辩论阶段执行配置"""
+
+    parallel_opening: bool = Field(
+        True, description="第一轮开场陈述是否并发生成（按发言顺序依次提交）"
+    )
+    vote_concurrency: int = Field(6, description="最终投票阶段同时投票的专家数量上限")
+    vote_timeout: float = Field(120, description="每位专家最终投票的超时时间（秒）")
+    transcript_token_budget: int = Field(
+        1500, description="辩论指令中逐条保留的近期发言 token 预算，更早的发言折叠为摘要"
+    )
+
+
+class DataSettings(BaseModel):
+    """市场数据获取配置"""
+
+    market_data_ttl: float = Field(
+        300, description="全市场数据（板块、指数资金流、龙虎榜等）的共享缓存时间（秒）"
+    )
+    snapshot_interval: float = Field(
+        30, description="全市场实时行情快照的最短刷新间隔（秒）"
+    )
+    http_timeout: float = Field(15, description="东方财富接口单次请求超时时间（秒）")
+    http_pool_size: int = Field(20, description="共享 HTTP 连接池的最大连接数")
+    http_host_concurrency: int = Field(4, description="同一上游主机同时进行的请求数上限")
+    bar_refresh_interval: float = Field(
+        300, description="本地K线存储两次增量同步之间的最短间隔（秒），收盘后同步过的数据不再刷新"
+    )
+    source_timeout: float = Field(
+        60, description="工具中单个数据源每次尝试的超时时间（秒），超时后按重试次数重试"
+    )
+    blocking_workers: int = Field(
+        8, description="akshare / efinance 等同步数据接口专用线程池的线程数"
+    )
+
+
+class CacheSettings(BaseModel):
+    """分层数据缓存配置"""
+
+    memory_max_mb: float = Field(256, description="内存缓存层的容量上限（MB），超出后按LRU淘汰")
+    policies: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict,
+        description="按数据类型覆盖缓存策略，如 {quotes = {ttl = 10, max_age = 60}}",
+    )
+
+
 class MCPServerConfig(BaseModel):
     """Configuration for a single MCP server"""
 
@@ -161,6 +220,18 @@ class AppConfig(BaseModel):
     )
     mcp_config: Optional[MCPSettings] = Field(None, description="MCP configuration")
     tts_config: Optional[TTSSettings] = Field(None, description="TTS configuration")
+    research_config: Optional[ResearchSettings] = Field(
+        None, description="Research phase configuration"
+    )
+    data_config: Optional[DataSettings] = Field(
+        None, description="Market data configuration"
+    )
+    battle_config: Optional[BattleSettings] = Field(
+        None, description="Battle phase configuration"
+    )
+    cache_config: Optional[CacheSettings] = Field(
+        None, description="Data cache configuration"
+    )
 
     class Config:
         arbitrary_types_allowed = True
@@ -276,6 +347,18 @@ class Config:
             # 创建默认TTS配置
             tts_settings = TTSSettings()
 
+        research_config = raw_config.get("research", {})
+        research_settings = ResearchSettings(**research_config)
+
+        data_config = raw_config.get("data", {})
+        data_settings = DataSettings(**data_config)
+
+        battle_config = raw_config.get("battle", {})
+        battle_settings = BattleSettings(**battle_config)
+
+        cache_config = raw_config.get("cache", {})
+        cache_settings = CacheSettings(**cache_config)
+
         config_dict = {
             "llm": {
                 "default": default_settings,
@@ -288,6 +371,10 @@ class Config:
             "search_config": search_settings,
             "mcp_config": mcp_settings,
             "tts_config": tts_settings,
+            "research_config": research_settings,
+            "data_config": data_settings,
+            "battle_config": battle_settings,
+            "cache_config": cache_settings,
         }
 
         self._config = AppConfig(**config_dict)
@@ -314,6 +401,26 @@ class Config:
         """获取TTS配置"""
         return self._config.tts_config
 
+    @property
+    def research_config(self) -> ResearchSettings:
+        """获取研究阶段配置"""
+        return self._config.research_config
+
+    @property
+    def data_config(self) -> DataSettings:
+        """获取市场数据配置"""
+        return self._config.data_config
+
+    @property
+    def battle_config(self) -> BattleSettings:
+        """获取辩论阶段配置"""
+        return self._config.battle_config
+
+    @property
+    def cache_config(self) -> CacheSettings:
+        """获取数据缓存配置"""
+        return self._config.cache_config
+
     @property
     def workspace_root(self) -> Path:
         """Get the workspace root directory"""
@@ -1,12 +1,15 @@
 import asyncio
 import random
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from pydantic import BaseModel, Field, ConfigDict
 
 from src.agent.base import BaseAgent
 from src.agent.toolcall import ToolCallAgent
+from src.config import config
 from src.schema import AgentState
 from src.environment.base import BaseEnvironment
+from src.environment.transcript import DebateTranscript
+from src.llm import LLM
 from src.logger import logger
 from src.prompt.battle import (
     EVENT_TYPES,
@@ -173,6 +176,24 @@ class BattleEnvironment(BaseEnvironment):
     tools: Dict[str, BaseTool] = Field(default_factory=dict)
     max_steps: int = Field(default=3, description="Maximum steps for each agent")
     debate_rounds: int = Field(default=2, description="Number of debate rounds")
+    parallel_opening: bool = Field(
+        default_factory=lambda: config.battle_config.parallel_opening,
+        description="Generate round-one opening statements concurrently",
+    )
+    vote_concurrency: int = Field(
+        default_factory=lambda: config.battle_config.vote_concurrency,
+        description="Maximum number of agents voting at the same time",
+    )
+    vote_timeout: float = Field(
+        default_factory=lambda: config.battle_config.vote_timeout,
+        description="Seconds each agent has to cast its final vote",
+    )
+    transcript: DebateTranscript = Field(
+        default_factory=DebateTranscript,
+        description="Incremental transcript used to build debate instructions",
+    )
+    # 并发发言期间缓存的发言/投票 {agent_id: [(event_type, payload), ...]}，为 None 时立即提交
+    pending_actions: Optional[Dict[str, List[Tuple[str, str]]]] = Field(default=None)
     tool_calls: int = Field(default=0, description="Total number of tool calls")
     llm_calls: int = Field(default=0, description="Total number of LLM calls")
 
@@ -180,6 +201,10 @@ class BattleEnvironment(BaseEnvironment):
         """Initialize the battle environment"""
         await super().initialize()
         self.state = BattleState()
+        self.transcript = DebateTranscript(
+            token_budget=config.battle_config.transcript_token_budget,
+            count_tokens=LLM().count_tokens,
+        )
         logger.info(f"Battle environment initialized (max_steps={self.max_steps})")
 
     def register_agent(self, agent: BaseAgent) -> None:
@@ -238,6 +263,15 @@ class BattleEnvironment(BaseEnvironment):
         if not self.state.can_agent_speak(agent_id):
             return ToolResult(error=self._get_error_message(agent_id, "speak"))
 
+        if self.pending_actions is not None:
+            self.pending_actions.setdefault(agent_id, []).append((EVENT_TYPES["speak"], content))
+        else:
+            await self._commit_speak(agent_id, content)
+
+        return ToolResult(output=f"Message sent: {content}")
+
+    async def _commit_speak(self, agent_id: str, content: str) -> None:
+        """Record a speech in the battle history and broadcast it."""
         event = self.state.add_event(EVENT_TYPES["speak"], agent_id, content=content)
         self.state.add_highlight(event["agent_name"], content)
         
@@ -250,11 +284,10 @@ class BattleEnvironment(BaseEnvironment):
             "agent_id": agent_id
         }
         self.state.debate_history.append(debate_entry)
+        self.transcript.append(event["agent_name"], content)
         
         await self._broadcast_message(agent_id, content, EVENT_TYPES["speak"])
 
-        return ToolResult(output=f"Message sent: {content}")
-
     async def handle_vote(self, agent_id: str, vote: str) -> ToolResult:
         """Handle agent voting."""
         self.tool_calls += 1
@@ -268,11 +301,30 @@ class BattleEnvironment(BaseEnvironment):
 
         # 传递当前轮次信息
         current_round = getattr(self.state, 'current_round', 0)
+        if self.pending_actions is not None:
+            self.pending_actions.setdefault(agent_id, []).append((EVENT_TYPES["vote"], vote))
+        else:
+            await self._commit_vote(agent_id, vote)
+
+        return ToolResult(output=f"Vote recorded: {vote} for Round {current_round}")
+
+    async def _commit_vote(self, agent_id: str, vote: str) -> None:
+        """Record a vote for the current round and broadcast it."""
+        current_round = getattr(self.state, 'current_round', 0)
         self.state.record_vote(agent_id, vote, current_round)
+        self.transcript.record_vote(self.state.active_agents.get(agent_id, agent_id), vote)
         self.state.add_event(EVENT_TYPES["vote"], agent_id, vote=vote, round=current_round)
         await self._broadcast_message(agent_id, f"voted {vote} (Round {current_round})", EVENT_TYPES["vote"])
 
-        return ToolResult(output=f"Vote recorded: {vote} for Round {current_round}")
+    async def _commit_pending_actions(self) -> None:
+        """Commit buffered speeches and votes in the configured speaking order."""
+        pending, self.pending_actions = self.pending_actions or {}, None
+        for agent_id in self.state.agent_order:
+            for event_type, payload in pending.get(agent_id, []):
+                if event_type == EVENT_TYPES["speak"]:
+                    await self._commit_speak(agent_id, payload)
+                else:
+                    await self._commit_vote(agent_id, payload)
 
     async def cleanup(self) -> None:
         """Clean up battle resources"""
@@ -357,6 +409,11 @@ class BattleEnvironment(BaseEnvironment):
         for round_num in range(self.debate_rounds):
             self.state.current_round = round_num + 1
             logger.info(f"🗣️ Starting debate round {round_num + 1}/{self.debate_rounds}")
+
+            # 开场陈述只依赖各自的研究结果，可以并发生成
+            if round_num == 0 and self.parallel_opening:
+                await self._run_parallel_opening(round_num)
+                continue
             
             # Run debate round with each agent speaking once
             for speaker_index, agent_id in enumerate(self.state.agent_order):
@@ -374,16 +431,55 @@ class BattleEnvironment(BaseEnvironment):
                 # 执行单个专家的发言轮次 (限制步数为1)
                 await self._run_single_agent_debate_turn(agent_id)
     
-    async def _send_debate_instruction(self, current_agent_id: str, speaker_index: int, round_num: int) -> None:
-        """Send specific debate instruction to current speaker."""
-        # 构建前面发言的总结
-        previous_speeches = []
-        for event in self.state.battle_history:
-            if event.get("type") == "speak":
-                speaker_name = event.get("agent_name", "Unknown")
-                content = event.get("content", "")
-                if content:
-                    previous_speeches.append(f"**{speaker_name}**: {content[:200]}...")
+    async def _run_parallel_opening(self, round_num: int) -> None:
+        """Generate opening statements concurrently and commit them in agent_order."""
+        speakers = [
+            (speaker_index, agent_id)
+            for speaker_index, agent_id in enumerate(self.state.agent_order)
+            if self.state.can_agent_speak(agent_id)
+        ]
+        logger.info(f"📢 Generating {len(speakers)} opening statements concurrently")
+
+        for speaker_index, agent_id in speakers:
+            await self._send_debate_instruction(agent_id, speaker_index, round_num, opening=True)
+
+        # 发言与投票先缓存，全部生成后再按发言顺序写入历史并广播
+        self.pending_actions = {}
+        try:
+            await asyncio.gather(
+                *(self._run_single_agent_debate_turn(agent_id) for _, agent_id in speakers)
+            )
+        finally:
+            await self._commit_pending_actions()
+
+    async def _send_debate_instruction(
+        self, current_agent_id: str, speaker_index: int, round_num: int, opening: bool = False
+    ) -> None:
+        """Send specific debate instruction to current speaker.
+
+        With ``opening`` the speaker is one of several generating statements
+        concurrently, so the instruction asks for an independent opening
+        statement without speaker order or rebuttals.
+        """
+        if opening:
+            debate_instruction = "\n".join([
+                f"# 🎯 第{round_num + 1}轮辩论：独立开场陈述",
+                "",
+                "**所有专家同时独立发表开场陈述，你看不到其他专家的发言。你的任务：**",
+                "1. 立即使用Battle.speak发表你的观点（看涨或看跌）",
+                "2. 引用研究阶段的具体数据支持你的立场",
+                "3. 发言后请立即投票（Battle.vote）- 你可以在每轮都投票！",
+                "",
+                "💡 **动态投票机制**：你的每次投票都会覆盖之前的投票，最终以最后一次投票为准。",
+                "⚠️ **严禁行为**：不要再做深度分析，直接基于已有数据发言！",
+                "",
+                "## 🗣️ 请独立表明立场：看涨还是看跌，并给出核心理由。",
+            ])
+            self._deliver_debate_instruction(current_agent_id, debate_instruction, round_num, speaker_index)
+            return
+
+        # 该专家上次发言后其他专家的新动态（过长时为压缩摘要）
+        previous_speeches = self.transcript.unseen(current_agent_id)
         
         # 构建辩论指导
         context_parts = [
@@ -406,11 +502,13 @@ class BattleEnvironment(BaseEnvironment):
                 "## 📋 前面专家的观点：",
                 ""
             ])
-            context_parts.extend(previous_speeches)
+            context_parts.append(previous_speeches)
             context_parts.extend([
                 "",
                 "## 🗣️ 现在轮到你发言，请立即表态并说出理由！"
             ])
+        elif len(self.transcript):
+            context_parts.append("## 🗣️ 现在轮到你发言，请立即表态并说出理由！")
         else:
             context_parts.extend([
                 "## 🗣️ 你是第一位发言者，请率先表明立场！",
@@ -418,7 +516,12 @@ class BattleEnvironment(BaseEnvironment):
             ])
         
         debate_instruction = "\n".join(context_parts)
-        
+        self._deliver_debate_instruction(current_agent_id, debate_instruction, round_num, speaker_index)
+
+    def _deliver_debate_instruction(
+        self, current_agent_id: str, debate_instruction: str, round_num: int, speaker_index: int
+    ) -> None:
+        """Add the debate instruction to the speaker's memory."""
         # 发送给当前发言的agent
         if current_agent_id in self.agents:
             agent = self.agents[current_agent_id]
@@ -462,7 +565,12 @@ class BattleEnvironment(BaseEnvironment):
         agent.max_steps = original_max_steps
 
     async def _run_final_voting(self) -> None:
-        """Run final voting phase."""
+        """Run final voting phase.
+
+        Voters run concurrently (bounded by vote_concurrency, each limited by
+        vote_timeout). Their votes are buffered and tallied in agent_order once
+        every voter has resolved, so the result does not depend on timing.
+        """
         logger.info("🗳️ Starting final voting phase")
         
         # 获取所有应该投票的分析师
@@ -482,23 +590,33 @@ class BattleEnvironment(BaseEnvironment):
                 logger.info(f"✅ {agent_id} has final vote: {self.state.final_votes[agent_id]} - allowing update")
             else:
                 logger.info(f"🗳️ {agent_id} needs to cast final vote")
-            
-            logger.info(f"🗳️ Requesting vote from {agent_id}")
             await self._send_voting_instruction(agent_id)
-            await self._run_single_agent_voting_turn(agent_id)
+
+        semaphore = asyncio.Semaphore(max(1, self.vote_concurrency))
+
+        async def vote_limited(agent_id: str) -> None:
+            async with semaphore:
+                logger.info(f"🗳️ Requesting vote from {agent_id}")
+                try:
+                    await asyncio.wait_for(
+                        self._run_single_agent_voting_turn(agent_id), timeout=self.vote_timeout
+                    )
+                except asyncio.TimeoutError:
+                    logger.error(f"⏰ {agent_id} did not vote within {self.vote_timeout}s")
+
+        # 投票先缓存，全部完成后再按发言顺序统一计票
+        self.pending_actions = {}
+        try:
+            await asyncio.gather(*(vote_limited(agent_id) for agent_id in eligible_voters))
+        finally:
+            await self._commit_pending_actions()
         
         # 最终验证：确保所有合格的分析师都投了票
-        missing_votes = []
         for agent_id in eligible_voters:
             if agent_id not in self.state.final_votes:
-                missing_votes.append(agent_id)
-        
-        if missing_votes:
-            logger.error(f"❌ CRITICAL: Missing votes after voting phase: {missing_votes}")
-            # 对缺失投票的分析师进行最后一次尝试
-            for agent_id in missing_votes:
-                logger.warning(f"🔄 Final attempt to get vote from {agent_id}")
-                await self._run_single_agent_voting_turn(agent_id)
+                logger.error(f"❌ {agent_id} failed to vote after all attempts")
+                logger.warning(f"🔧 Setting default 'bearish' vote for {agent_id} to ensure participation")
+                self.state.record_vote(agent_id, "bearish", self.state.current_round)
         
         logger.info(f"✅ Final voting phase completed. Total votes: {len(self.state.final_votes)}")
 
@@ -522,6 +640,11 @@ class BattleEnvironment(BaseEnvironment):
 ⚠️ 不要再分析，直接投票！
         """
         
+        # 先补充该专家尚未看到的辩论动态
+        updates = self.transcript.unseen(agent_id)
+        if updates:
+            voting_instruction = f"## 📋 其他专家的最新动态：\n{updates}\n{voting_instruction}"
+
         if agent_id in self.agents:
             agent = self.agents[agent_id]
             if isinstance(agent, ToolCallAgent):
@@ -529,49 +652,46 @@ class BattleEnvironment(BaseEnvironment):
                 self.llm_calls += 1
                 logger.info(f"📮 Sent voting instruction to {agent_id}")
 
-    async def _run_single_agent_voting_turn(self, agent_id: str) -> None:
-        """Run a single agent's voting turn with enhanced retry mechanism."""
+    def _has_voted(self, agent_id: str) -> bool:
+        """Whether the agent has a recorded or buffered vote"""
+        if agent_id in self.state.final_votes:
+            return True
+        pending = (self.pending_actions or {}).get(agent_id, [])
+        return any(event_type == EVENT_TYPES["vote"] for event_type, _ in pending)
+
+    async def _run_single_agent_voting_turn(self, agent_id: str) -> bool:
+        """Run a single agent's voting turn with retries; return whether a vote was cast."""
         if agent_id not in self.agents:
             logger.error(f"❌ Agent {agent_id} not found in agents")
-            return
+            return False
         
         agent = self.agents[agent_id]
         original_max_steps = agent.max_steps
         max_retries = 5  # 增加重试次数，确保投票成功
         
-        for attempt in range(max_retries + 1):
-            try:
-                # 限制步数为2，给agent更多机会
-                agent.max_steps = 2
-                agent.current_step = 0
-                agent.state = AgentState.IDLE
-                
-                logger.info(f"🗳️ {agent_id} voting (attempt {attempt + 1}/{max_retries + 1})...")
-                result = await agent.run("请立即投票！")
-                
-                # 检查是否成功投票（使用新的final_votes机制）
-                if agent_id in self.state.final_votes:
-                    logger.info(f"✅ {agent_id} successfully voted: {self.state.final_votes[agent_id]}")
-                    break
-                else:
+        try:
+            for attempt in range(max_retries + 1):
+                try:
+                    # 限制步数为2，给agent更多机会
+                    agent.max_steps = 2
+                    agent.current_step = 0
+                    agent.state = AgentState.IDLE
+                    
+                    logger.info(f"🗳️ {agent_id} voting (attempt {attempt + 1}/{max_retries + 1})...")
+                    await agent.run("请立即投票！")
+                    
+                    if self._has_voted(agent_id):
+                        logger.info(f"✅ {agent_id} successfully voted")
+                        return True
                     logger.warning(f"⚠️ {agent_id} completed run but no vote recorded")
-                    if attempt == max_retries:
-                        logger.error(f"❌ {agent_id} failed to vote after all attempts")
-                        # 最后一次尝试：直接设置默认投票
-                        logger.warning(f"🔧 Setting default 'bearish' vote for {agent_id} to ensure participation")
-                        self.state.record_vote(agent_id, "bearish", self.state.current_round)
-                
-            except Exception as e:
-                logger.error(f"❌ Error in {agent_id} voting (attempt {attempt + 1}): {str(e)}")
-                if attempt == max_retries:
-                    logger.error(f"❌ {agent_id} failed all voting attempts")
-                    # 最后一次尝试：直接设置默认投票
-                    logger.warning(f"🔧 Setting default 'bearish' vote for {agent_id} due to persistent errors")
-                    self.state.record_vote(agent_id, "bearish", self.state.current_round)
-                else:
-                    logger.info(f"🔄 Retrying {agent_id} voting...")
-        
-        agent.max_steps = original_max_steps
+                    
+                except Exception as e:
+                    logger.error(f"❌ Error in {agent_id} voting (attempt {attempt + 1}): {str(e)}")
+                    if attempt < max_retries:
+                        logger.info(f"🔄 Retrying {agent_id} voting...")
+            return False
+        finally:
+            agent.max_steps = original_max_steps
     
     def _validate_final_voting(self) -> None:
         """验证最终投票统计的正确性"""
@@ -653,14 +773,14 @@ class BattleEnvironment(BaseEnvironment):
         }
 
     async def _broadcast_message(self, sender_id: str, content: str, event_type: str) -> None:
-        """Broadcast message to all active agents."""
+        """Broadcast message to all active agents.
+
+        The message is published once to the shared transcript; each agent
+        receives the part it has not seen with its next instruction.
+        """
         message = get_broadcast_message(
             sender_name=self.state.active_agents[sender_id],
             content=content,
             action_type=event_type,
         )
-        
-        for agent_id, agent in self.agents.items():
-            if agent_id != sender_id and isinstance(agent, ToolCallAgent):
-                agent.update_memory("user", message)
-                self.llm_calls += 1
+        self.transcript.publish(sender_id, message)
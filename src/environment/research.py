@@ -1,5 +1,5 @@
 import asyncio
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 from pydantic import Field
 
@@ -9,6 +9,8 @@ from src.agent.risk_control import RiskControlAgent
 from src.agent.sentiment import SentimentAgent
 from src.agent.technical_analysis import TechnicalAnalysisAgent
 from src.agent.big_deal_analysis import BigDealAnalysisAgent
+from src.agent.pool import AgentPool
+from src.config import config
 from src.environment.base import BaseEnvironment
 from src.logger import logger
 from src.schema import Message
@@ -23,6 +25,18 @@ class ResearchEnvironment(BaseEnvironment):
     description: str = Field(default="Environment for comprehensive stock research")
     results: Dict[str, Any] = Field(default_factory=dict)
     max_steps: int = Field(default=3, description="Maximum steps for each agent")
+    concurrent: bool = Field(
+        default_factory=lambda: config.research_config.concurrent,
+        description="Run specialist agents concurrently instead of one by one",
+    )
+    max_concurrency: int = Field(
+        default_factory=lambda: config.research_config.max_concurrency,
+        description="Maximum number of specialist agents running at the same time",
+    )
+    agent_pool: Optional[AgentPool] = Field(
+        default=None,
+        description="Pool that owns the specialist agents so later phases can reuse them",
+    )
 
     # Analysis mapping for agent roles
     analysis_mapping: Dict[str, str] = Field(
@@ -40,18 +54,22 @@ class ResearchEnvironment(BaseEnvironment):
         """Initialize the research environment with specialized agents."""
         await super().initialize()
 
-        # Create specialized analysis agents
-        specialized_agents = {
-            "sentiment_agent": await SentimentAgent.create(max_steps=self.max_steps),
-            "risk_control_agent": await RiskControlAgent.create(max_steps=self.max_steps),
-            "hot_money_agent": await HotMoneyAgent.create(max_steps=self.max_steps),
-            "technical_analysis_agent": await TechnicalAnalysisAgent.create(max_steps=self.max_steps),
-            "chip_analysis_agent": await ChipAnalysisAgent.create(max_steps=self.max_steps),
-            "big_deal_analysis_agent": await BigDealAnalysisAgent.create(max_steps=self.max_steps),
+        # Create specialized analysis agents (reusing pooled ones when available)
+        agent_classes = {
+            "sentiment_agent": SentimentAgent,
+            "risk_control_agent": RiskControlAgent,
+            "hot_money_agent": HotMoneyAgent,
+            "technical_analysis_agent": TechnicalAnalysisAgent,
+            "chip_analysis_agent": ChipAnalysisAgent,
+            "big_deal_analysis_agent": BigDealAnalysisAgent,
         }
 
-        # Register all agents
-        for agent in specialized_agents.values():
+        for agent_key, agent_class in agent_classes.items():
+            agent = self.agent_pool.get(agent_key) if self.agent_pool else None
+            if agent is None:
+                agent = await agent_class.create(max_steps=self.max_steps)
+                if self.agent_pool:
+                    self.agent_pool.add(agent)
             self.register_agent(agent)
 
         logger.info(f"Research environment initialized with 6 specialist agents (max_steps={self.max_steps})")
@@ -83,49 +101,15 @@ class ResearchEnvironment(BaseEnvironment):
                         )
                         logger.info(f"Added basic stock info to {agent_key}'s context")
 
-            # Run analysis tasks sequentially with 3-second intervals
-            results = {}
-            agent_count = 0
-            total_agents = len([k for k in self.analysis_mapping.keys() if k in self.agents])
-            
             # Import visualizer for progress display
             try:
                 from src.console import visualizer
-                show_visual = True
             except:
-                show_visual = False
-            
-            for agent_key, result_key in self.analysis_mapping.items():
-                if agent_key not in self.agents:
-                    continue
-                    
-                agent_count += 1
-                logger.info(f"🔄 Starting analysis with {agent_key} ({agent_count}/{total_agents})")
-                
-                # Show agent starting in terminal
-                if show_visual:
-                    visualizer.show_agent_starting(agent_key, agent_count, total_agents)
-                
-                try:
-                    # Run individual agent
-                    result = await self.agents[agent_key].run(stock_code)
-                    results[result_key] = result
-                    logger.info(f"✅ Completed analysis with {agent_key}")
-                    
-                    # Show agent completion in terminal
-                    if show_visual:
-                        visualizer.show_agent_completed(agent_key, agent_count, total_agents)
-                    
-                    # Wait 3 seconds before next agent (except for the last one)
-                    if agent_count < total_agents:
-                        logger.info(f"⏳ Waiting 3 seconds before next agent...")
-                        if show_visual:
-                            visualizer.show_waiting_next_agent(3)
-                        await asyncio.sleep(3)
-                        
-                except Exception as e:
-                    logger.error(f"❌ Error with {agent_key}: {str(e)}")
-                    results[result_key] = f"Error: {str(e)}"
+                visualizer = None
+
+            agent_keys = [k for k in self.analysis_mapping.keys() if k in self.agents]
+            run_agents = self._run_concurrent if self.concurrent else self._run_sequential
+            results = await run_agents(stock_code, agent_keys, visualizer)
 
             if not results:
                 return {
@@ -145,8 +129,81 @@ class ResearchEnvironment(BaseEnvironment):
             logger.error(f"Error in research: {str(e)}")
             return {"error": str(e), "stock_code": stock_code}
 
+    async def _run_agent(self, agent_key: str, stock_code: str) -> Any:
+        """Run a single specialist agent, converting failures into an error string."""
+        try:
+            result = await self.agents[agent_key].run(stock_code)
+            logger.info(f"✅ Completed analysis with {agent_key}")
+            return result
+        except Exception as e:
+            logger.error(f"❌ Error with {agent_key}: {str(e)}")
+            return f"Error: {str(e)}"
+
+    async def _run_sequential(
+        self, stock_code: str, agent_keys: List[str], visualizer=None
+    ) -> Dict[str, Any]:
+        """Run specialist agents one after another.
+
+        Upstream request pacing is handled by the per-host rate limiter, so no
+        fixed pause is inserted between agents.
+        """
+        results = {}
+        total_agents = len(agent_keys)
+
+        for agent_count, agent_key in enumerate(agent_keys, start=1):
+            logger.info(f"🔄 Starting analysis with {agent_key} ({agent_count}/{total_agents})")
+            if visualizer:
+                visualizer.show_agent_starting(agent_key, agent_count, total_agents)
+
+            results[self.analysis_mapping[agent_key]] = await self._run_agent(agent_key, stock_code)
+
+            if visualizer:
+                visualizer.show_agent_completed(agent_key, agent_count, total_agents)
+
+        return results
+
+    async def _run_concurrent(
+        self, stock_code: str, agent_keys: List[str], visualizer=None
+    ) -> Dict[str, Any]:
+        """Run specialist agents as tasks under a concurrency limit.
+
+        Results are reported to the visualizer in completion order and returned
+        in the configured analysis order.
+        """
+        total_agents = len(agent_keys)
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        started = 0
+
+        async def run_limited(agent_key: str) -> Tuple[str, Any]:
+            nonlocal started
+            async with semaphore:
+                started += 1
+                logger.info(f"🔄 Starting analysis with {agent_key} ({started}/{total_agents})")
+                if visualizer:
+                    visualizer.show_agent_starting(agent_key, started, total_agents)
+                return agent_key, await self._run_agent(agent_key, stock_code)
+
+        tasks = [asyncio.create_task(run_limited(agent_key)) for agent_key in agent_keys]
+
+        finished = {}
+        for completed, next_done in enumerate(asyncio.as_completed(tasks), start=1):
+            agent_key, result = await next_done
+            finished[agent_key] = result
+            if visualizer:
+                visualizer.show_agent_completed(agent_key, completed, total_agents)
+
+        return {
+            self.analysis_mapping[agent_key]: finished[agent_key]
+            for agent_key in agent_keys
+            if agent_key in finished
+        }
+
     async def cleanup(self) -> None:
-        """Clean up all agent resources."""
+        """Clean up all agent resources (pooled agents are released by their pool)."""
+        if self.agent_pool:
+            await super().cleanup()
+            return
+
         cleanup_tasks = [
             agent.cleanup()
             for agent in self.agents.values()
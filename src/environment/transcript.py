@@ -0,0 +1,123 @@
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token estimate used when no tokenizer is supplied (about one token per CJK char)."""
+    return len(text)
+
+
+class DebateTranscript:
+    """Shared debate transcript used to build speaker instructions.
+
+    Each speech is appended exactly once. Recent speeches are kept verbatim
+    (truncated to ``snippet_chars``) within ``token_budget``; older ones are
+    folded into a rolling per-speaker summary. The rendered block is cached
+    until the next append, so building an instruction does not rescan the
+    battle history.
+
+    Broadcast events (speeches and votes) are kept once in a shared log that
+    agents read through per-agent cursors: ``unseen`` returns only what an
+    agent has not seen yet, or a compacted digest when that exceeds the budget.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 1500,
+        snippet_chars: int = 200,
+        summary_chars: int = 60,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ):
+        self.token_budget = token_budget
+        self.snippet_chars = snippet_chars
+        self.summary_chars = summary_chars
+        self._count_tokens = count_tokens or _estimate_tokens
+
+        # (speaker, content, rendered line, tokens)
+        self._recent: Deque[Tuple[str, str, str, int]] = deque()
+        self._recent_tokens = 0
+        # speaker -> (folded speech count, latest folded point)
+        self._summary: Dict[str, Tuple[int, str]] = {}
+        self._rendered: Optional[str] = None
+        self.speech_count = 0
+
+        # Shared broadcast log: (sender_id, message) plus running token totals
+        self._log: List[Tuple[str, str]] = []
+        self._log_tokens: List[int] = [0]
+        self._cursors: Dict[str, int] = {}
+        # speaker -> latest vote
+        self._votes: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return self.speech_count
+
+    def append(self, speaker: str, content: str) -> None:
+        """Append one speech, folding the oldest ones when over budget."""
+        if not content:
+            return
+
+        line = f"**{speaker}**: {content[:self.snippet_chars]}..."
+        tokens = self._count_tokens(line)
+        self._recent.append((speaker, content, line, tokens))
+        self._recent_tokens += tokens
+
+        # Always keep the latest speech verbatim
+        while self._recent_tokens > self.token_budget and len(self._recent) > 1:
+            old_speaker, old_content, _, old_tokens = self._recent.popleft()
+            self._recent_tokens -= old_tokens
+            count, _ = self._summary.get(old_speaker, (0, ""))
+            self._summary[old_speaker] = (count + 1, old_content[:self.summary_chars])
+
+        self.speech_count += 1
+        self._rendered = None
+
+    def render(self) -> str:
+        """Render the previous-speeches block (empty string when nobody has spoken)."""
+        if self._rendered is None:
+            parts = []
+            if self._summary:
+                parts.append("### 早前发言摘要")
+                parts.extend(
+                    f"- **{speaker}**（此前{count}次发言）最近观点: {point}..."
+                    for speaker, (count, point) in self._summary.items()
+                )
+                parts.extend(["", "### 最近发言"])
+            parts.extend(line for _, _, line, _ in self._recent)
+            self._rendered = "\n".join(parts)
+        return self._rendered
+
+    def record_vote(self, speaker: str, vote: str) -> None:
+        """Remember a speaker's latest vote for compacted digests."""
+        self._votes[speaker] = vote
+
+    def publish(self, sender_id: str, message: str) -> None:
+        """Add a broadcast message to the shared log."""
+        self._log.append((sender_id, message))
+        self._log_tokens.append(self._log_tokens[-1] + self._count_tokens(message))
+
+    def digest(self) -> str:
+        """Compacted view of the whole debate: speech summary plus latest votes."""
+        parts = [self.render()]
+        if self._votes:
+            votes = ", ".join(f"{speaker}: {vote}" for speaker, vote in self._votes.items())
+            parts.append(f"### 最新投票\n{votes}")
+        return "\n\n".join(part for part in parts if part)
+
+    def unseen(self, agent_id: str) -> str:
+        """Return broadcasts the agent has not read yet and advance its cursor.
+
+        Messages sent by the agent itself are skipped. When the unseen part is
+        larger than the token budget, the compacted digest is returned instead.
+        """
+        start = self._cursors.get(agent_id, 0)
+        end = len(self._log)
+        self._cursors[agent_id] = end
+        if start >= end:
+            return ""
+
+        if self._log_tokens[end] - self._log_tokens[start] > self.token_budget:
+            return self.digest()
+
+        return "\n".join(
+            message for sender_id, message in self._log[start:end] if sender_id != agent_id
+        )
@@ -1,7 +1,6 @@
 import argparse
 import asyncio
 import atexit
-import json
 import logging
 import sys
 from inspect import Parameter, Signature
@@ -18,6 +17,7 @@ from mcp.server import FastMCP, Server
 from mcp.server.sse import SseServerTransport
 from src.logger import logger
 from src.tool import BaseTool, Terminate
+from src.tool.base import serialize_output
 
 
 logging.basicConfig(level=logging.INFO, handlers=[logging.StreamHandler(sys.stderr)])
@@ -54,11 +54,9 @@ class MCPServer:
 
             logger.info(f"Result of {tool_name}: {result}")
 
-            # Handle different types of results (match original logic)
-            if hasattr(result, "model_dump"):
-                return json.dumps(result.model_dump())
-            elif isinstance(result, dict):
-                return json.dumps(result)
+            # Structured results are sent as compact JSON (tables column-wise)
+            if hasattr(result, "model_dump") or isinstance(result, dict):
+                return serialize_output(result)
             return result
 
         # Set method metadata
@@ -1,11 +1,177 @@
+import json
+import math
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
 
 from pydantic import BaseModel, Field
-import time
-import logging
-from datetime import datetime
-from typing import Optional, Dict, Any
+
+
+# 浮点数保留的有效数字位数
+FLOAT_SIGNIFICANT_DIGITS = 6
+
+# 超出预算时表格至少保留的行数
+MIN_TABLE_ROWS = 4
+
+_TRUNCATED_MARKER = "...(truncated)"
+
+
+def _round_float(value: float) -> Any:
+    if math.isnan(value) or math.isinf(value):
+        return None
+    if value == 0:
+        return 0
+    integer_digits = int(math.floor(math.log10(abs(value)))) + 1
+    decimals = max(FLOAT_SIGNIFICANT_DIGITS - integer_digits, 0)
+    rounded = round(value, decimals)
+    return int(rounded) if decimals == 0 or rounded.is_integer() else rounded
+
+
+def _is_null(value: Any) -> bool:
+    return value is None or value == "" or (isinstance(value, float) and math.isnan(value))
+
+
+def _records_table(records: List[Dict]) -> Dict[str, Any]:
+    """记录列表转为列式表格：表头只出现一次，每行为数组，全为空的列被删除"""
+    columns: List[str] = []
+    for record in records:
+        columns.extend(key for key in record if key not in columns)
+    columns = [
+        column
+        for column in columns
+        if not all(_is_null(record.get(column)) for record in records)
+    ]
+    return {
+        "columns": [str(column) for column in columns],
+        "rows": [[record.get(column) for column in columns] for record in records],
+    }
+
+
+def compact_value(value: Any) -> Any:
+    """
+    将工具输出转换为紧凑的 JSON 兼容结构
+
+    DataFrame 与记录列表（多个字典组成的列表）转为 {"columns": [...], "rows": [[...]]}，
+    浮点数保留有效数字，NaN/inf 转为 null，numpy 标量、日期等转为基础类型。
+    """
+    if isinstance(value, BaseModel):
+        value = value.model_dump()
+    elif hasattr(value, "to_dict") and hasattr(value, "columns"):  # pandas.DataFrame
+        value = value.to_dict(orient="records")
+    elif hasattr(value, "to_dict") and hasattr(value, "index"):  # pandas.Series
+        value = value.to_dict()
+    elif hasattr(value, "tolist"):  # numpy 数组及标量
+        value = value.tolist()
+
+    if isinstance(value, bool) or value is None or isinstance(value, (int, str)):
+        return value
+    if isinstance(value, float):
+        return _round_float(value)
+    if isinstance(value, datetime):
+        try:
+            return value.strftime(
+                "%Y-%m-%d" if value.time() == datetime.min.time() else "%Y-%m-%d %H:%M:%S"
+            )
+        except ValueError:  # pandas.NaT
+            return None
+    if isinstance(value, dict):
+        return {str(key): compact_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [compact_value(item) for item in value]
+        if len(items) > 1 and all(isinstance(item, dict) for item in items):
+            return _records_table(items)
+        return items
+    return str(value)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _is_table(value: Any) -> bool:
+    return isinstance(value, dict) and isinstance(value.get("rows"), list) and "columns" in value
+
+
+def _largest_table(value: Any) -> Optional[Dict[str, Any]]:
+    """行数最多、仍可缩减的表格"""
+    largest = None
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if _is_table(item) and len(item["rows"]) > MIN_TABLE_ROWS:
+            if largest is None or len(item["rows"]) > len(largest["rows"]):
+                largest = item
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return largest
+
+
+def _shrink_table(table: Dict[str, Any]) -> None:
+    """行数减半，保留首尾各一半，省略的行数记录在 omitted_rows"""
+    rows = table["rows"]
+    keep = max(len(rows) // 2, MIN_TABLE_ROWS)
+    head = (keep + 1) // 2
+    table["rows"] = rows[:head] + rows[len(rows) - (keep - head):]
+    table["omitted_rows"] = table.get("omitted_rows", 0) + len(rows) - keep
+
+
+def _truncate(text: str, budget: int, count_tokens: Callable[[str], int]) -> str:
+    """按 token 数截断文本（二分查找最长前缀）"""
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle] + _TRUNCATED_MARKER) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low] + _TRUNCATED_MARKER
+
+
+def _approximate_tokens(text: str) -> int:
+    return len(text)
+
+
+def serialize_output(
+    value: Any,
+    budget: Optional[int] = None,
+    count_tokens: Optional[Callable[[str], int]] = None,
+) -> str:
+    """
+    将工具输出序列化为紧凑文本，并限制在 token 预算内
+
+    JSON 字符串会先解析再压缩。超出预算时依次将最大的表格行数减半（保留首尾），
+    仍超出时按 token 截断。
+
+    Args:
+        value: 工具输出
+        budget: token 预算，为空时不限制
+        count_tokens: 计算 token 数的函数（通常为 LLM.count_tokens），默认按字符数估算
+    """
+    text = None
+    if isinstance(value, str):
+        if value.lstrip().startswith(("{", "[")):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                text = value
+        else:
+            text = value
+    if text is None:
+        value = compact_value(value)
+        text = value if isinstance(value, str) else _dumps(value)
+
+    if not budget:
+        return text
+    count_tokens = count_tokens or _approximate_tokens
+    while count_tokens(text) > budget:
+        table = _largest_table(value)
+        if table is None:
+            return _truncate(text, budget, count_tokens)
+        _shrink_table(table)
+        text = _dumps(value)
+    return text
 
 
 class BaseTool(ABC, BaseModel):
@@ -70,6 +236,16 @@ class ToolResult(BaseModel):
     def __str__(self):
         return f"Error: {self.error}" if self.error else str(self.output)
 
+    def to_observation(
+        self,
+        budget: Optional[int] = None,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ) -> str:
+        """紧凑序列化的结果文本（供写入对话），限制在 token 预算内"""
+        if self.error:
+            return serialize_output(f"Error: {self.error}", budget, count_tokens)
+        return serialize_output(self.output, budget, count_tokens)
+
     def replace(self, **kwargs):
         """Returns a new ToolResult with the given fields replaced."""
         # return self.copy(update=kwargs)
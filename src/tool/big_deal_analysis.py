@@ -1,9 +1,13 @@
+import asyncio
 from typing import Any, Dict
-import time
-import pandas as pd  # type: ignore
 
 from src.logger import logger
 from src.tool.base import BaseTool, ToolResult
+from src.tool.financial_deep_search.bar_store import bar_store
+from src.tool.financial_deep_search.big_deal_feed import big_deal_feed
+from src.tool.financial_deep_search.market_data import fetch_individual_fund_flow_rank
+from src.tool.financial_deep_search.stock_data import fetch_stock_fund_flow
+from src.utils.executor import run_blocking
 
 try:
     import akshare as ak  # type: ignore
@@ -18,7 +22,7 @@ class BigDealAnalysisTool(BaseTool):
     description: str = (
         "获取市场及个股资金大单流向数据，并返回综合分析结果。"
         "调用 akshare 的 stock_fund_flow_big_deal、stock_fund_flow_individual、"
-        "stock_individual_fund_flow、stock_zh_a_hist 接口。"
+        "stock_individual_fund_flow 接口，并结合本地K线存储中的日K线。"
     )
     parameters: dict = {
         "type": "object",
@@ -67,69 +71,52 @@ class BigDealAnalysisTool(BaseTool):
         try:
             result: Dict[str, Any] = {}
 
-            def _with_retry(func, *args, **kwargs):
-                """Simple retry wrapper for unstable akshare endpoints."""
+            async def _with_retry(func, *args, **kwargs):
+                """Retry wrapper for unstable akshare endpoints, run off the event loop."""
                 for attempt in range(1, max_retry + 1):
                     try:
-                        return func(*args, **kwargs)
+                        return await run_blocking(func, *args, **kwargs)
                     except Exception as e:
                         if attempt >= max_retry:
                             raise
                         logger.warning(f"{func.__name__} attempt {attempt} failed: {e}. Retrying...")
-                        time.sleep(sleep_seconds)
+                        await asyncio.sleep(sleep_seconds)
 
-            def _safe_fetch(func, *args, **kwargs):
+            async def _safe_fetch(func, *args, **kwargs):
                 """Fetch data with retries; return None on ultimate failure instead of raising."""
                 try:
-                    return _with_retry(func, *args, **kwargs)
+                    return await _with_retry(func, *args, **kwargs)
                 except Exception as e:
                     logger.warning(f"{func.__name__} failed after {max_retry} attempts: {e}")
                     return None
 
-            # Market wide big deal flow (逐笔大单)
-            df_bd = _safe_fetch(ak.stock_fund_flow_big_deal)
-            if df_bd is not None and not df_bd.empty:
-                # 清洗数字列
-                def _to_float(series):
-                    return (
-                        series.astype(str)
-                        .str.replace(",", "", regex=False)
-                        .str.replace("亿", "e8")  # unlikely present here
-                        .str.replace("万", "e4")
-                        .str.extract(r"([\d\.-eE]+)")[0]
-                        .astype(float)
-                    )
-
-                if df_bd["成交额"].dtype == "O":
-                    df_bd["成交额"] = _to_float(df_bd["成交额"])
-
-                # 计算买盘/卖盘汇总
-                inflow = df_bd[df_bd["大单性质"] == "买盘"]["成交额"].sum()
-                outflow = df_bd[df_bd["大单性质"] == "卖盘"]["成交额"].sum()
-                result["market_summary"] = {
-                    "total_inflow_wan": round(inflow, 2),
-                    "total_outflow_wan": round(outflow, 2),
-                    "net_inflow_wan": round(inflow - outflow, 2),
-                }
-
-                # 按净额排序股票
-                grouped = (
-                    df_bd.groupby(["股票代码", "股票简称", "大单性质"])["成交额"].sum().reset_index()
-                )
-                buy_df = grouped[grouped["大单性质"] == "买盘"].sort_values("成交额", ascending=False)
-                sell_df = grouped[grouped["大单性质"] == "卖盘"].sort_values("成交额", ascending=False)
+            async def _nothing():
+                return None
+
+            # 各数据源互不依赖，并发获取
+            # (逐笔大单 / stock_fund_flow_individual 排行 / stock_individual_fund_flow / 日K线)
+            has_big_deal, individual_rank, individual_flow, hist_price = await asyncio.gather(
+                _safe_fetch(big_deal_feed.refresh),
+                _safe_fetch(fetch_individual_fund_flow_rank, symbol=rank_symbol),
+                _safe_fetch(fetch_stock_fund_flow, stock_code) if stock_code else _nothing(),
+                # Historical price data for correlation (local bar store, unadjusted)
+                _safe_fetch(bar_store.tail, stock_code, "daily", count=120, adjust="")
+                if stock_code
+                else _nothing(),
+            )
 
-                result["top_inflow"] = buy_df.head(top_n).to_dict(orient="records")
-                result["top_outflow"] = sell_df.head(top_n).to_dict(orient="records")
+            # Market wide big deal flow (逐笔大单)，共享缓存并按股票预汇总
+            has_big_deal = bool(has_big_deal)
+            if has_big_deal:
+                result["market_summary"] = big_deal_feed.market_summary()
+                result["top_inflow"] = big_deal_feed.top_inflow(top_n)
+                result["top_outflow"] = big_deal_feed.top_outflow(top_n)
 
                 # 保存部分原始逐笔记录以备调试（最多 top_n 条）
-                result["market_big_deal_samples"] = df_bd.head(top_n).to_dict(orient="records")
+                result["market_big_deal_samples"] = big_deal_feed.samples(top_n)
             else:
                 result["market_big_deal_samples"] = []
 
-            # Individual fund flow rank 使用 stock_fund_flow_individual(symbol)
-            individual_rank = _safe_fetch(ak.stock_fund_flow_individual, symbol=rank_symbol)
-
             # 默认返回排行榜前 top_n 条
             result["individual_rank_top"] = (
                 individual_rank.head(top_n).to_dict(orient="records")
@@ -147,38 +134,20 @@ class BigDealAnalysisTool(BaseTool):
 
             if stock_code:
                 # Stock specific fund flow trend 使用 stock_individual_fund_flow
-                individual_flow = _safe_fetch(ak.stock_individual_fund_flow, stock=stock_code)
                 result["stock_fund_flow"] = (
                     individual_flow.to_dict(orient="records") if individual_flow is not None else []
                 )
 
-                # Historical price data for correlation
-                hist_price = _safe_fetch(ak.stock_zh_a_hist, symbol=stock_code, period="daily")
                 if hist_price is not None:
                     result["stock_price_hist"] = hist_price.tail(120).to_dict(orient="records")
                 else:
                     result["stock_price_hist"] = []
 
-                # 1. 先整体抓取逐笔大单
-                # 复用已获取的 df_bd，若为空再尝试一次
-                if df_bd is None:
-                    df_bd = _safe_fetch(ak.stock_fund_flow_big_deal)
-
-                stk_df = pd.DataFrame()
-                if df_bd is not None and not df_bd.empty:
-                    stk_df = df_bd[df_bd["股票代码"] == stock_code]
-
-                if not stk_df.empty:
-                    inflow = stk_df[stk_df["大单性质"] == "买盘"]["成交额"].sum()
-                    outflow = stk_df[stk_df["大单性质"] == "卖盘"]["成交额"].sum()
-
-                    result["stock_big_deal_summary"] = {
-                        "inflow_wan": round(inflow, 2),
-                        "outflow_wan": round(outflow, 2),
-                        "net_inflow_wan": round(inflow - outflow, 2),
-                        "trade_count": len(stk_df),
-                    }
-                    result["stock_big_deal_samples"] = stk_df.head(top_n).to_dict(orient="records")
+                if has_big_deal:
+                    result["stock_big_deal_summary"] = big_deal_feed.stock_summary(stock_code)
+                    result["stock_big_deal_samples"] = big_deal_feed.stock_samples(
+                        stock_code, top_n
+                    )
                 else:
                     result["stock_big_deal_summary"] = {}
                     result["stock_big_deal_samples"] = []
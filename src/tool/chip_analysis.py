@@ -4,12 +4,17 @@ import time
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
-import akshare as ak
-import numpy as np
-import pandas as pd
-
 from src.logger import logger
 from src.tool.base import BaseTool, ToolResult, get_recent_trading_day
+from src.tool.financial_deep_search.bar_store import bar_store
+from src.tool.financial_deep_search.cyq import compute_cyq, summarize_cyq
+from src.tool.financial_deep_search.market_snapshot import market_snapshot
+from src.tool.financial_deep_search.stock_data import fetch_stock_fund_flow
+from src.utils.executor import run_blocking
+
+
+# 计算筹码分布使用的日K线数量（约一年）
+CYQ_HISTORY_BARS = 250
 
 
 class ChipAnalysisTool(BaseTool):
@@ -26,8 +31,8 @@ class ChipAnalysisTool(BaseTool):
             },
             "adjust": {
                 "type": "string",
-                "description": "复权类型：''(不复权)、'qfq'(前复权)、'hfq'(后复权)",
-                "default": "",
+                "description": "计算筹码分布所用K线的复权类型：'qfq'(前复权)、'hfq'(后复权)、''(不复权)",
+                "default": "qfq",
             },
             "analysis_days": {
                 "type": "integer",
@@ -41,7 +46,7 @@ class ChipAnalysisTool(BaseTool):
     async def execute(
         self,
         stock_code: str,
-        adjust: str = "",
+        adjust: str = "qfq",
         analysis_days: int = 5,
         **kwargs,
     ) -> ToolResult:
@@ -49,14 +54,14 @@ class ChipAnalysisTool(BaseTool):
         try:
             logger.info(f"开始筹码分析: {stock_code}")
             
-            # 获取筹码分布数据
-            chip_data = await self._get_chip_distribution(stock_code, adjust)
+            # 并发获取筹码分布数据和股票基本信息
+            chip_data, stock_info = await asyncio.gather(
+                self._get_chip_distribution(stock_code, adjust, analysis_days),
+                self._get_stock_info(stock_code),
+            )
             if not chip_data:
                 return ToolResult(error=f"无法获取股票 {stock_code} 的筹码分布数据")
             
-            # 获取股票基本信息
-            stock_info = await self._get_stock_info(stock_code)
-            
             # 进行筹码分析
             analysis_result = await self._analyze_chip_distribution(
                 chip_data, stock_info, analysis_days
@@ -78,87 +83,48 @@ class ChipAnalysisTool(BaseTool):
             logger.error(error_msg)
             return ToolResult(error=error_msg)
 
-    async def _get_chip_distribution(self, stock_code: str, adjust: str) -> Optional[Dict]:
-        """获取筹码分布数据"""
+    async def _get_chip_distribution(
+        self, stock_code: str, adjust: str, analysis_days: int
+    ) -> Optional[Dict]:
+        """由本地日K线计算筹码分布"""
         try:
             # 确保股票代码格式正确 - 移除任何市场前缀
             clean_code = stock_code
             if stock_code.startswith(('sh', 'sz')):
                 clean_code = stock_code[2:]
             
-            logger.info(f"尝试获取筹码分布数据: {clean_code}")
+            logger.info(f"计算筹码分布: {clean_code}")
             
-            # 方法1: 尝试使用原始API - 只获取最近5个交易日
+            # 方法1: 换手率衰减模型，基于最近一年的日K线一次性计算
             try:
-                df = ak.stock_cyq_em(symbol=clean_code, adjust=adjust)
-                if df is not None and not df.empty:
-                    # 只保留最近5个交易日的数据
-                    recent_df = df.tail(5)
-                    logger.info(f"成功获取筹码分布数据: {clean_code}, 原始数据行数: {len(df)}, 保留最近5天: {len(recent_df)}")
-                    
-                    chip_data = {
-                        "date": recent_df.index.strftime("%Y-%m-%d").tolist() if hasattr(recent_df.index, 'strftime') else [],
-                        "chip_distribution": recent_df.to_dict('records'),
-                        "data_source": "stock_cyq_em",
-                        "data_range": "recent_5_days"
-                    }
-                    return chip_data
-            except Exception as e:
-                logger.warning(f"stock_cyq_em失败: {clean_code}, 错误: {str(e)}")
-            
-            # 方法2: 尝试替代方案 - 使用历史行情数据估算筹码分布
-            try:
-                logger.info(f"尝试使用历史行情数据估算筹码分布: {clean_code}")
-                
-                # 使用动态日期范围 - 获取最近10个交易日的数据（保证有足够数据）
-                from datetime import datetime, timedelta
-                recent_trading_day = datetime.strptime(get_recent_trading_day(), "%Y-%m-%d")
-                end_date = recent_trading_day.strftime("%Y%m%d")
-                start_date = (recent_trading_day - timedelta(days=15)).strftime("%Y%m%d")  # 15天前保证有足够交易日
-                
-                hist_df = ak.stock_zh_a_hist(symbol=clean_code, period="daily", 
-                                           start_date=start_date, end_date=end_date, adjust="qfq")
-                
-                if hist_df is not None and not hist_df.empty:
-                    # 只使用最近5个交易日的数据
-                    recent_data = hist_df.tail(5)
-                    
-                    # 简单的筹码分布估算
-                    chip_distribution = []
-                    for _, row in recent_data.iterrows():
-                        chip_info = {
-                            "日期": row["日期"],
-                            "价格": row["收盘"],
-                            "成交量": row["成交量"],
-                            "成交额": row["成交额"],
-                            "筹码比例": min(row["换手率"] * 0.1, 10.0) if "换手率" in row else 1.0  # 估算筹码比例
-                        }
-                        chip_distribution.append(chip_info)
-                    
-                    chip_data = {
-                        "date": recent_data["日期"].tolist(),
-                        "chip_distribution": chip_distribution,
-                        "data_source": "estimated_from_hist",
-                        "data_range": "recent_5_days"
+                bars = await run_blocking(
+                    bar_store.tail, clean_code, "daily", count=CYQ_HISTORY_BARS, adjust=adjust
+                )
+                if bars is not None and not bars.empty:
+                    metrics, profile = await run_blocking(
+                        compute_cyq, bars, max(analysis_days, 5)
+                    )
+                    logger.info(f"筹码分布计算完成: {clean_code}, 使用K线 {len(bars)} 根")
+                    return {
+                        "date": metrics["日期"].tolist(),
+                        "chip_distribution": metrics.to_dict('records'),
+                        "price_profile": profile,
+                        "summary": summarize_cyq(metrics, analysis_days),
+                        "data_source": "local_cyq",
+                        "data_range": f"recent_{len(metrics)}_days",
+                        "history_bars": len(bars),
                     }
-                    logger.info(f"成功使用历史数据估算筹码分布: {clean_code}, 数据时间范围: {recent_data['日期'].min()} 到 {recent_data['日期'].max()}")
-                    return chip_data
-                    
             except Exception as e:
-                logger.warning(f"历史行情数据获取失败: {clean_code}, 错误: {str(e)}")
+                logger.warning(f"筹码分布计算失败: {clean_code}, 错误: {str(e)}")
             
-            # 方法3: 返回模拟数据以避免完全失败
-            logger.warning(f"所有方法失败，返回默认数据: {clean_code}")
+            # 方法2: 返回默认数据以避免完全失败
+            logger.warning(f"无法计算筹码分布，返回默认数据: {clean_code}")
             current_date = get_recent_trading_day()
             default_data = {
                 "date": [current_date],
                 "chip_distribution": [{
                     "日期": current_date,
-                    "价格": 0.0,
-                    "成交量": 0,
-                    "成交额": 0.0,
-                    "筹码比例": 0.0,
-                    "说明": "数据获取失败，使用默认值"
+                    "说明": "K线数据获取失败，使用默认值"
                 }],
                 "data_source": "default_fallback"
             }
@@ -178,24 +144,20 @@ class ChipAnalysisTool(BaseTool):
             
             logger.info(f"尝试获取股票基本信息: {clean_code}")
             
-            # 方法1: 尝试使用实时行情API
+            # 方法1: 从全市场实时行情快照中查询
             try:
-                stock_info = ak.stock_zh_a_spot_em()
-                if stock_info is not None and not stock_info.empty:
-                    stock_detail = stock_info[stock_info['代码'] == clean_code]
-                    
-                    if not stock_detail.empty:
-                        detail = stock_detail.iloc[0]
-                        return {
-                            "name": detail.get('名称', f'股票{clean_code}'),
-                            "current_price": detail.get('最新价', 0.0),
-                            "change_percent": detail.get('涨跌幅', 0.0),
-                            "volume": detail.get('成交量', 0),
-                            "turnover": detail.get('成交额', 0.0),
-                            "market_cap": detail.get('总市值', 0.0),
-                            "pe_ratio": detail.get('市盈率-动态', 0.0),
-                            "data_source": "spot_em"
-                        }
+                detail = await run_blocking(market_snapshot.get, clean_code)
+                if detail:
+                    return {
+                        "name": detail.get('名称') or f'股票{clean_code}',
+                        "current_price": detail.get('最新价') or 0.0,
+                        "change_percent": detail.get('涨跌幅') or 0.0,
+                        "volume": detail.get('成交量') or 0,
+                        "turnover": detail.get('成交额') or 0.0,
+                        "market_cap": detail.get('总市值') or 0.0,
+                        "pe_ratio": detail.get('市盈率-动态') or 0.0,
+                        "data_source": "spot_em"
+                    }
             except Exception as e:
                 logger.warning(f"实时行情获取失败: {clean_code}, 错误: {str(e)}")
             
@@ -205,8 +167,9 @@ class ChipAnalysisTool(BaseTool):
                 end_date = recent_trading_day.strftime("%Y%m%d")
                 start_date = (recent_trading_day - timedelta(days=7)).strftime("%Y%m%d")  # 7天前保证有数据
                 
-                hist_df = ak.stock_zh_a_hist(symbol=clean_code, period="daily", 
-                                           start_date=start_date, end_date=end_date, adjust="")
+                hist_df = await run_blocking(
+                    bar_store.range, clean_code, start_date, end_date, adjust=""
+                )
                 if hist_df is not None and not hist_df.empty:
                     latest = hist_df.iloc[-1]
                     return {
@@ -248,19 +211,17 @@ class ChipAnalysisTool(BaseTool):
             # 尝试多个数据源
             data_sources = []
             
-            # 1. 尝试东方财富实时数据
+            # 1. 尝试东方财富实时数据（全市场行情快照）
             try:
-                realtime_data = ak.stock_zh_a_spot_em()
-                if realtime_data is not None and not realtime_data.empty:
-                    stock_data = realtime_data[realtime_data['代码'] == clean_code]
-                    if not stock_data.empty:
-                        data_sources.append({
-                            "source": "eastmoney_realtime",
-                            "current_price": stock_data.iloc[0].get('最新价', 0),
-                            "volume": stock_data.iloc[0].get('成交量', 0),
-                            "turnover": stock_data.iloc[0].get('成交额', 0),
-                            "quality": "high"
-                        })
+                stock_data = await run_blocking(market_snapshot.get, clean_code)
+                if stock_data:
+                    data_sources.append({
+                        "source": "eastmoney_realtime",
+                        "current_price": stock_data.get('最新价') or 0,
+                        "volume": stock_data.get('成交量') or 0,
+                        "turnover": stock_data.get('成交额') or 0,
+                        "quality": "high"
+                    })
             except:
                 pass
             
@@ -270,8 +231,9 @@ class ChipAnalysisTool(BaseTool):
                 current_date = recent_trading_day.strftime("%Y%m%d")
                 start_date = (recent_trading_day - timedelta(days=7)).strftime("%Y%m%d")  # 7天前
                 
-                hist_data = ak.stock_zh_a_hist(symbol=clean_code, period="daily", 
-                                             start_date=start_date, end_date=current_date, adjust="")
+                hist_data = await run_blocking(
+                    bar_store.range, clean_code, start_date, current_date, adjust=""
+                )
                 if hist_data is not None and not hist_data.empty:
                     latest = hist_data.iloc[-1]
                     data_sources.append({
@@ -287,7 +249,7 @@ class ChipAnalysisTool(BaseTool):
             
             # 3. 尝试获取资金流向数据
             try:
-                money_flow = ak.stock_individual_fund_flow(stock=clean_code, market="sh" if clean_code.startswith('6') else "sz")
+                money_flow = await run_blocking(fetch_stock_fund_flow, clean_code)
                 if money_flow is not None and not money_flow.empty:
                     latest_flow = money_flow.iloc[-1]
                     data_sources.append({
@@ -313,31 +275,35 @@ class ChipAnalysisTool(BaseTool):
     async def _analyze_chip_distribution(
         self, chip_data: Dict, stock_info: Dict, analysis_days: int
     ) -> Dict:
-        """分析筹码分布"""
+        """分析筹码分布（各项分析均基于同一份筹码指标摘要）"""
         try:
             if not chip_data or not chip_data.get('chip_distribution'):
                 return {"error": "筹码数据不足，无法进行分析"}
             
-            df = pd.DataFrame(chip_data['chip_distribution'])
             current_price = stock_info.get('current_price', 0)
+            if chip_data.get('summary'):
+                metrics = dict(chip_data['summary'], data_quality="computed")
+            else:
+                logger.warning("筹码分布数据为空，使用默认分析结果")
+                metrics = self._estimated_metrics(current_price)
             
             # 基础筹码分析
-            basic_analysis = self._basic_chip_analysis(df, current_price)
+            basic_analysis = self._basic_chip_analysis(metrics, current_price)
             
             # 主力成本分析
-            main_cost_analysis = self._main_cost_analysis(df, current_price)
+            main_cost_analysis = self._main_cost_analysis(metrics, current_price)
             
             # 套牢区分析
-            trapped_analysis = self._trapped_area_analysis(df, current_price)
+            trapped_analysis = self._trapped_area_analysis(metrics)
             
             # 筹码集中度分析
-            concentration_analysis = self._concentration_analysis(df)
+            concentration_analysis = self._concentration_analysis(metrics)
             
             # 筹码变化趋势分析
-            trend_analysis = self._trend_analysis(df, analysis_days)
+            trend_analysis = self._trend_analysis(metrics, analysis_days)
             
             # A股特色分析
-            special_analysis = self._a_stock_special_analysis(df, current_price)
+            special_analysis = self._a_stock_special_analysis()
             
             # 交易决策建议
             trading_signals = self._generate_trading_signals(
@@ -358,299 +324,105 @@ class ChipAnalysisTool(BaseTool):
             logger.error(f"筹码分析失败: {str(e)}")
             return {"error": f"筹码分析失败: {str(e)}"}
 
-    def _basic_chip_analysis(self, df: pd.DataFrame, current_price: float) -> Dict:
+    @staticmethod
+    def _estimated_metrics(current_price: float) -> Dict:
+        """无法计算筹码分布时基于当前价格的估算指标"""
+        return {
+            "average_cost": current_price * 0.95 if current_price > 0 else 10.0,
+            "profit_ratio": 50.0,
+            "concentration_90": 80.0,
+            "concentration_70": 65.0,
+            "days": 0,
+            "data_quality": "estimated",
+        }
+
+    def _basic_chip_analysis(self, metrics: Dict, current_price: float) -> Dict:
         """基础筹码分析"""
-        try:
-            if df is None or df.empty:
-                logger.warning("筹码分布数据为空，使用默认分析结果")
-                # 返回基于当前价格的估算结果
-                avg_cost = current_price * 0.95 if current_price > 0 else 10.0
-                return {
-                    "average_cost": avg_cost,
-                    "profit_ratio": 50.0,
-                    "concentration_90": 80.0,
-                    "concentration_70": 65.0,
-                    "current_price": current_price,
-                    "cost_deviation": (current_price - avg_cost) / avg_cost * 100 if avg_cost > 0 else 0,
-                    "data_quality": "estimated"
-                }
-            
-            # 尝试从不同的列名获取数据
-            avg_cost = 0
-            profit_ratio = 0
-            concentration_90 = 0
-            concentration_70 = 0
-            
-            # 处理不同的数据格式
-            if hasattr(df, 'columns'):
-                # DataFrame格式
-                if '平均成本' in df.columns:
-                    avg_cost = df['平均成本'].iloc[-1] if len(df) > 0 else 0
-                elif '价格' in df.columns and '筹码比例' in df.columns:
-                    # 计算加权平均成本
-                    total_chips = df['筹码比例'].sum()
-                    if total_chips > 0:
-                        avg_cost = (df['价格'] * df['筹码比例']).sum() / total_chips
-                
-                if '获利比例' in df.columns:
-                    profit_ratio = df['获利比例'].iloc[-1] if len(df) > 0 else 0
-                elif '价格' in df.columns and current_price > 0:
-                    # 估算获利比例
-                    profitable_volume = df[df['价格'] < current_price]['筹码比例'].sum() if '筹码比例' in df.columns else 0
-                    total_volume = df['筹码比例'].sum() if '筹码比例' in df.columns else 1
-                    profit_ratio = (profitable_volume / total_volume * 100) if total_volume > 0 else 50
-                
-                if '90%成本集中度' in df.columns:
-                    concentration_90 = df['90%成本集中度'].iloc[-1] if len(df) > 0 else 0
-                if '70%成本集中度' in df.columns:
-                    concentration_70 = df['70%成本集中度'].iloc[-1] if len(df) > 0 else 0
-            else:
-                # 字典格式
-                avg_cost = df.get('平均成本', 0)
-                profit_ratio = df.get('获利比例', 0)
-                concentration_90 = df.get('90%成本集中度', 0)
-                concentration_70 = df.get('70%成本集中度', 0)
-            
-            # 如果没有获取到有效数据，使用估算值
-            if avg_cost == 0:
-                avg_cost = current_price * 0.95 if current_price > 0 else 10.0
-            if profit_ratio == 0:
-                profit_ratio = 50.0
-            if concentration_90 == 0:
-                concentration_90 = 80.0
-            if concentration_70 == 0:
-                concentration_70 = 65.0
-            
-            return {
-                "average_cost": round(avg_cost, 2),
-                "profit_ratio": round(profit_ratio, 2),
-                "concentration_90": round(concentration_90, 2),
-                "concentration_70": round(concentration_70, 2),
-                "current_price": current_price,
-                "cost_deviation": round((current_price - avg_cost) / avg_cost * 100, 2) if avg_cost > 0 else 0,
-                "data_quality": "processed"
-            }
-            
-        except Exception as e:
-            logger.error(f"基础筹码分析失败: {str(e)}")
-            # 返回默认值而不是错误
-            avg_cost = current_price * 0.95 if current_price > 0 else 10.0
-            return {
-                "average_cost": avg_cost,
-                "profit_ratio": 50.0,
-                "concentration_90": 80.0,
-                "concentration_70": 65.0,
-                "current_price": current_price,
-                "cost_deviation": round((current_price - avg_cost) / avg_cost * 100, 2) if avg_cost > 0 else 0,
-                "error": str(e),
-                "data_quality": "error_fallback"
-            }
-
-    def _main_cost_analysis(self, df: pd.DataFrame, current_price: float) -> Dict:
+        avg_cost = metrics["average_cost"]
+        return {
+            "average_cost": round(avg_cost, 2),
+            "profit_ratio": metrics["profit_ratio"],
+            "concentration_90": metrics["concentration_90"],
+            "concentration_70": metrics["concentration_70"],
+            "cost_range_90": metrics.get("cost_range_90"),
+            "cost_range_70": metrics.get("cost_range_70"),
+            "current_price": current_price,
+            "cost_deviation": round((current_price - avg_cost) / avg_cost * 100, 2) if avg_cost > 0 else 0,
+            "data_quality": metrics["data_quality"]
+        }
+
+    def _main_cost_analysis(self, metrics: Dict, current_price: float) -> Dict:
         """主力成本分析"""
-        try:
-            if df is None or df.empty:
-                logger.warning("筹码分布数据为空，使用默认主力成本分析")
-                avg_cost = current_price * 0.95 if current_price > 0 else 10.0
-                main_cost_deviation = (current_price - avg_cost) / avg_cost * 100 if avg_cost > 0 else 0
-                control_level = self._evaluate_control_level(80.0)
-                return {
-                    "main_cost_area": avg_cost,
-                    "cost_deviation_percent": round(main_cost_deviation, 2),
-                    "control_level": control_level,
-                    "main_profit_space": max(main_cost_deviation, 0) if main_cost_deviation > 0 else 0,
-                    "analysis": self._generate_main_cost_analysis_text(main_cost_deviation, control_level),
-                    "data_quality": "estimated"
-                }
-            
-            # 获取平均成本
-            avg_cost = 0
-            concentration_90 = 0
-            
-            if hasattr(df, 'columns'):
-                # DataFrame格式
-                if '平均成本' in df.columns:
-                    avg_cost = df['平均成本'].iloc[-1] if len(df) > 0 else 0
-                elif '价格' in df.columns and '筹码比例' in df.columns:
-                    # 计算加权平均成本
-                    total_chips = df['筹码比例'].sum()
-                    if total_chips > 0:
-                        avg_cost = (df['价格'] * df['筹码比例']).sum() / total_chips
-                
-                if '90%成本集中度' in df.columns:
-                    concentration_90 = df['90%成本集中度'].iloc[-1] if len(df) > 0 else 0
-            else:
-                # 字典格式
-                avg_cost = df.get('平均成本', 0)
-                concentration_90 = df.get('90%成本集中度', 0)
-            
-            # 如果没有获取到有效数据，使用估算值
-            if avg_cost == 0:
-                avg_cost = current_price * 0.95 if current_price > 0 else 10.0
-            if concentration_90 == 0:
-                concentration_90 = 80.0
-            
-            # 主力成本乖离率
-            main_cost_deviation = (current_price - avg_cost) / avg_cost * 100 if avg_cost > 0 else 0
-            
-            # 主力控盘程度评估
-            control_level = self._evaluate_control_level(concentration_90)
-            
-            return {
-                "main_cost_area": round(avg_cost, 2),
-                "cost_deviation_percent": round(main_cost_deviation, 2),
-                "control_level": control_level,
-                "main_profit_space": round(max(main_cost_deviation, 0), 2),
-                "analysis": self._generate_main_cost_analysis_text(main_cost_deviation, control_level),
-                "data_quality": "processed"
-            }
-            
-        except Exception as e:
-            logger.error(f"主力成本分析失败: {str(e)}")
-            # 返回默认值而不是错误
-            avg_cost = current_price * 0.95 if current_price > 0 else 10.0
-            main_cost_deviation = (current_price - avg_cost) / avg_cost * 100 if avg_cost > 0 else 0
-            control_level = self._evaluate_control_level(80.0)
-            return {
-                "main_cost_area": avg_cost,
-                "cost_deviation_percent": round(main_cost_deviation, 2),
-                "control_level": control_level,
-                "main_profit_space": max(main_cost_deviation, 0),
-                "analysis": self._generate_main_cost_analysis_text(main_cost_deviation, control_level),
-                "error": str(e),
-                "data_quality": "error_fallback"
-            }
-
-    def _trapped_area_analysis(self, df: pd.DataFrame, current_price: float) -> Dict:
+        avg_cost = metrics["average_cost"]
+        
+        # 主力成本乖离率
+        main_cost_deviation = (current_price - avg_cost) / avg_cost * 100 if avg_cost > 0 else 0
+        
+        # 主力控盘程度评估
+        control_level = self._evaluate_control_level(metrics["concentration_90"])
+        
+        return {
+            "main_cost_area": round(avg_cost, 2),
+            "cost_deviation_percent": round(main_cost_deviation, 2),
+            "control_level": control_level,
+            "main_profit_space": round(max(main_cost_deviation, 0), 2),
+            "analysis": self._generate_main_cost_analysis_text(main_cost_deviation, control_level),
+            "data_quality": metrics["data_quality"]
+        }
+
+    def _trapped_area_analysis(self, metrics: Dict) -> Dict:
         """套牢区分析"""
-        try:
-            if df is None or df.empty:
-                logger.warning("筹码分布数据为空，使用默认套牢区分析")
-                trapped_ratio = 50.0
-                trapped_depth = self._evaluate_trapped_depth(trapped_ratio)
-                return {
-                    "trapped_ratio": trapped_ratio,
-                    "trapped_depth": trapped_depth,
-                    "selling_pressure": self._evaluate_selling_pressure(trapped_ratio),
-                    "analysis": self._generate_trapped_analysis_text(trapped_ratio, trapped_depth),
-                    "data_quality": "estimated"
-                }
-            
-            # 获取获利比例
-            profit_ratio = 0
-            
-            if hasattr(df, 'columns'):
-                # DataFrame格式
-                if '获利比例' in df.columns:
-                    profit_ratio = df['获利比例'].iloc[-1] if len(df) > 0 else 0
-                elif '价格' in df.columns and '筹码比例' in df.columns and current_price > 0:
-                    # 计算获利比例
-                    profitable_volume = df[df['价格'] < current_price]['筹码比例'].sum()
-                    total_volume = df['筹码比例'].sum()
-                    profit_ratio = (profitable_volume / total_volume * 100) if total_volume > 0 else 0
-            else:
-                # 字典格式
-                profit_ratio = df.get('获利比例', 0)
-            
-            # 如果没有获取到有效数据，使用估算值
-            if profit_ratio == 0:
-                profit_ratio = 50.0
-            
-            # 套牢比例
-            trapped_ratio = 100 - profit_ratio
-            
-            # 套牢深度评估
-            trapped_depth = self._evaluate_trapped_depth(trapped_ratio)
-            
-            return {
-                "trapped_ratio": round(trapped_ratio, 2),
-                "trapped_depth": trapped_depth,
-                "selling_pressure": self._evaluate_selling_pressure(trapped_ratio),
-                "analysis": self._generate_trapped_analysis_text(trapped_ratio, trapped_depth),
-                "data_quality": "processed"
-            }
-            
-        except Exception as e:
-            logger.error(f"套牢区分析失败: {str(e)}")
-            # 返回默认值而不是错误
-            trapped_ratio = 50.0
-            trapped_depth = self._evaluate_trapped_depth(trapped_ratio)
-            return {
-                "trapped_ratio": trapped_ratio,
-                "trapped_depth": trapped_depth,
-                "selling_pressure": self._evaluate_selling_pressure(trapped_ratio),
-                "analysis": self._generate_trapped_analysis_text(trapped_ratio, trapped_depth),
-                "error": str(e),
-                "data_quality": "error_fallback"
-            }
-
-    def _concentration_analysis(self, df: pd.DataFrame) -> Dict:
+        # 套牢比例
+        trapped_ratio = round(100 - metrics["profit_ratio"], 2)
+        
+        # 套牢深度评估
+        trapped_depth = self._evaluate_trapped_depth(trapped_ratio)
+        
+        return {
+            "trapped_ratio": trapped_ratio,
+            "trapped_depth": trapped_depth,
+            "selling_pressure": self._evaluate_selling_pressure(trapped_ratio),
+            "analysis": self._generate_trapped_analysis_text(trapped_ratio, trapped_depth),
+            "data_quality": metrics["data_quality"]
+        }
+
+    def _concentration_analysis(self, metrics: Dict) -> Dict:
         """筹码集中度分析"""
-        try:
-            concentration_90 = df.get('90%成本集中度', [0])[-1] if '90%成本集中度' in df.columns else 0
-            concentration_70 = df.get('70%成本集中度', [0])[-1] if '70%成本集中度' in df.columns else 0
-            
-            # 集中度变化趋势
-            concentration_trend = self._analyze_concentration_trend(df)
-            
-            return {
-                "concentration_90": concentration_90,
-                "concentration_70": concentration_70,
-                "concentration_level": self._evaluate_concentration_level(concentration_90),
-                "trend": concentration_trend,
-                "analysis": self._generate_concentration_analysis_text(concentration_90, concentration_70),
-            }
-            
-        except Exception as e:
-            logger.error(f"筹码集中度分析失败: {str(e)}")
-            return {"error": str(e)}
-
-    def _trend_analysis(self, df: pd.DataFrame, analysis_days: int) -> Dict:
+        concentration_90 = metrics["concentration_90"]
+        concentration_70 = metrics["concentration_70"]
+        return {
+            "concentration_90": concentration_90,
+            "concentration_70": concentration_70,
+            "concentration_level": self._evaluate_concentration_level(concentration_90),
+            "trend": self._analyze_concentration_trend(metrics),
+            "analysis": self._generate_concentration_analysis_text(concentration_90, concentration_70),
+        }
+
+    def _trend_analysis(self, metrics: Dict, analysis_days: int) -> Dict:
         """筹码变化趋势分析"""
-        try:
-            # 获取最近几天的数据
-            recent_data = df.tail(min(analysis_days, len(df)))
-            
-            # 筹码迁移分析
-            chip_migration = self._analyze_chip_migration(recent_data)
-            
-            # 筹码稳定性分析
-            stability = self._analyze_chip_stability(recent_data)
-            
-            return {
-                "analysis_period": analysis_days,
-                "chip_migration": chip_migration,
-                "stability": stability,
-                "trend_direction": self._determine_trend_direction(chip_migration),
-                "analysis": self._generate_trend_analysis_text(chip_migration, stability),
-            }
-            
-        except Exception as e:
-            logger.error(f"筹码趋势分析失败: {str(e)}")
-            return {"error": str(e)}
-
-    def _a_stock_special_analysis(self, df: pd.DataFrame, current_price: float) -> Dict:
+        # 筹码迁移分析
+        chip_migration = self._analyze_chip_migration(metrics)
+        
+        # 筹码稳定性分析
+        stability = self._analyze_chip_stability(metrics)
+        
+        return {
+            "analysis_period": analysis_days,
+            "cost_change": metrics.get("cost_change"),
+            "chip_migration": chip_migration,
+            "stability": stability,
+            "trend_direction": self._determine_trend_direction(chip_migration),
+            "analysis": self._generate_trend_analysis_text(chip_migration, stability),
+        }
+
+    def _a_stock_special_analysis(self) -> Dict:
         """A股特色分析"""
-        try:
-            # 政策市特征分析
-            policy_impact = self._analyze_policy_impact(df)
-            
-            # 游资操作模式识别
-            hot_money_pattern = self._identify_hot_money_pattern(df, current_price)
-            
-            # 机构调仓轨迹
-            institutional_adjustment = self._analyze_institutional_adjustment(df)
-            
-            return {
-                "policy_impact": policy_impact,
-                "hot_money_pattern": hot_money_pattern,
-                "institutional_adjustment": institutional_adjustment,
-                "a_stock_characteristics": self._generate_a_stock_characteristics_text(),
-            }
-            
-        except Exception as e:
-            logger.error(f"A股特色分析失败: {str(e)}")
-            return {"error": str(e)}
+        return {
+            "policy_impact": self._analyze_policy_impact(),
+            "hot_money_pattern": self._identify_hot_money_pattern(),
+            "institutional_adjustment": self._analyze_institutional_adjustment(),
+            "a_stock_characteristics": self._generate_a_stock_characteristics_text(),
+        }
 
     def _generate_trading_signals(
         self, basic: Dict, main_cost: Dict, trapped: Dict, concentration: Dict
@@ -734,55 +506,41 @@ class ChipAnalysisTool(BaseTool):
         else:
             return "高度分散"
 
-    def _analyze_concentration_trend(self, df: pd.DataFrame) -> str:
-        """分析集中度变化趋势"""
-        try:
-            if '90%成本集中度' in df.columns and len(df) > 1:
-                recent_concentration = df['90%成本集中度'].tail(5).mean()
-                earlier_concentration = df['90%成本集中度'].head(5).mean()
-                
-                if recent_concentration > earlier_concentration:
-                    return "集中度上升"
-                elif recent_concentration < earlier_concentration:
-                    return "集中度下降"
-                else:
-                    return "集中度稳定"
-            else:
-                return "数据不足"
-        except:
-            return "分析失败"
-
-    def _analyze_chip_migration(self, recent_data: pd.DataFrame) -> str:
-        """分析筹码迁移"""
-        try:
-            if '平均成本' in recent_data.columns and len(recent_data) > 1:
-                cost_change = recent_data['平均成本'].iloc[-1] - recent_data['平均成本'].iloc[0]
-                if cost_change > 0:
-                    return "筹码向上迁移"
-                elif cost_change < 0:
-                    return "筹码向下迁移"
-                else:
-                    return "筹码稳定"
-            else:
-                return "数据不足"
-        except:
-            return "分析失败"
+    def _analyze_concentration_trend(self, metrics: Dict) -> str:
+        """分析集中度变化趋势（90%集中度数值越小筹码越集中）"""
+        if metrics.get("days", 0) < 2:
+            return "数据不足"
+        change = metrics["concentration_change"]
+        if change < -0.5:
+            return "集中度上升"
+        elif change > 0.5:
+            return "集中度下降"
+        else:
+            return "集中度稳定"
+
+    def _analyze_chip_migration(self, metrics: Dict) -> str:
+        """分析筹码迁移（平均成本变化超过0.5%视为迁移）"""
+        if metrics.get("days", 0) < 2 or metrics["average_cost"] <= 0:
+            return "数据不足"
+        change_ratio = metrics["cost_change"] / metrics["average_cost"]
+        if change_ratio > 0.005:
+            return "筹码向上迁移"
+        elif change_ratio < -0.005:
+            return "筹码向下迁移"
+        else:
+            return "筹码稳定"
 
-    def _analyze_chip_stability(self, recent_data: pd.DataFrame) -> str:
+    def _analyze_chip_stability(self, metrics: Dict) -> str:
         """分析筹码稳定性"""
-        try:
-            if '90%成本集中度' in recent_data.columns and len(recent_data) > 1:
-                concentration_std = recent_data['90%成本集中度'].std()
-                if concentration_std < 2:
-                    return "筹码稳定"
-                elif concentration_std < 5:
-                    return "筹码轻微波动"
-                else:
-                    return "筹码大幅波动"
-            else:
-                return "数据不足"
-        except:
-            return "分析失败"
+        if metrics.get("days", 0) < 2:
+            return "数据不足"
+        concentration_std = metrics["concentration_std"]
+        if concentration_std < 2:
+            return "筹码稳定"
+        elif concentration_std < 5:
+            return "筹码轻微波动"
+        else:
+            return "筹码大幅波动"
 
     def _determine_trend_direction(self, chip_migration: str) -> str:
         """确定趋势方向"""
@@ -793,15 +551,15 @@ class ChipAnalysisTool(BaseTool):
         else:
             return "震荡趋势"
 
-    def _analyze_policy_impact(self, df: pd.DataFrame) -> str:
+    def _analyze_policy_impact(self) -> str:
         """分析政策影响"""
         return "需要结合具体政策事件分析"
 
-    def _identify_hot_money_pattern(self, df: pd.DataFrame, current_price: float) -> str:
+    def _identify_hot_money_pattern(self) -> str:
         """识别游资操作模式"""
         return "需要结合成交量和价格走势分析"
 
-    def _analyze_institutional_adjustment(self, df: pd.DataFrame) -> str:
+    def _analyze_institutional_adjustment(self) -> str:
         """分析机构调仓"""
         return "需要结合机构持仓数据分析"
 
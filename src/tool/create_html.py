@@ -25,172 +25,6 @@ from src.llm import LLM
 from src.tool.base import BaseTool, ToolResult
 from src.utils.report_manager import report_manager
 
-"""
-数据缓存与实时更新策略
-"""
-import json
-import time
-import os
-from typing import Dict, Optional, Any
-from datetime import datetime, timedelta
-
-class DataCacheManager:
-    """数据缓存管理器"""
-    
-    def __init__(self, cache_dir: str = "cache"):
-        self.cache_dir = cache_dir
-        self.ensure_cache_dir()
-        
-        # 缓存配置
-        self.cache_config = {
-            "chip_analysis": {"ttl": 300, "max_age": 900},      # 5分钟TTL，15分钟最大age
-            "stock_info": {"ttl": 60, "max_age": 180},           # 1分钟TTL，3分钟最大age
-            "sentiment_data": {"ttl": 600, "max_age": 1800},     # 10分钟TTL，30分钟最大age
-            "technical_analysis": {"ttl": 180, "max_age": 600},  # 3分钟TTL，10分钟最大age
-            "risk_control": {"ttl": 120, "max_age": 360},        # 2分钟TTL，6分钟最大age
-        }
-    
-    def ensure_cache_dir(self):
-        """确保缓存目录存在"""
-        if not os.path.exists(self.cache_dir):
-            os.makedirs(self.cache_dir)
-    
-    def get_cache_key(self, data_type: str, stock_code: str, **kwargs) -> str:
-        """生成缓存键"""
-        params = "_".join([f"{k}={v}" for k, v in sorted(kwargs.items())])
-        return f"{data_type}_{stock_code}_{params}" if params else f"{data_type}_{stock_code}"
-    
-    def get_cache_file(self, cache_key: str) -> str:
-        """获取缓存文件路径"""
-        return os.path.join(self.cache_dir, f"{cache_key}.json")
-    
-    def get_cached_data(self, data_type: str, stock_code: str, **kwargs) -> Optional[Dict]:
-        """获取缓存数据"""
-        try:
-            cache_key = self.get_cache_key(data_type, stock_code, **kwargs)
-            cache_file = self.get_cache_file(cache_key)
-            
-            if not os.path.exists(cache_file):
-                return None
-            
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cached_data = json.load(f)
-            
-            # 检查缓存是否过期
-            cache_time = cached_data.get('cache_time', 0)
-            current_time = time.time()
-            
-            config = self.cache_config.get(data_type, {"ttl": 300, "max_age": 900})
-            
-            # 硬过期检查
-            if current_time - cache_time > config['max_age']:
-                self.remove_cache(cache_key)
-                return None
-            
-            # 软过期检查 - 返回但标记为过期
-            if current_time - cache_time > config['ttl']:
-                cached_data['is_stale'] = True
-            else:
-                cached_data['is_stale'] = False
-            
-            return cached_data
-            
-        except Exception as e:
-            print(f"获取缓存数据失败: {str(e)}")
-            return None
-    
-    def set_cached_data(self, data_type: str, stock_code: str, data: Any, **kwargs):
-        """设置缓存数据"""
-        try:
-            cache_key = self.get_cache_key(data_type, stock_code, **kwargs)
-            cache_file = self.get_cache_file(cache_key)
-            
-            cache_data = {
-                "cache_time": time.time(),
-                "data_type": data_type,
-                "stock_code": stock_code,
-                "data": data,
-                "metadata": kwargs
-            }
-            
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
-                
-        except Exception as e:
-            print(f"设置缓存数据失败: {str(e)}")
-    
-    def remove_cache(self, cache_key: str):
-        """删除缓存"""
-        try:
-            cache_file = self.get_cache_file(cache_key)
-            if os.path.exists(cache_file):
-                os.remove(cache_file)
-        except Exception as e:
-            print(f"删除缓存失败: {str(e)}")
-    
-    def cleanup_expired_cache(self):
-        """清理过期缓存"""
-        try:
-            current_time = time.time()
-            
-            for filename in os.listdir(self.cache_dir):
-                if filename.endswith('.json'):
-                    file_path = os.path.join(self.cache_dir, filename)
-                    
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            cached_data = json.load(f)
-                        
-                        cache_time = cached_data.get('cache_time', 0)
-                        data_type = cached_data.get('data_type', 'unknown')
-                        
-                        config = self.cache_config.get(data_type, {"ttl": 300, "max_age": 900})
-                        
-                        if current_time - cache_time > config['max_age']:
-                            os.remove(file_path)
-                            
-                    except Exception:
-                        # 如果文件损坏，删除它
-                        os.remove(file_path)
-                        
-        except Exception as e:
-            print(f"清理过期缓存失败: {str(e)}")
-
-# 全局缓存管理器实例
-cache_manager = DataCacheManager()
-
-def with_cache(data_type: str):
-    """缓存装饰器"""
-    def decorator(func):
-        async def wrapper(self, stock_code: str, **kwargs):
-            # 尝试从缓存获取数据
-            cached_data = cache_manager.get_cached_data(data_type, stock_code, **kwargs)
-            
-            if cached_data and not cached_data.get('is_stale', False):
-                print(f"使用缓存数据: {data_type}_{stock_code}")
-                return cached_data['data']
-            
-            # 执行原始函数
-            try:
-                result = await func(self, stock_code, **kwargs)
-                
-                # 缓存结果
-                if result:
-                    cache_manager.set_cached_data(data_type, stock_code, result, **kwargs)
-                
-                return result
-                
-            except Exception as e:
-                # 如果有过期但可用的缓存，返回缓存数据
-                if cached_data and cached_data.get('is_stale', False):
-                    print(f"使用过期缓存数据作为fallback: {data_type}_{stock_code}")
-                    return cached_data['data']
-                
-                raise e
-        
-        return wrapper
-    return decorator
-
 
 class CreateHtmlTool(BaseTool):
     """HTML generation tool that creates beautiful and functional HTML pages
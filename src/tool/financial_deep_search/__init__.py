@@ -1,5 +1,12 @@
 from src.tool.financial_deep_search.get_section_data import get_all_section
+from src.tool.financial_deep_search.http_client import deadline, http_client
 from src.tool.financial_deep_search.index_capital import get_index_capital_flow
+from src.tool.financial_deep_search.market_data import (
+    fetch_daily_billboard,
+    fetch_individual_fund_flow_rank,
+    fetch_market_big_deal,
+    prefetch_market_data,
+)
 from src.tool.financial_deep_search.risk_control_data import (
     get_announcements_with_detail,
     get_company_name_for_stock,
@@ -7,6 +14,7 @@ from src.tool.financial_deep_search.risk_control_data import (
     get_risk_control_data,
 )
 from src.tool.financial_deep_search.stock_capital import (
+    fetch_capital_flow_table,
     fetch_single_stock_capital_flow,
     fetch_stock_list_capital_flow,
     get_stock_capital_flow,
@@ -17,10 +25,17 @@ __all__ = [
     "get_stock_capital_flow",
     "fetch_single_stock_capital_flow",
     "fetch_stock_list_capital_flow",
+    "fetch_capital_flow_table",
     "get_risk_control_data",
     "get_announcements_with_detail",
     "get_financial_reports",
     "get_company_name_for_stock",
     "get_index_capital_flow",
     "get_all_section",
+    "fetch_daily_billboard",
+    "fetch_market_big_deal",
+    "fetch_individual_fund_flow_rank",
+    "prefetch_market_data",
+    "http_client",
+    "deadline",
 ]
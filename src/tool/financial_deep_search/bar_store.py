@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+本地K线存储
+按 股票代码 + 周期 + 复权方式 以列式二进制文件保存日K线和分钟K线，读取时内存映射；
+同步时只追加最后一根已存K线之后的新数据，tail / range 查询在数据新鲜时不访问网络。
+"""
+
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.config import config
+from src.logger import logger
+from src.tool.base import get_recent_trading_day
+from src.tool.financial_deep_search.market_snapshot import normalize_code
+from src.utils.cache import DISK_HIT, MISS, data_cache
+from src.utils.rate_limit import EASTMONEY_HIS, host_limiter
+from src.utils.single_flight import single_flight
+
+
+try:
+    import efinance as ef
+except ImportError:
+    ef = None
+
+
+# 周期 -> (efinance klt, 日期格式)
+FREQUENCIES = {
+    "daily": (101, "%Y-%m-%d"),
+    "1min": (1, "%Y-%m-%d %H:%M"),
+}
+
+# 复权方式 -> efinance fqt
+ADJUSTMENTS = {"": 0, "qfq": 1, "hfq": 2}
+
+# 数值列（与 ak.stock_zh_a_hist / ef.stock.get_quote_history 列名一致）
+VALUE_COLUMNS = ("开盘", "收盘", "最高", "最低", "成交量", "成交额", "振幅", "涨跌幅", "涨跌额", "换手率")
+
+# 收盘时间，此后同步的数据视为当日完整数据
+_MARKET_CLOSE = "15:00"
+
+_TIMESTAMP = "timestamp"
+
+
+class BarStore:
+    """列式、内存映射的本地K线存储"""
+
+    def __init__(self, base_dir: Optional[Path] = None):
+        self.base_dir = Path(base_dir or config.workspace_root / "cache" / "bars")
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _series_dir(self, symbol: str, freq: str, adjust: str) -> Path:
+        return self.base_dir / f"{freq}_{adjust or 'none'}" / symbol
+
+    def _lock(self, series_dir: Path) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(str(series_dir), threading.Lock())
+
+    @staticmethod
+    def _read_meta(series_dir: Path) -> Dict:
+        meta_path = series_dir / "meta.json"
+        if not meta_path.exists():
+            return {"rows": 0, "synced_at": 0}
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_meta(series_dir: Path, meta: Dict) -> None:
+        tmp_path = series_dir / "meta.json.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        tmp_path.replace(series_dir / "meta.json")
+
+    @staticmethod
+    def _column_path(series_dir: Path, column: str) -> Path:
+        return series_dir / f"{column}.bin"
+
+    def _open_columns(self, series_dir: Path, rows: int) -> Dict[str, np.ndarray]:
+        """以只读内存映射打开各列（只映射 meta 中记录的行数）"""
+        if rows == 0:
+            return {}
+        columns = {
+            _TIMESTAMP: np.memmap(
+                self._column_path(series_dir, _TIMESTAMP),
+                dtype=np.int64,
+                mode="r",
+                shape=(rows,),
+            )
+        }
+        for column in VALUE_COLUMNS:
+            columns[column] = np.memmap(
+                self._column_path(series_dir, column),
+                dtype=np.float64,
+                mode="r",
+                shape=(rows,),
+            )
+        return columns
+
+    @staticmethod
+    def _is_fresh(meta: Dict) -> bool:
+        synced_at = meta.get("synced_at", 0)
+        if time.time() - synced_at < config.data_config.bar_refresh_interval:
+            return True
+        # 最近交易日收盘后同步过，数据已完整
+        close_time = datetime.strptime(
+            f"{get_recent_trading_day()} {_MARKET_CLOSE}", "%Y-%m-%d %H:%M"
+        )
+        return synced_at >= close_time.timestamp()
+
+    @staticmethod
+    def _fetch(symbol: str, freq: str, adjust: str, begin: str) -> pd.DataFrame:
+        host_limiter.acquire_sync(EASTMONEY_HIS)
+        df = ef.stock.get_quote_history(
+            symbol, beg=begin, klt=FREQUENCIES[freq][0], fqt=ADJUSTMENTS[adjust]
+        )
+        if df is None or df.empty:
+            return pd.DataFrame()
+        return df
+
+    @staticmethod
+    def _to_columns(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        columns = {
+            _TIMESTAMP: (
+                pd.to_datetime(df["日期"])
+                .to_numpy(dtype="datetime64[s]")
+                .astype(np.int64)
+            )
+        }
+        for column in VALUE_COLUMNS:
+            values = df[column] if column in df else pd.Series(np.nan, index=df.index)
+            columns[column] = pd.to_numeric(values, errors="coerce").to_numpy(
+                dtype=np.float64
+            )
+        return columns
+
+    def _write(
+        self, series_dir: Path, columns: Dict[str, np.ndarray], keep_rows: int
+    ) -> int:
+        """截断到 keep_rows 行后追加新数据，返回总行数"""
+        series_dir.mkdir(parents=True, exist_ok=True)
+        for column, values in columns.items():
+            path = self._column_path(series_dir, column)
+            with open(path, "ab") as f:
+                f.truncate(keep_rows * values.dtype.itemsize)
+                f.write(np.ascontiguousarray(values).tobytes())
+        return keep_rows + len(columns[_TIMESTAMP])
+
+    @single_flight(normalize={"symbol": normalize_code})
+    def sync(
+        self, symbol: str, freq: str = "daily", adjust: str = "qfq", force: bool = False
+    ) -> int:
+        """
+        增量同步K线：从倒数第二根已存K线开始抓取，覆盖未完成的K线并追加新K线
+
+        复权数据在除权后会整体变化（重叠K线的收盘价不一致），此时重新抓取全部历史。
+        同一序列的并发同步合并为一次。
+
+        Returns:
+            int: 同步后的K线总数
+        """
+        symbol = normalize_code(symbol)
+        series_dir = self._series_dir(symbol, freq, adjust)
+
+        with self._lock(series_dir):
+            meta = self._read_meta(series_dir)
+            rows = meta.get("rows", 0)
+            if ef is None or (rows and not force and self._is_fresh(meta)):
+                data_cache.record("kline", DISK_HIT)
+                return rows
+            data_cache.record("kline", MISS)
+
+            begin = "19000101"
+            if rows:
+                stored_ts = np.fromfile(
+                    self._column_path(series_dir, _TIMESTAMP),
+                    dtype=np.int64,
+                    count=rows,
+                )
+                # 最后一根K线可能是盘中未完成的K线，用倒数第二根校验复权是否变化
+                anchor = max(rows - 2, 0)
+                anchor_close = np.fromfile(
+                    self._column_path(series_dir, "收盘"),
+                    dtype=np.float64,
+                    count=1,
+                    offset=anchor * np.dtype(np.float64).itemsize,
+                )[0]
+                anchor_date = pd.Timestamp(int(stored_ts[anchor]), unit="s")
+                begin = anchor_date.strftime("%Y%m%d")
+
+            df = self._fetch(symbol, freq, adjust, begin)
+            if df.empty:
+                return rows
+            new = self._to_columns(df)
+
+            keep_rows = 0
+            if rows:
+                keep_rows = int(np.searchsorted(stored_ts, new[_TIMESTAMP][0]))
+                pos = int(np.searchsorted(new[_TIMESTAMP], stored_ts[anchor]))
+                adjusted = (
+                    pos < len(new[_TIMESTAMP])
+                    and new[_TIMESTAMP][pos] == stored_ts[anchor]
+                    and not np.isclose(new["收盘"][pos], anchor_close, equal_nan=True)
+                )
+                if adjust and adjusted:
+                    logger.info(f"{symbol} {freq} 复权数据已变化，重建K线历史")
+                    df = self._fetch(symbol, freq, adjust, "19000101")
+                    if df.empty:
+                        return rows
+                    new = self._to_columns(df)
+                    keep_rows = 0
+
+            if keep_rows < rows:
+                # 先把元数据收缩到保留行数，再改写列文件：中途崩溃时只会丢失被覆盖的K线
+                # （下次同步重新抓取），不会留下新旧复权价格混合的序列
+                self._write_meta(series_dir, {"rows": keep_rows, "synced_at": 0})
+            total = self._write(series_dir, new, keep_rows)
+            self._write_meta(series_dir, {"rows": total, "synced_at": time.time()})
+            return total
+
+    def _read(
+        self, symbol: str, freq: str, adjust: str, sync: bool, window
+    ) -> pd.DataFrame:
+        """同步后在锁内映射并截取所需行（window 根据时间戳列返回行区间）"""
+        if sync:
+            self.sync(symbol, freq, adjust)
+
+        series_dir = self._series_dir(symbol, freq, adjust)
+        with self._lock(series_dir):
+            rows = self._read_meta(series_dir).get("rows", 0)
+            columns = self._open_columns(series_dir, rows)
+            if not columns:
+                return self._frame(symbol, freq, columns, 0, 0)
+            start, stop = window(columns[_TIMESTAMP])
+            return self._frame(symbol, freq, columns, start, stop)
+
+    def _frame(
+        self,
+        symbol: str,
+        freq: str,
+        columns: Dict[str, np.ndarray],
+        start: int,
+        stop: int,
+    ) -> pd.DataFrame:
+        if not columns or start >= stop:
+            return pd.DataFrame(columns=["日期", "股票代码", *VALUE_COLUMNS])
+        dates = pd.to_datetime(np.asarray(columns[_TIMESTAMP][start:stop]), unit="s")
+        data = {"日期": dates.strftime(FREQUENCIES[freq][1]), "股票代码": symbol}
+        for column in VALUE_COLUMNS:
+            data[column] = np.array(columns[column][start:stop])
+        return pd.DataFrame(data)
+
+    def tail(
+        self,
+        symbol: str,
+        freq: str = "daily",
+        count: int = 30,
+        adjust: str = "qfq",
+        sync: bool = True,
+    ) -> pd.DataFrame:
+        """获取最近 count 根K线"""
+        return self._read(
+            normalize_code(symbol),
+            freq,
+            adjust,
+            sync,
+            lambda timestamps: (max(len(timestamps) - count, 0), len(timestamps)),
+        )
+
+    def range(
+        self,
+        symbol: str,
+        start: str,
+        end: str,
+        freq: str = "daily",
+        adjust: str = "qfq",
+        sync: bool = True,
+    ) -> pd.DataFrame:
+        """获取 [start, end] 区间内的K线（日期格式 YYYYMMDD 或 YYYY-MM-DD）"""
+        start_ts = pd.Timestamp(start).value // 10**9
+        # 结束日期包含当天全部分钟K线
+        end_ts = (pd.Timestamp(end) + pd.Timedelta(days=1)).value // 10**9
+        return self._read(
+            normalize_code(symbol),
+            freq,
+            adjust,
+            sync,
+            lambda timestamps: (
+                int(np.searchsorted(timestamps, start_ts, side="left")),
+                int(np.searchsorted(timestamps, end_ts, side="left")),
+            ),
+        )
+
+
+# 全局K线存储实例
+bar_store = BarStore()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+全市场逐笔大单索引
+逐笔大单表（ak.stock_fund_flow_big_deal）在共享缓存有效期内只抓取和解析一次，
+成交额向量化转换为数值，并按股票预先汇总买入/卖出金额和笔数，
+个股汇总与全市场排行均为直接查表。
+"""
+
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.tool.financial_deep_search.market_data import fetch_market_big_deal
+
+
+# 成交额中可能出现的单位
+_AMOUNT_UNITS = (("亿", 1e8), ("万", 1e4))
+
+
+def parse_amounts(series: pd.Series) -> np.ndarray:
+    """向量化解析成交额列（支持千分位和 万/亿 单位）"""
+    if series.dtype != object:
+        return pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64)
+
+    text = series.astype(str).str.replace(",", "", regex=False).str.strip()
+    multiplier = np.ones(len(text))
+    for unit, factor in _AMOUNT_UNITS:
+        has_unit = text.str.endswith(unit).to_numpy()
+        multiplier[has_unit] = factor
+        text = text.str.rstrip(unit)
+    return pd.to_numeric(text, errors="coerce").to_numpy(dtype=np.float64) * multiplier
+
+
+class _BigDealIndex(NamedTuple):
+    source: pd.DataFrame  # 索引对应的原始缓存表，用于判断是否需要重建
+    frame: pd.DataFrame  # 成交额已转为数值的逐笔大单表
+    codes: np.ndarray  # 股票代码（去重）
+    names: np.ndarray  # 股票简称
+    positions: Dict[str, int]  # 股票代码 -> 位置
+    inflow: np.ndarray  # 买盘成交额合计
+    outflow: np.ndarray  # 卖盘成交额合计
+    buy_count: np.ndarray
+    sell_count: np.ndarray
+    row_order: np.ndarray  # 按股票分组排列的行号
+    row_offsets: np.ndarray  # 每只股票在 row_order 中的起始位置
+    inflow_rank: np.ndarray  # 按买盘金额降序的股票位置
+    outflow_rank: np.ndarray  # 按卖盘金额降序的股票位置
+
+
+def _build_index(source: pd.DataFrame) -> _BigDealIndex:
+    frame = source.copy()
+    amounts = parse_amounts(frame["成交额"])
+    frame["成交额"] = amounts
+
+    positions_of_rows, codes = pd.factorize(frame["股票代码"].astype(str))
+    n = len(codes)
+    amounts = np.nan_to_num(amounts)
+    is_buy = (frame["大单性质"] == "买盘").to_numpy()
+    is_sell = (frame["大单性质"] == "卖盘").to_numpy()
+
+    inflow = np.bincount(positions_of_rows, weights=amounts * is_buy, minlength=n)
+    outflow = np.bincount(positions_of_rows, weights=amounts * is_sell, minlength=n)
+    buy_count = np.bincount(positions_of_rows[is_buy], minlength=n).astype(np.int64)
+    sell_count = np.bincount(positions_of_rows[is_sell], minlength=n).astype(np.int64)
+
+    row_order = np.argsort(positions_of_rows, kind="stable")
+    row_offsets = np.concatenate(
+        ([0], np.cumsum(np.bincount(positions_of_rows, minlength=n)))
+    )
+
+    # 每只股票取第一条记录的简称
+    names = frame["股票简称"].to_numpy()[row_order[row_offsets[:-1]]]
+
+    return _BigDealIndex(
+        source=source,
+        frame=frame,
+        codes=np.asarray(codes),
+        names=names,
+        positions={code: i for i, code in enumerate(codes)},
+        inflow=inflow,
+        outflow=outflow,
+        buy_count=buy_count,
+        sell_count=sell_count,
+        row_order=row_order,
+        row_offsets=row_offsets,
+        inflow_rank=np.argsort(-inflow, kind="stable"),
+        outflow_rank=np.argsort(-outflow, kind="stable"),
+    )
+
+
+class BigDealFeed:
+    """全市场逐笔大单：共享缓存 + 按股票预汇总的索引"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index: Optional[_BigDealIndex] = None
+
+    def refresh(self) -> bool:
+        """
+        确保索引与共享缓存中的大单表一致（缓存过期时重新抓取）
+
+        Returns:
+            bool: 是否有可用的大单数据
+        """
+        source = fetch_market_big_deal()
+        if source is None or source.empty:
+            return False
+
+        index = self._index
+        if index is not None and index.source is source:
+            return True
+
+        with self._lock:
+            if self._index is None or self._index.source is not source:
+                self._index = _build_index(source)
+        return True
+
+    @property
+    def _current(self) -> _BigDealIndex:
+        if self._index is None:
+            raise RuntimeError(
+                "big deal feed has not been loaded, call refresh() first"
+            )
+        return self._index
+
+    def market_summary(self) -> Dict[str, float]:
+        """全市场买盘/卖盘汇总（万元）"""
+        index = self._current
+        inflow, outflow = float(index.inflow.sum()), float(index.outflow.sum())
+        return {
+            "total_inflow_wan": round(inflow, 2),
+            "total_outflow_wan": round(outflow, 2),
+            "net_inflow_wan": round(inflow - outflow, 2),
+        }
+
+    def stock_summary(self, stock_code: str) -> Dict[str, Any]:
+        """个股大单汇总，无该股票的大单时返回空字典"""
+        index = self._current
+        pos = index.positions.get(str(stock_code))
+        if pos is None:
+            return {}
+        inflow, outflow = float(index.inflow[pos]), float(index.outflow[pos])
+        return {
+            "inflow_wan": round(inflow, 2),
+            "outflow_wan": round(outflow, 2),
+            "net_inflow_wan": round(inflow - outflow, 2),
+            "trade_count": int(index.row_offsets[pos + 1] - index.row_offsets[pos]),
+        }
+
+    def stock_samples(self, stock_code: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """个股逐笔大单记录（按原始顺序，最多 limit 条）"""
+        index = self._current
+        pos = index.positions.get(str(stock_code))
+        if pos is None:
+            return []
+        start = index.row_offsets[pos]
+        rows = index.row_order[start : min(start + limit, index.row_offsets[pos + 1])]
+        return index.frame.iloc[rows].to_dict(orient="records")
+
+    def samples(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """全市场逐笔大单记录（最多 limit 条）"""
+        return self._current.frame.head(limit).to_dict(orient="records")
+
+    def _top(self, side: str, limit: int) -> List[Dict[str, Any]]:
+        index = self._current
+        if side == "买盘":
+            rank, amounts, counts = index.inflow_rank, index.inflow, index.buy_count
+        else:
+            rank, amounts, counts = index.outflow_rank, index.outflow, index.sell_count
+
+        records = []
+        for pos in rank:
+            if len(records) >= limit:
+                break
+            if counts[pos] == 0:
+                continue
+            records.append(
+                {
+                    "股票代码": index.codes[pos],
+                    "股票简称": index.names[pos],
+                    "大单性质": side,
+                    "成交额": float(amounts[pos]),
+                }
+            )
+        return records
+
+    def top_inflow(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """买盘金额排行"""
+        return self._top("买盘", limit)
+
+    def top_outflow(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """卖盘金额排行"""
+        return self._top("卖盘", limit)
+
+
+# 全局大单索引实例
+big_deal_feed = BigDealFeed()
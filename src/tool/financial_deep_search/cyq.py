@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+本地筹码分布（CYQ）计算
+按换手率衰减模型由日K线计算筹码分布：当日成交的筹码按三角分布落在最低价与最高价之间
+（峰值在均价处），此前的筹码按当日换手率等比例衰减。
+整段历史以矩阵运算一次完成，指标列与 ak.stock_cyq_em 一致。
+"""
+
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# 价格网格的档位数
+DEFAULT_BINS = 150
+
+# 换手率上限，避免 log(1 - t) 溢出
+_MAX_TURNOVER = 0.999
+
+# (列名前缀, 下分位, 上分位)
+_CONCENTRATION_BANDS = (("90", 0.05, 0.95), ("70", 0.15, 0.85))
+
+
+def _price_grid(low: np.ndarray, high: np.ndarray, bins: int) -> np.ndarray:
+    lowest, highest = np.nanmin(low), np.nanmax(high)
+    if not highest > lowest:
+        highest = lowest + 0.01
+    return np.linspace(lowest, highest, bins)
+
+
+def _daily_profiles(
+    low: np.ndarray, high: np.ndarray, avg: np.ndarray, grid: np.ndarray
+) -> np.ndarray:
+    """每日成交筹码在价格网格上的三角分布（行和为 1）"""
+    price = grid[None, :]
+    low, high, avg = low[:, None], high[:, None], avg[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rising = np.where(avg > low, (price - low) / (avg - low), 1.0)
+        falling = np.where(high > avg, (high - price) / (high - avg), 1.0)
+    profiles = np.where(price <= avg, rising, falling)
+    profiles = np.where((price >= low) & (price <= high), np.clip(profiles, 0, 1), 0.0)
+
+    # 一字板等价格区间小于一档的情况，全部放在最接近均价的档位
+    totals = profiles.sum(axis=1)
+    empty = totals <= 0
+    if empty.any():
+        nearest = np.abs(grid[None, :] - avg[empty]).argmin(axis=1)
+        profiles[np.flatnonzero(empty), nearest] = 1.0
+        totals = profiles.sum(axis=1)
+    return profiles / totals[:, None]
+
+
+def _decay_weights(turnover: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    各目标日上每个历史交易日成交筹码的剩余权重（len(targets) × n）
+
+    第 i 日成交的筹码到第 k 日剩余 t_i * Π_{i<j<=k}(1 - t_j)，用对数累加一次算出。
+    """
+    log_keep = np.cumsum(np.log1p(-turnover))
+    exponent = np.minimum(log_keep[targets][:, None] - log_keep[None, :], 0.0)
+    weights = turnover[None, :] * np.exp(exponent)
+    weights[np.arange(len(turnover))[None, :] > targets[:, None]] = 0.0
+    return weights
+
+
+def _valid_bars(bars: pd.DataFrame) -> pd.DataFrame:
+    frame = bars.dropna(subset=["开盘", "收盘", "最高", "最低"])
+    return frame[(frame["最低"] > 0) & (frame["最高"] >= frame["最低"])]
+
+
+def chip_distribution(
+    bars: pd.DataFrame, days: int = 1, bins: int = DEFAULT_BINS
+) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """
+    计算最近 days 个交易日每日收盘后的筹码分布
+
+    Args:
+        bars: 日K线（日期、开盘、收盘、最高、最低、换手率，按日期升序）
+        days: 输出的交易日数
+        bins: 价格网格档位数
+
+    Returns:
+        tuple: (对应的 days 根K线, 价格网格, days × bins 的筹码分布，每行和为 1)
+    """
+    frame = _valid_bars(bars)
+    if frame.empty:
+        raise ValueError("没有可用于计算筹码分布的K线")
+
+    turnover = pd.to_numeric(frame["换手率"], errors="coerce").to_numpy(dtype=np.float64)
+    if np.isnan(turnover).all():
+        raise ValueError("K线缺少换手率，无法计算筹码分布")
+    turnover = np.clip(np.nan_to_num(turnover) / 100.0, 0.0, _MAX_TURNOVER)
+
+    low = frame["最低"].to_numpy(dtype=np.float64)
+    high = frame["最高"].to_numpy(dtype=np.float64)
+    avg = frame[["开盘", "收盘", "最高", "最低"]].to_numpy(dtype=np.float64).mean(axis=1)
+
+    grid = _price_grid(low, high, bins)
+    profiles = _daily_profiles(low, high, avg, grid)
+
+    n = len(frame)
+    targets = np.arange(max(n - days, 0), n)
+    distributions = _decay_weights(turnover, targets) @ profiles
+    totals = distributions.sum(axis=1, keepdims=True)
+    distributions = np.divide(
+        distributions, totals, out=np.zeros_like(distributions), where=totals > 0
+    )
+    return frame.iloc[targets], grid, distributions
+
+
+def _percentile_prices(
+    grid: np.ndarray, distributions: np.ndarray, quantiles: np.ndarray
+) -> np.ndarray:
+    """筹码累计比例首次达到各分位时的价格（days × len(quantiles)）"""
+    cumulative = np.cumsum(distributions, axis=1)
+    index = (cumulative[:, None, :] >= quantiles[None, :, None]).argmax(axis=2)
+    return grid[index]
+
+
+def _price_profile(
+    grid: np.ndarray, distribution: np.ndarray, buckets: int
+) -> List[Dict[str, Any]]:
+    """筹码分布按价格区间汇总（只保留占比不低于 0.5% 的区间）"""
+    edges = np.linspace(grid[0], grid[-1], buckets + 1)
+    bucket_of = np.clip(np.searchsorted(edges, grid, side="right") - 1, 0, buckets - 1)
+    shares = np.bincount(bucket_of, weights=distribution, minlength=buckets)
+    return [
+        {
+            "价格区间": f"{edges[i]:.2f}-{edges[i + 1]:.2f}",
+            "筹码占比": round(float(shares[i]) * 100, 2),
+        }
+        for i in range(buckets)
+        if shares[i] >= 0.005
+    ]
+
+
+def compute_cyq(
+    bars: pd.DataFrame, days: int = 5, buckets: int = 10, bins: int = DEFAULT_BINS
+) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """
+    计算最近 days 个交易日的筹码指标和最新筹码分布
+
+    指标列与 ak.stock_cyq_em 一致（比例为 0~1 的小数）：平均成本为筹码累计 50% 处的价格，
+    集中度 = (上分位价 - 下分位价) / (上分位价 + 下分位价)。
+
+    Returns:
+        tuple: (每日筹码指标, 最新筹码分布按 buckets 个价格区间的汇总)
+    """
+    recent, grid, distributions = chip_distribution(bars, days, bins)
+    close = recent["收盘"].to_numpy(dtype=np.float64)
+
+    quantiles = np.array(
+        [0.5] + [q for _, low, high in _CONCENTRATION_BANDS for q in (low, high)]
+    )
+    prices = _percentile_prices(grid, distributions, quantiles)
+
+    metrics = {
+        "日期": recent["日期"].to_numpy(),
+        "获利比例": (distributions * (grid[None, :] <= close[:, None])).sum(axis=1),
+        "平均成本": prices[:, 0],
+    }
+    for band, (name, _, _) in enumerate(_CONCENTRATION_BANDS):
+        low, high = prices[:, 1 + 2 * band], prices[:, 2 + 2 * band]
+        metrics[f"{name}成本-低"] = low
+        metrics[f"{name}成本-高"] = high
+        metrics[f"{name}集中度"] = (high - low) / (high + low)
+
+    profile = _price_profile(grid, distributions[-1], buckets)
+    return pd.DataFrame(metrics).round(4), profile
+
+
+def summarize_cyq(metrics: pd.DataFrame, analysis_days: int = 5) -> Dict[str, Any]:
+    """
+    最新筹码指标及 analysis_days 内的变化（比例换算为百分数）
+
+    Returns:
+        dict: 获利比例、平均成本、集中度、成本区间，以及平均成本和90%集中度的变化
+    """
+    window = metrics.tail(max(analysis_days, 1))
+    latest = window.iloc[-1]
+    concentration_90 = window["90集中度"] * 100
+    return {
+        "date": str(latest["日期"]),
+        "profit_ratio": round(float(latest["获利比例"]) * 100, 2),
+        "average_cost": round(float(latest["平均成本"]), 2),
+        "concentration_90": round(float(latest["90集中度"]) * 100, 2),
+        "concentration_70": round(float(latest["70集中度"]) * 100, 2),
+        "cost_range_90": [
+            round(float(latest["90成本-低"]), 2),
+            round(float(latest["90成本-高"]), 2),
+        ],
+        "cost_range_70": [
+            round(float(latest["70成本-低"]), 2),
+            round(float(latest["70成本-高"]), 2),
+        ],
+        "cost_change": round(
+            float(window["平均成本"].iloc[-1] - window["平均成本"].iloc[0]), 2
+        ),
+        "concentration_change": round(
+            float(concentration_90.iloc[-1] - concentration_90.iloc[0]), 2
+        ),
+        "concentration_std": round(float(concentration_90.std(ddof=0)), 2),
+        "days": len(window),
+    }
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+财务报表缓存与指标摘要
+财务报表最多按季度更新，按 股票代码 + 数据周期 + 最近报告期 缓存（落盘）；
+并从三大报表中预先计算杠杆、现金覆盖和增长等核心指标。
+"""
+
+import math
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from src.utils.cache import data_cache
+
+
+# 最新报告期尚未披露时，缓存多久后重新抓取（秒）
+INCOMPLETE_CACHE_TTL = 24 * 3600
+
+# 金额单位
+_UNITS = (("万亿", 1e12), ("亿", 1e8), ("万", 1e4))
+
+# 指标对应的同花顺报表科目（去掉前缀 * 后匹配，按顺序取第一个存在的科目）
+_TOTAL_ASSETS = ("资产合计", "资产总计")
+_TOTAL_LIABILITIES = ("负债合计",)
+_TOTAL_EQUITY = ("所有者权益（或股东权益）合计", "股东权益合计", "所有者权益合计")
+_REVENUE = ("营业总收入", "营业收入")
+_NET_PROFIT = ("净利润",)
+_OPERATING_CASH_FLOW = ("经营活动产生的现金流量净额",)
+
+
+def latest_report_period(period: str = "按年度", today: Optional[date] = None) -> str:
+    """
+    最近一个已结束的报告期（YYYY-MM-DD）
+
+    按年度时为上一年年末，其余周期为最近结束的季度末。
+    """
+    today = today or date.today()
+    if period == "按年度":
+        return f"{today.year - 1}-12-31"
+
+    quarter_ends = ((3, 31), (6, 30), (9, 30))
+    for month, day in reversed(quarter_ends):
+        if (today.month, today.day) > (month, day):
+            return f"{today.year}-{month:02d}-{day:02d}"
+    return f"{today.year - 1}-12-31"
+
+
+def _normalize_report_date(value: Any) -> str:
+    """将报告期统一为 YYYY-MM-DD（按年度数据只有年份）"""
+    text = str(value or "").strip()
+    if re.fullmatch(r"\d{4}", text):
+        return f"{text}-12-31"
+    return text[:10]
+
+
+def parse_amount(value: Any) -> Optional[float]:
+    """解析同花顺报表数值（如 '1.23亿'、'-456.70万'、'12.5%'），无法解析时返回 None"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return None if math.isnan(value) else float(value)
+
+    text = str(value).strip().replace(",", "")
+    multiplier = 1.0
+    if text.endswith("%"):
+        text, multiplier = text[:-1], 0.01
+    else:
+        for unit, factor in _UNITS:
+            if text.endswith(unit):
+                text, multiplier = text[: -len(unit)], factor
+                break
+    try:
+        return float(text) * multiplier
+    except ValueError:
+        return None
+
+
+def _find_item(record: Dict[str, Any], names) -> Optional[float]:
+    items = {str(key).lstrip("*"): value for key, value in record.items()}
+    for name in names:
+        if name in items:
+            return parse_amount(items[name])
+    return None
+
+
+def _ratio(numerator: Optional[float], denominator: Optional[float]) -> Optional[float]:
+    if numerator is None or not denominator:
+        return None
+    return round(numerator / denominator, 4)
+
+
+def _growth(current: Optional[float], previous: Optional[float]) -> Optional[float]:
+    if current is None or not previous:
+        return None
+    return round((current - previous) / abs(previous), 4)
+
+
+def _by_report_date(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {_normalize_report_date(record.get("报告期")): record for record in records}
+
+
+def _year_earlier(report_date: str) -> str:
+    return f"{int(report_date[:4]) - 1}{report_date[4:]}"
+
+
+def summarize_financial_ratios(
+    balance_sheet: List[Dict[str, Any]],
+    income_statement: List[Dict[str, Any]],
+    cash_flow: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    计算最近报告期的核心财务指标
+
+    Returns:
+        dict: 资产负债率、产权比率、经营现金流覆盖率和同比增长率，缺少科目的指标为 None
+    """
+    balance = _by_report_date(balance_sheet)
+    income = _by_report_date(income_statement)
+    cash = _by_report_date(cash_flow)
+
+    report_dates = sorted(set(balance) | set(income) | set(cash), reverse=True)
+    if not report_dates:
+        return {}
+
+    latest = report_dates[0]
+    previous = _year_earlier(latest)
+    latest_balance = balance.get(latest, {})
+    latest_income = income.get(latest, {})
+    previous_income = income.get(previous, {})
+
+    total_liabilities = _find_item(latest_balance, _TOTAL_LIABILITIES)
+    net_profit = _find_item(latest_income, _NET_PROFIT)
+    operating_cash_flow = _find_item(cash.get(latest, {}), _OPERATING_CASH_FLOW)
+
+    return {
+        "报告期": latest,
+        "资产负债率": _ratio(total_liabilities, _find_item(latest_balance, _TOTAL_ASSETS)),
+        "产权比率": _ratio(total_liabilities, _find_item(latest_balance, _TOTAL_EQUITY)),
+        "经营现金流/净利润": _ratio(operating_cash_flow, net_profit),
+        "经营现金流/负债合计": _ratio(operating_cash_flow, total_liabilities),
+        "营业收入同比": _growth(
+            _find_item(latest_income, _REVENUE), _find_item(previous_income, _REVENUE)
+        ),
+        "净利润同比": _growth(net_profit, _find_item(previous_income, _NET_PROFIT)),
+    }
+
+
+class FinancialStatementCache:
+    """财务报表缓存，按 股票代码 + 数据周期 + 最近报告期 存入分层数据缓存"""
+
+    @staticmethod
+    def _key(stock_code: str, period: str) -> str:
+        return f"{stock_code}:{period}:{latest_report_period(period)}"
+
+    def load(self, stock_code: str, period: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存的财务报表
+
+        最新报告期尚未出现在缓存中（报表未披露）时，缓存只在 INCOMPLETE_CACHE_TTL 内有效。
+        """
+        return data_cache.get("statements", self._key(stock_code, period))
+
+    def save(self, stock_code: str, period: str, reports: Dict[str, Any]) -> None:
+        """保存财务报表，已包含最近报告期的报表不再过期"""
+        report_date = latest_report_period(period)
+        dates = [
+            _normalize_report_date(record.get("报告期"))
+            for record in reports.get("资产负债表", [])
+        ]
+        complete = bool(dates) and max(dates) >= report_date
+        data_cache.set(
+            "statements",
+            self._key(stock_code, period),
+            reports,
+            ttl=None if complete else INCOMPLETE_CACHE_TTL,
+        )
+
+
+# 全局财务报表缓存实例
+financial_statement_cache = FinancialStatementCache()
@@ -1,9 +1,11 @@
+import asyncio
 import json
-import time
 import traceback
 from datetime import datetime
 
-import requests
+from src.tool.financial_deep_search.http_client import http_client, run_with_client
+from src.utils.cache import cached
+from src.utils.single_flight import single_flight
 
 
 ### 每日热门板块爬取
@@ -30,22 +32,22 @@ def parse_jsonp(jsonp_str):
     return None
 
 
-def fetch_data(sector_type, url, max_retries=3, retry_delay=2):
+async def fetch_data(sector_type, url, max_retries=3, retry_delay=2):
     for attempt in range(1, max_retries + 1):
         try:
-            resp = requests.get(url, headers=HEADERS, timeout=15)
-            resp.raise_for_status()
-            data = parse_jsonp(resp.text)
+            text = await http_client.get_text(url, headers=HEADERS)
+            data = parse_jsonp(text)
             if not data:
                 print(f"解析{sector_type}数据失败")
                 return []
             return data.get("data", {}).get("diff", [])
         except Exception as e:
             print(f"获取{sector_type}数据失败: {e} (第{attempt}次尝试)")
-            if attempt < max_retries:
-                time.sleep(retry_delay)
-            else:
+            if attempt == max_retries or not await http_client.backoff(
+                attempt, retry_delay
+            ):
                 return []
+    return []
 
 
 def simplify_sector_item(item):
@@ -67,7 +69,15 @@ def simplify_sector_item(item):
     }
 
 
-def get_all_section(sector_types=None):
+@cached("sectors", cache_if=bool)
+async def fetch_sector(sector_type):
+    """获取单类板块数据（解析后的结果按板块类型缓存，各调用方共享）"""
+    raw_list = await fetch_data(sector_type, API_URLS[sector_type])
+    return [simplify_sector_item(item) for item in raw_list if item]
+
+
+@single_flight()
+async def get_all_section(sector_types=None):
     """
     获取所有类型板块数据，包括热门板块、概念板块、行业板块和地域板块
 
@@ -106,14 +116,11 @@ def get_all_section(sector_types=None):
         if not valid_types:
             return {"success": False, "message": "没有提供有效的板块类型", "data": {}}
 
-        # 获取数据
-        all_data = {}
-        for sector_type in valid_types:
-            url = API_URLS[sector_type]
-            raw_list = fetch_data(sector_type, url)
-            all_data[sector_type] = [
-                simplify_sector_item(item) for item in raw_list if item
-            ]
+        # 并发获取各类板块数据
+        sectors = await asyncio.gather(
+            *(fetch_sector(sector_type) for sector_type in valid_types)
+        )
+        all_data = dict(zip(valid_types, sectors))
 
         # 准备返回结果
         result = {
@@ -142,10 +149,10 @@ def main():
     # 如果提供了参数，尝试按照参数获取特定板块
     if len(sys.argv) > 1:
         sector_types = sys.argv[1]
-        result = get_all_section(sector_types=sector_types)
+        result = run_with_client(get_all_section(sector_types=sector_types))
     else:
         # 否则获取所有板块
-        result = get_all_section()
+        result = run_with_client(get_all_section())
 
     # 打印结果
     print(json.dumps(result, ensure_ascii=False, indent=2))
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+东方财富接口共享异步 HTTP 客户端
+所有请求复用同一个 keep-alive 连接池，按主机限制并发并遵守主机限流间隔；
+重试等待不阻塞事件循环，超时时间不会超过调用方通过 deadline() 设置的截止时间。
+"""
+
+import asyncio
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Mapping, Optional
+
+import aiohttp
+
+from src.config import config
+from src.utils.rate_limit import host_limiter
+from src.utils.single_flight import flights, freeze
+
+
+# 当前上下文的请求截止时间（time.monotonic），None 表示不限制
+_deadline: ContextVar[Optional[float]] = ContextVar("http_deadline", default=None)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """调用方设置的截止时间已到"""
+
+
+@contextmanager
+def deadline(seconds: float):
+    """
+    在上下文内发起的请求（含重试等待）共享同一截止时间
+
+    嵌套使用时以更早的截止时间为准。
+    """
+    expires_at = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        expires_at = min(expires_at, current)
+    token = _deadline.set(expires_at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """距截止时间的剩余秒数，未设置截止时间时返回 None"""
+    expires_at = _deadline.get()
+    if expires_at is None:
+        return None
+    return expires_at - time.monotonic()
+
+
+class AsyncHttpClient:
+    """共享连接池的异步 HTTP 客户端（会话按事件循环惰性创建）"""
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        pool_size: Optional[int] = None,
+        host_concurrency: Optional[int] = None,
+    ):
+        self._timeout = timeout
+        self._pool_size = pool_size
+        self._host_concurrency = host_concurrency
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def timeout(self) -> float:
+        if self._timeout is not None:
+            return self._timeout
+        return config.data_config.http_timeout
+
+    @property
+    def pool_size(self) -> int:
+        if self._pool_size is not None:
+            return self._pool_size
+        return config.data_config.http_pool_size
+
+    @property
+    def host_concurrency(self) -> int:
+        if self._host_concurrency is not None:
+            return self._host_concurrency
+        return config.data_config.http_host_concurrency
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # 会话与信号量绑定事件循环，切换循环（如多次 asyncio.run）时重新创建
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size, ttl_dns_cache=300, keepalive_timeout=30
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._loop = loop
+            self._host_semaphores = {}
+        return self._session
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.host_concurrency)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    def _request_timeout(self, timeout: Optional[float]) -> float:
+        timeout = timeout if timeout is not None else self.timeout
+        remaining = remaining_time()
+        if remaining is None:
+            return timeout
+        if remaining <= 0:
+            raise DeadlineExceeded("请求截止时间已到")
+        return min(timeout, remaining)
+
+    async def get_text(
+        self,
+        url: str,
+        params: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """
+        发起一次 GET 请求并返回响应文本（不重试）
+
+        URL、参数和请求头相同的并发请求合并为一次（见 single_flight），
+        合并后的等待方仍受各自截止时间的约束。
+
+        Raises:
+            aiohttp.ClientError: 请求失败或状态码异常
+            asyncio.TimeoutError: 请求超时或截止时间已到
+        """
+        request = flights.do(
+            (f"GET {url}", freeze(params), freeze(headers)),
+            lambda: self._get_text(url, params, headers, timeout),
+        )
+        remaining = remaining_time()
+        if remaining is None:
+            return await request
+        return await asyncio.wait_for(request, max(remaining, 0))
+
+    async def _get_text(
+        self,
+        url: str,
+        params: Optional[Mapping[str, Any]],
+        headers: Optional[Mapping[str, str]],
+        timeout: Optional[float],
+    ) -> str:
+        session = self._get_session()
+        async with self._semaphore(host_limiter.host_of(url)):
+            await host_limiter.acquire(url)
+            client_timeout = aiohttp.ClientTimeout(total=self._request_timeout(timeout))
+            async with session.get(
+                url, params=params, headers=headers, timeout=client_timeout
+            ) as resp:
+                resp.raise_for_status()
+                return await resp.text()
+
+    async def get_json(
+        self,
+        url: str,
+        params: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """发起一次 GET 请求并按 JSON 解析响应（不重试）"""
+        text = await self.get_text(url, params=params, headers=headers, timeout=timeout)
+        return json.loads(text)
+
+    @staticmethod
+    async def backoff(attempt: int, retry_delay: float) -> bool:
+        """
+        第 attempt 次失败后按指数退避等待
+
+        Returns:
+            bool: 是否还有时间发起下一次请求（截止时间已到时返回 False）
+        """
+        delay = retry_delay * 2 ** (attempt - 1)
+        remaining = remaining_time()
+        if remaining is not None and remaining <= delay:
+            return False
+        await asyncio.sleep(delay)
+        return True
+
+    async def close(self) -> None:
+        """关闭连接池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+        self._host_semaphores = {}
+
+
+def run_with_client(coro):
+    """在新事件循环中运行协程并在结束后关闭连接池（供命令行入口使用）"""
+
+    async def _run():
+        try:
+            return await coro
+        finally:
+            await http_client.close()
+
+    return asyncio.run(_run())
+
+
+# 全局客户端实例
+http_client = AsyncHttpClient()
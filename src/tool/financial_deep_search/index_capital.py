@@ -13,7 +13,8 @@ import time
 import traceback
 from datetime import datetime
 
-import requests
+from src.utils.cache import cached
+from src.tool.financial_deep_search.http_client import http_client, run_with_client
 
 
 # API URL - 上证指数(000001)资金流向
@@ -82,7 +83,7 @@ def parse_jsonp(jsonp_str):
         return None
 
 
-def fetch_index_capital_flow(index_code="000001", max_retries=3, retry_delay=2):
+async def fetch_index_capital_flow(index_code="000001", max_retries=3, retry_delay=2):
     """
     获取指数资金流向数据
 
@@ -113,15 +114,15 @@ def fetch_index_capital_flow(index_code="000001", max_retries=3, retry_delay=2):
     # 请求数据
     for attempt in range(1, max_retries + 1):
         try:
-            resp = requests.get(url, headers=HEADERS, timeout=15)
-            resp.raise_for_status()
+            text = await http_client.get_text(url, headers=HEADERS)
 
             # 解析响应数据
-            data = parse_jsonp(resp.text)
+            data = parse_jsonp(text)
             if not data:
                 print(f"解析指数资金流向数据失败 (第{attempt}次尝试)")
-                if attempt < max_retries:
-                    time.sleep(retry_delay)
+                if attempt < max_retries and await http_client.backoff(
+                    attempt, retry_delay
+                ):
                     continue
                 return None
 
@@ -129,8 +130,9 @@ def fetch_index_capital_flow(index_code="000001", max_retries=3, retry_delay=2):
             flow_data = data.get("data", {})
             if not flow_data:
                 print(f"未获取到指数资金流向数据 (第{attempt}次尝试)")
-                if attempt < max_retries:
-                    time.sleep(retry_delay)
+                if attempt < max_retries and await http_client.backoff(
+                    attempt, retry_delay
+                ):
                     continue
                 return None
 
@@ -139,9 +141,9 @@ def fetch_index_capital_flow(index_code="000001", max_retries=3, retry_delay=2):
 
         except Exception as e:
             print(f"获取指数资金流向数据失败: {e} (第{attempt}次尝试)")
-            if attempt < max_retries:
-                time.sleep(retry_delay)
-            else:
+            if attempt == max_retries or not await http_client.backoff(
+                attempt, retry_delay
+            ):
                 return None
 
 
@@ -198,7 +200,8 @@ def process_flow_data(data, index_code):
     return result
 
 
-def get_index_capital_flow(index_code="000001"):
+@cached("capital_flow", cache_if=lambda result: bool(result.get("success")))
+async def get_index_capital_flow(index_code="000001"):
     """
     获取指数资金流向数据
 
@@ -210,7 +213,7 @@ def get_index_capital_flow(index_code="000001"):
     """
     try:
         # 获取数据
-        flow_data = fetch_index_capital_flow(index_code)
+        flow_data = await fetch_index_capital_flow(index_code)
 
         if not flow_data:
             return {
@@ -252,10 +255,10 @@ def main():
     # 如果提供了参数，尝试按照参数获取特定指数的资金流向
     if len(sys.argv) > 1:
         index_code = sys.argv[1]
-        result = get_index_capital_flow(index_code=index_code)
+        result = run_with_client(get_index_capital_flow(index_code=index_code))
     else:
         # 否则获取上证指数资金流向
-        result = get_index_capital_flow()
+        result = run_with_client(get_index_capital_flow())
 
     # 打印结果
     print(json.dumps(result, ensure_ascii=False, indent=2))
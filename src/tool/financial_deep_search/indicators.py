@@ -0,0 +1,353 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+技术指标计算
+由K线（日期、开盘、收盘、最高、最低、成交量）计算均线、MACD、RSI、KDJ、布林带、ATR、量比
+以及支撑/阻力位。滑动窗口类指标用 NumPy 窗口视图整列计算，递推类指标（EMA 及其衍生）
+使用 pandas 的 ewm，均不逐行循环，历史长度不受限制。
+参数与通达信/同花顺的默认公式一致。
+"""
+
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+MA_WINDOWS = (5, 10, 20, 60)
+EMA_SPANS = (12, 26)
+RSI_WINDOWS = (6, 12, 24)
+
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+KDJ_WINDOW, KDJ_SMOOTH = 9, 3
+BOLL_WINDOW, BOLL_WIDTH = 20, 2
+ATR_WINDOW = 14
+VOLUME_RATIO_WINDOW = 5
+
+# 判断金叉/死叉时回看的K线数
+CROSS_LOOKBACK = 3
+
+
+def _pad(values: np.ndarray, length: int) -> np.ndarray:
+    """窗口结果前补 NaN，与原序列对齐"""
+    return np.concatenate([np.full(length - len(values), np.nan), values])
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    if len(values) < window:
+        return np.full(len(values), np.nan)
+    return _pad(sliding_window_view(values, window).mean(axis=1), len(values))
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """滚动样本标准差（与通达信 STD 一致）"""
+    if len(values) < window:
+        return np.full(len(values), np.nan)
+    return _pad(sliding_window_view(values, window).std(axis=1, ddof=1), len(values))
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    if len(values) < window:
+        return np.full(len(values), np.nan)
+    return _pad(sliding_window_view(values, window).max(axis=1), len(values))
+
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    if len(values) < window:
+        return np.full(len(values), np.nan)
+    return _pad(sliding_window_view(values, window).min(axis=1), len(values))
+
+
+def ema(values: np.ndarray, span: int) -> np.ndarray:
+    """指数移动平均 EMA(X, N)"""
+    return pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy(copy=True)
+
+
+def wilder(values: np.ndarray, window: int) -> np.ndarray:
+    """平滑移动平均 SMA(X, N, 1)"""
+    return (
+        pd.Series(values)
+        .ewm(alpha=1.0 / window, adjust=False)
+        .mean()
+        .to_numpy(copy=True)
+    )
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return np.divide(
+        numerator,
+        denominator,
+        out=np.full(len(numerator), np.nan),
+        where=np.nan_to_num(denominator) != 0,
+    )
+
+
+def _ohlcv(bars: pd.DataFrame) -> Dict[str, np.ndarray]:
+    frame = bars.dropna(subset=["收盘", "最高", "最低"])
+    columns = {"open": "开盘", "close": "收盘", "high": "最高", "low": "最低", "volume": "成交量"}
+    arrays = {
+        key: pd.to_numeric(frame[column], errors="coerce").to_numpy(dtype=np.float64)
+        if column in frame
+        else np.full(len(frame), np.nan)
+        for key, column in columns.items()
+    }
+    arrays["date"] = frame["日期"].astype(str).to_numpy()
+    return arrays
+
+
+def compute_indicators(bars: pd.DataFrame) -> pd.DataFrame:
+    """
+    计算整段K线的技术指标序列
+
+    Args:
+        bars: K线（日期、开盘、收盘、最高、最低、成交量，按时间升序）
+
+    Returns:
+        pd.DataFrame: 日期、收盘及各指标列（数据不足的位置为 NaN）
+    """
+    data = _ohlcv(bars)
+    if len(data["close"]) == 0:
+        return pd.DataFrame()
+    close, high, low, volume = data["close"], data["high"], data["low"], data["volume"]
+    prev_close = np.concatenate([[np.nan], close[:-1]])
+
+    result: Dict[str, np.ndarray] = {"日期": data["date"], "收盘": close}
+
+    for window in MA_WINDOWS:
+        result[f"MA{window}"] = rolling_mean(close, window)
+    for span in EMA_SPANS:
+        result[f"EMA{span}"] = ema(close, span)
+
+    # MACD
+    dif = ema(close, MACD_FAST) - ema(close, MACD_SLOW)
+    dea = ema(dif, MACD_SIGNAL)
+    result["DIF"], result["DEA"], result["MACD"] = dif, dea, 2 * (dif - dea)
+
+    # RSI = SMA(MAX(C - LC, 0), N, 1) / SMA(ABS(C - LC), N, 1) * 100，从第二根K线开始平滑
+    change = np.diff(close)
+    for window in RSI_WINDOWS:
+        rsi = _pad(
+            _ratio(
+                wilder(np.maximum(change, 0), window), wilder(np.abs(change), window)
+            )
+            * 100,
+            len(close),
+        )
+        rsi[:window] = np.nan
+        result[f"RSI{window}"] = rsi
+
+    # KDJ
+    lowest, highest = rolling_min(low, KDJ_WINDOW), rolling_max(high, KDJ_WINDOW)
+    rsv = np.nan_to_num(_ratio(close - lowest, highest - lowest) * 100, nan=50.0)
+    k = wilder(rsv, KDJ_SMOOTH)
+    d = wilder(k, KDJ_SMOOTH)
+    warmup = min(KDJ_WINDOW - 1, len(close))
+    for values in (k, d):
+        values[:warmup] = np.nan
+    result["K"], result["D"], result["J"] = k, d, 3 * k - 2 * d
+
+    # 布林带
+    mid = rolling_mean(close, BOLL_WINDOW)
+    width = BOLL_WIDTH * rolling_std(close, BOLL_WINDOW)
+    result["BOLL_MID"] = mid
+    result["BOLL_UP"] = mid + width
+    result["BOLL_LOW"] = mid - width
+
+    # ATR = MA(MAX(H - L, |H - LC|, |L - LC|), N)
+    true_range = np.fmax(
+        high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close))
+    )
+    result["ATR"] = rolling_mean(true_range, ATR_WINDOW)
+
+    # 量比：当前成交量 / 此前 N 根K线平均成交量
+    previous_volume = np.concatenate(
+        [[np.nan], rolling_mean(volume, VOLUME_RATIO_WINDOW)[:-1]]
+    )
+    result["VOL_RATIO"] = _ratio(volume, previous_volume)
+    result["VOL_MA5"] = rolling_mean(volume, 5)
+    result["VOL_MA10"] = rolling_mean(volume, 10)
+    result["VOL_MA5_10"] = _ratio(result["VOL_MA5"], result["VOL_MA10"])
+
+    return pd.DataFrame(result)
+
+
+def support_resistance(
+    bars: pd.DataFrame, window: int = 60, swing: int = 3, levels: int = 3
+) -> Dict[str, Any]:
+    """
+    支撑位与阻力位
+
+    摆动高/低点为前后 swing 根K线内的最高/最低价；取最近 window 根K线中低于收盘价
+    最近的 levels 个摆动低点作为支撑、高于收盘价最近的 levels 个摆动高点作为阻力，
+    并附经典枢轴点（P = (H + L + C) / 3）。
+    """
+    data = _ohlcv(bars)
+    close = data["close"][-window:]
+    high = data["high"][-window:]
+    low = data["low"][-window:]
+    if len(close) == 0:
+        return {}
+    current = close[-1]
+
+    span = 2 * swing + 1
+    swing_highs = swing_lows = np.array([])
+    if len(close) >= span:
+        centre = slice(swing, len(close) - swing)
+        swing_highs = high[centre][
+            high[centre] >= sliding_window_view(high, span).max(axis=1)
+        ]
+        swing_lows = low[centre][
+            low[centre] <= sliding_window_view(low, span).min(axis=1)
+        ]
+
+    supports = np.unique(swing_lows[swing_lows < current])[::-1][:levels]
+    resistances = np.unique(swing_highs[swing_highs > current])[:levels]
+
+    pivot = (high[-1] + low[-1] + current) / 3
+    return {
+        "support": [round(float(price), 2) for price in supports],
+        "resistance": [round(float(price), 2) for price in resistances],
+        f"high_{len(close)}": round(float(np.nanmax(high)), 2),
+        f"low_{len(close)}": round(float(np.nanmin(low)), 2),
+        "pivot": {
+            "P": round(float(pivot), 2),
+            "R1": round(float(2 * pivot - low[-1]), 2),
+            "S1": round(float(2 * pivot - high[-1]), 2),
+        },
+    }
+
+
+def _value(
+    frame: pd.DataFrame, column: str, row: int = -1, digits: int = 2
+) -> Optional[float]:
+    value = frame[column].iloc[row]
+    return None if pd.isna(value) else round(float(value), digits)
+
+
+def _cross(fast: np.ndarray, slow: np.ndarray, lookback: int) -> Optional[str]:
+    """最近 lookback 根K线内 fast 上穿/下穿 slow"""
+    diff = (fast - slow)[-(lookback + 1) :]
+    diff = diff[~np.isnan(diff)]
+    if len(diff) < 2:
+        return None
+    signs = np.sign(diff)
+    if signs[-1] > 0 and (signs[:-1] <= 0).any():
+        return "金叉"
+    if signs[-1] < 0 and (signs[:-1] >= 0).any():
+        return "死叉"
+    return None
+
+
+def _ma_alignment(values: Sequence[Optional[float]]) -> str:
+    if any(value is None for value in values):
+        return "数据不足"
+    if all(a > b for a, b in zip(values, values[1:])):
+        return "多头排列"
+    if all(a < b for a, b in zip(values, values[1:])):
+        return "空头排列"
+    return "交织"
+
+
+def _zone(value: Optional[float], low: float, high: float) -> Optional[str]:
+    if value is None:
+        return None
+    if value >= high:
+        return "超买"
+    if value <= low:
+        return "超卖"
+    return "中性"
+
+
+def indicator_snapshot(bars: pd.DataFrame, recent: int = 5) -> Dict[str, Any]:
+    """
+    最新一根K线的指标快照及信号
+
+    Args:
+        bars: K线（按时间升序）
+        recent: 附带的最近K线条数（日期、收盘、涨跌幅、量比）
+
+    Returns:
+        dict: 价格、均线、MACD、RSI、KDJ、布林带、ATR、成交量、支撑阻力及信号摘要
+    """
+    frame = compute_indicators(bars)
+    if frame.empty:
+        return {}
+
+    close = frame["收盘"].to_numpy()
+    current = float(close[-1])
+    ma = {f"MA{window}": _value(frame, f"MA{window}") for window in MA_WINDOWS}
+    dif, dea = frame["DIF"].to_numpy(), frame["DEA"].to_numpy()
+    k, d = frame["K"].to_numpy(), frame["D"].to_numpy()
+
+    boll_up, boll_low = _value(frame, "BOLL_UP"), _value(frame, "BOLL_LOW")
+    boll_position = (
+        round((current - boll_low) / (boll_up - boll_low) * 100, 1)
+        if boll_up is not None and boll_low is not None and boll_up > boll_low
+        else None
+    )
+    atr = _value(frame, "ATR", digits=3)
+
+    def change(rows: int) -> Optional[float]:
+        if len(close) <= rows or not close[-rows - 1]:
+            return None
+        return round((current / close[-rows - 1] - 1) * 100, 2)
+
+    recent_rows = frame.tail(recent)
+    pct_change = frame["收盘"].pct_change() * 100
+    return {
+        "date": str(frame["日期"].iloc[-1]),
+        "bars": len(frame),
+        "close": round(current, 2),
+        "change_pct": {"1": change(1), "5": change(5), "20": change(20)},
+        "ma": {**ma, "EMA12": _value(frame, "EMA12"), "EMA26": _value(frame, "EMA26")},
+        "macd": {
+            "DIF": _value(frame, "DIF", digits=3),
+            "DEA": _value(frame, "DEA", digits=3),
+            "MACD": _value(frame, "MACD", digits=3),
+        },
+        "rsi": {
+            f"RSI{window}": _value(frame, f"RSI{window}") for window in RSI_WINDOWS
+        },
+        "kdj": {
+            "K": _value(frame, "K"),
+            "D": _value(frame, "D"),
+            "J": _value(frame, "J"),
+        },
+        "boll": {
+            "UP": boll_up,
+            "MID": _value(frame, "BOLL_MID"),
+            "LOW": boll_low,
+            "position_pct": boll_position,
+        },
+        "atr": {
+            "ATR": atr,
+            "atr_pct": round(atr / current * 100, 2) if atr and current else None,
+        },
+        "volume": {
+            "volume_ratio": _value(frame, "VOL_RATIO"),
+            "ma5_to_ma10": _value(frame, "VOL_MA5_10"),
+        },
+        "levels": support_resistance(bars),
+        "signals": {
+            "ma_alignment": _ma_alignment(list(ma.values())),
+            "above_ma20": None if ma["MA20"] is None else current > ma["MA20"],
+            "macd_cross": _cross(dif, dea, CROSS_LOOKBACK),
+            "macd_above_zero": None if np.isnan(dif[-1]) else bool(dif[-1] > 0),
+            "kdj_cross": _cross(k, d, CROSS_LOOKBACK),
+            "rsi_zone": _zone(_value(frame, f"RSI{RSI_WINDOWS[0]}"), 20, 80),
+            "kdj_zone": _zone(_value(frame, "J"), 0, 100),
+        },
+        "recent": [
+            {
+                "日期": str(row["日期"]),
+                "收盘": round(float(row["收盘"]), 2),
+                "涨跌幅": None if pd.isna(pct) else round(float(pct), 2),
+                "量比": None
+                if pd.isna(row["VOL_RATIO"])
+                else round(float(row["VOL_RATIO"]), 2),
+            }
+            for (_, row), pct in zip(recent_rows.iterrows(), pct_change.tail(recent))
+        ],
+    }
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+全市场共享数据
+板块、指数资金流、龙虎榜、逐笔大单和个股资金流排行与具体股票无关，
+在同一进程内只抓取一次并由所有股票的研究流程共享。
+"""
+
+import asyncio
+from functools import partial
+from typing import Dict, Iterable
+
+import pandas as pd
+
+from src.tool.base import get_recent_trading_day
+from src.tool.financial_deep_search.get_section_data import get_all_section
+from src.tool.financial_deep_search.index_capital import get_index_capital_flow
+from src.tool.financial_deep_search.stock_capital import fetch_capital_flow_table
+from src.utils.cache import cached
+from src.utils.executor import run_blocking
+from src.utils.rate_limit import EASTMONEY_DATA, THS_DATA, host_limiter
+
+
+try:
+    import akshare as ak
+except ImportError:
+    ak = None
+
+try:
+    import efinance as ef
+except ImportError:
+    ef = None
+
+
+# 批量分析时预先抓取的主要指数
+MAJOR_INDEX_CODES = ("000001", "399001", "399006")
+
+
+def _is_frame(value) -> bool:
+    return isinstance(value, pd.DataFrame) and not value.empty
+
+
+@cached("market", cache_if=_is_frame)
+def fetch_daily_billboard(date: str) -> pd.DataFrame:
+    """获取指定日期的龙虎榜（全市场）"""
+    host_limiter.acquire_sync(EASTMONEY_DATA)
+    return ef.stock.get_daily_billboard(start_date=date, end_date=date)
+
+
+@cached("market", cache_if=_is_frame)
+def fetch_market_big_deal() -> pd.DataFrame:
+    """获取全市场逐笔大单"""
+    host_limiter.acquire_sync(THS_DATA)
+    return ak.stock_fund_flow_big_deal()
+
+
+@cached("market", cache_if=_is_frame)
+def fetch_individual_fund_flow_rank(symbol: str = "即时") -> pd.DataFrame:
+    """获取全市场个股资金流排行"""
+    host_limiter.acquire_sync(THS_DATA)
+    return ak.stock_fund_flow_individual(symbol=symbol)
+
+
+async def prefetch_market_data(
+    index_codes: Iterable[str] = MAJOR_INDEX_CODES,
+) -> Dict[str, bool]:
+    """
+    并发预取全市场数据，填充共享缓存
+
+    Args:
+        index_codes: 需要预取资金流向的指数代码
+
+    Returns:
+        dict: 各数据项是否预取成功
+    """
+    jobs = {
+        "hot_section_data": partial(get_all_section, sector_types="all"),
+        "daily_top_list": lambda: fetch_daily_billboard(get_recent_trading_day()),
+        "market_big_deal": fetch_market_big_deal,
+        "individual_fund_flow_rank": lambda: fetch_individual_fund_flow_rank("即时"),
+        "stock_capital_flow_table": fetch_capital_flow_table,
+    }
+    for index_code in index_codes:
+        jobs[f"index_net_flow_{index_code}"] = partial(
+            get_index_capital_flow, index_code=index_code
+        )
+
+    results = await asyncio.gather(
+        *(
+            job() if asyncio.iscoroutinefunction(job) else run_blocking(job)
+            for job in jobs.values()
+        ),
+        return_exceptions=True,
+    )
+
+    status = {}
+    for name, value in zip(jobs.keys(), results):
+        if isinstance(value, Exception) or value is None:
+            status[name] = False
+        elif isinstance(value, dict) and "success" in value:
+            status[name] = bool(value["success"])
+        elif isinstance(value, pd.DataFrame):
+            status[name] = not value.empty
+        else:
+            status[name] = bool(value)
+    return status
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+全市场实时行情快照
+进程内共享一份A股实时行情表（ak.stock_zh_a_spot_em），在配置的间隔内最多刷新一次。
+行情按列存储为 NumPy 数组，并以股票代码建立字典索引，单只股票查询为 O(1)。
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import config
+from src.logger import logger
+from src.utils.cache import MEMORY_HIT, MISS, data_cache
+from src.utils.rate_limit import EASTMONEY_PUSH, host_limiter
+
+
+try:
+    import akshare as ak
+except ImportError:
+    ak = None
+
+
+# 保存为字符串的列，其余列按数值存储
+_TEXT_COLUMNS = ("名称",)
+
+
+def normalize_code(stock_code: str) -> str:
+    """去掉交易所前后缀，返回6位股票代码"""
+    code = str(stock_code).strip().lower()
+    if code.startswith(("sh", "sz", "bj")):
+        code = code[2:]
+    if "." in code:
+        code = code.split(".", 1)[0]
+    return code
+
+
+class MarketSnapshot:
+    """全市场行情快照：列式存储 + 代码索引"""
+
+    def __init__(self, refresh_interval: Optional[float] = None):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        # (代码 -> 行号, 列名 -> 列数组)，整体替换以保证读者看到一致的数据
+        self._table: Tuple[Dict[str, int], Dict[str, np.ndarray]] = ({}, {})
+        self._updated_at: Optional[float] = None
+        # 最近一次刷新失败的时间，失败后 interval 内不再重试
+        self._failed_at: Optional[float] = None
+
+    @property
+    def interval(self) -> float:
+        if self.refresh_interval is not None:
+            return self.refresh_interval
+        return config.data_config.snapshot_interval
+
+    @property
+    def updated_at(self) -> Optional[float]:
+        """最近一次成功刷新的时间戳（time.time），从未刷新时为 None"""
+        return self._updated_at
+
+    def _is_stale(self) -> bool:
+        """是否需要刷新（距最近一次成功或失败的刷新均已超过 interval）"""
+        last_attempt = max(self._updated_at or 0.0, self._failed_at or 0.0)
+        return not last_attempt or time.time() - last_attempt >= self.interval
+
+    def _load(self, df: pd.DataFrame) -> None:
+        codes = df["代码"].astype(str).to_numpy()
+        columns: Dict[str, np.ndarray] = {}
+        for column in df.columns:
+            if column in ("代码", "序号"):
+                continue
+            if column in _TEXT_COLUMNS:
+                columns[column] = df[column].astype(str).to_numpy()
+            else:
+                columns[column] = pd.to_numeric(df[column], errors="coerce").to_numpy(
+                    dtype=np.float64
+                )
+        self._table = ({code: row for row, code in enumerate(codes)}, columns)
+        self._updated_at = time.time()
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        刷新快照（未过期且非强制时直接返回）
+
+        刷新失败后 interval 内不再重试，期间返回旧快照（没有则视为不可用）；
+        其他线程正在刷新时不等待，直接使用当前快照。
+
+        Returns:
+            bool: 当前是否有可用的快照数据
+        """
+        if not force and not self._is_stale():
+            if self._table[0]:
+                data_cache.record("quotes", MEMORY_HIT)
+            return bool(self._table[0])
+
+        if not self._lock.acquire(blocking=force):
+            return bool(self._table[0])
+        try:
+            # 获取锁之前可能已被其他线程刷新
+            if not force and not self._is_stale():
+                return bool(self._table[0])
+            data_cache.record("quotes", MISS)
+            if ak is None:
+                self._failed_at = time.time()
+                logger.warning("akshare 未安装，无法获取全市场行情快照")
+                return bool(self._table[0])
+            try:
+                host_limiter.acquire_sync(EASTMONEY_PUSH)
+                df = ak.stock_zh_a_spot_em()
+                if df is None or df.empty:
+                    raise ValueError("empty spot table")
+                self._load(df)
+                self._failed_at = None
+                logger.info(f"全市场行情快照已刷新: {len(self._table[0])} 只股票")
+            except Exception as e:
+                # 刷新失败时继续使用旧快照，interval 后再重试
+                self._failed_at = time.time()
+                logger.warning(f"全市场行情快照刷新失败: {e}")
+            return bool(self._table[0])
+        finally:
+            self._lock.release()
+
+    def get(self, stock_code: str) -> Optional[Dict[str, Any]]:
+        """
+        获取单只股票的最新行情（列名与 stock_zh_a_spot_em 一致）
+
+        Returns:
+            dict: 行情记录，找不到时返回 None
+        """
+        if not self.refresh():
+            return None
+
+        index, columns = self._table
+        code = normalize_code(stock_code)
+        row = index.get(code)
+        if row is None:
+            return None
+
+        record: Dict[str, Any] = {"代码": code}
+        for column, values in columns.items():
+            value = values[row]
+            if isinstance(value, np.floating):
+                value = None if np.isnan(value) else float(value)
+            record[column] = value
+        return record
+
+
+# 全局快照实例
+market_snapshot = MarketSnapshot()
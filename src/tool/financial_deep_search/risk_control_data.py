@@ -7,6 +7,7 @@
 支持一次性爬取所有股票的公告和财务数据
 """
 
+import asyncio
 import os
 import time
 import traceback
@@ -14,6 +15,15 @@ from datetime import datetime
 
 import pandas as pd
 
+from src.tool.financial_deep_search.financial_statements import (
+    financial_statement_cache,
+    summarize_financial_ratios,
+)
+from src.tool.financial_deep_search.http_client import http_client
+from src.utils.cache import data_cache
+from src.utils.executor import run_blocking
+from src.utils.rate_limit import THS_BASIC, host_limiter
+
 
 # 股票代码到公司名称的缓存字典
 STOCK_NAME_CACHE = {}
@@ -27,6 +37,9 @@ except ImportError:
     HAS_AKSHARE = False
     print("警告：未安装akshare库，财务数据获取功能将不可用")
 
+# 公告正文保留的最大字数
+ANNOUNCEMENT_CONTENT_CHARS = 1000
+
 # 请求头设置
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
@@ -34,10 +47,8 @@ HEADERS = {
     "Accept": "application/json, text/javascript, */*; q=0.01",
 }
 
-import requests
-
 
-def get_eastmoney_announcements(
+async def get_eastmoney_announcements(
     stock_code, page_size=50, page_index=1, max_retries=3, retry_delay=2
 ):
     """获取东方财富公告列表"""
@@ -57,15 +68,14 @@ def get_eastmoney_announcements(
     # 请求数据
     for attempt in range(1, max_retries + 1):
         try:
-            resp = requests.get(api_url, params=params, headers=HEADERS, timeout=15)
-            resp.raise_for_status()
-            data = resp.json()
+            data = await http_client.get_json(api_url, params=params, headers=HEADERS)
 
             # 检查数据
             if not data or "data" not in data or "list" not in data["data"]:
                 print(f"未获取到公告数据 (第{attempt}次尝试): {data}")
-                if attempt < max_retries:
-                    time.sleep(retry_delay)
+                if attempt < max_retries and await http_client.backoff(
+                    attempt, retry_delay
+                ):
                     continue
                 return []
 
@@ -73,13 +83,13 @@ def get_eastmoney_announcements(
 
         except Exception as e:
             print(f"获取公告列表失败: {e} (第{attempt}次尝试)")
-            if attempt < max_retries:
-                time.sleep(retry_delay)
-            else:
+            if attempt == max_retries or not await http_client.backoff(
+                attempt, retry_delay
+            ):
                 return []
 
 
-def get_eastmoney_announcement_detail(art_code, max_retries=3, retry_delay=2):
+async def get_eastmoney_announcement_detail(art_code, max_retries=3, retry_delay=2):
     """获取东方财富公告详情"""
     detail_url = "https://np-cnotice-stock.eastmoney.com/api/content/ann"
     params = {"art_code": art_code, "client_source": "web", "page_index": 1}
@@ -87,9 +97,7 @@ def get_eastmoney_announcement_detail(art_code, max_retries=3, retry_delay=2):
     # 请求数据
     for attempt in range(1, max_retries + 1):
         try:
-            resp = requests.get(detail_url, params=params, headers=HEADERS, timeout=15)
-            resp.raise_for_status()
-            data = resp.json()
+            data = await http_client.get_json(detail_url, params=params, headers=HEADERS)
 
             if "data" in data:
                 content = data["data"].get("content")
@@ -99,43 +107,75 @@ def get_eastmoney_announcement_detail(art_code, max_retries=3, retry_delay=2):
                     return data["data"]  # 没正文时返回结构体（含PDF等）
             else:
                 print(f"未获取到公告详情 (第{attempt}次尝试)")
-                if attempt < max_retries:
-                    time.sleep(retry_delay)
+                if attempt < max_retries and await http_client.backoff(
+                    attempt, retry_delay
+                ):
                     continue
                 return None
 
         except Exception as e:
             print(f"公告详情解析失败 art_code={art_code}: {e} (第{attempt}次尝试)")
-            if attempt < max_retries:
-                time.sleep(retry_delay)
-            else:
+            if attempt == max_retries or not await http_client.backoff(
+                attempt, retry_delay
+            ):
                 return None
 
 
-def get_announcements_with_detail(stock_code, max_count=30):
+def _extract_announcement_content(detail) -> str:
+    """从公告详情中提取正文并截断"""
+    if isinstance(detail, str):
+        return detail[:ANNOUNCEMENT_CONTENT_CHARS]
+    if isinstance(detail, dict):
+        raw_content = detail.get("content") or detail.get("notice_content") or ""
+        return raw_content[:ANNOUNCEMENT_CONTENT_CHARS]
+    return ""
+
+
+async def get_announcements_with_detail(stock_code, max_count=30):
     """获取指定股票公告的标题列表, 只保留标题, 并限制至最多50条"""
     # 强制限制 max_count 不超过 10
     max_count = min(max_count, 10)
 
     try:
         # 只抓取第一页公告，page_size 同步为 max_count 以减少无用数据
-        anns = get_eastmoney_announcements(stock_code, page_size=max_count)
-        result = []
+        anns = (await get_eastmoney_announcements(stock_code, page_size=max_count))[
+            :max_count
+        ]
 
-        for i, ann in enumerate(anns[:max_count]):
-            art_code = ann.get("art_code")
-            title = ann.get("title")
-            notice_date = ann.get("notice_date", "").split("T")[0]
+        # 已抓取过的公告正文直接从缓存读取
+        art_codes = list(
+            dict.fromkeys(ann.get("art_code") for ann in anns if ann.get("art_code"))
+        )
+        cached_contents = await asyncio.gather(
+            *(data_cache.aget("announcements", art_code) for art_code in art_codes)
+        )
+        contents = {
+            art_code: content
+            for art_code, content in zip(art_codes, cached_contents)
+            if content is not None
+        }
 
+        async def fetch_detail(art_code):
+            return art_code, await get_eastmoney_announcement_detail(art_code)
+
+        # 其余公告正文并发抓取（由共享 HTTP 客户端按主机限流），返回一条截断保存一条
+        pending = [
+            fetch_detail(art_code)
+            for art_code in art_codes
+            if art_code not in contents
+        ]
+        for next_detail in asyncio.as_completed(pending):
+            art_code, detail = await next_detail
+            if detail is None:
+                continue
             # 获取公告正文并截断至前 1000 字，避免超长文本导致上下文溢出
-            content = ""
-            if art_code:
-                detail = get_eastmoney_announcement_detail(art_code)
-                if isinstance(detail, str):
-                    content = detail[:1000]
-                elif isinstance(detail, dict):
-                    raw_content = detail.get("content") or detail.get("notice_content") or ""
-                    content = raw_content[:1000]
+            contents[art_code] = _extract_announcement_content(detail)
+            await data_cache.aset("announcements", art_code, contents[art_code])
+
+        result = []
+        for i, ann in enumerate(anns):
+            title = ann.get("title")
+            notice_date = ann.get("notice_date", "").split("T")[0]
 
             # 打印简单调试信息
             print(f"[{i + 1}] {title} {notice_date}")
@@ -145,13 +185,10 @@ def get_announcements_with_detail(stock_code, max_count=30):
                 {
                     "title": title,
                     "date": notice_date,
-                    "content": content,
+                    "content": contents.get(ann.get("art_code"), ""),
                 }
             )
 
-            # 适当休眠，避免过快请求被限速
-            time.sleep(0.3)
-
         return result
 
     except Exception as e:
@@ -168,6 +205,7 @@ def get_balance_sheet(stock_code, period="按年度"):
         return pd.DataFrame()
 
     try:
+        host_limiter.acquire_sync(THS_BASIC)
         df = ak.stock_financial_debt_ths(symbol=stock_code, indicator=period)
         # 只取前5行数据，通常是最新的
         if isinstance(df, pd.DataFrame) and not df.empty:
@@ -185,6 +223,7 @@ def get_income_statement(stock_code, period="按年度"):
         return pd.DataFrame()
 
     try:
+        host_limiter.acquire_sync(THS_BASIC)
         df = ak.stock_financial_benefit_ths(symbol=stock_code, indicator=period)
         # 只取前5行数据
         if isinstance(df, pd.DataFrame) and not df.empty:
@@ -202,6 +241,7 @@ def get_cash_flow(stock_code, period="按年度"):
         return pd.DataFrame()
 
     try:
+        host_limiter.acquire_sync(THS_BASIC)
         df = ak.stock_financial_cash_ths(symbol=stock_code, indicator=period)
         # 只取前5行数据
         if isinstance(df, pd.DataFrame) and not df.empty:
@@ -212,17 +252,24 @@ def get_cash_flow(stock_code, period="按年度"):
         return pd.DataFrame()
 
 
-def get_financial_reports(stock_code, period="按年度"):
-    """获取财务报表数据（资产负债表、利润表、现金流量表）"""
+async def get_financial_reports(stock_code, period="按年度"):
+    """获取财务报表数据（资产负债表、利润表、现金流量表）及核心指标摘要"""
     if not HAS_AKSHARE:
         return {"error": "未安装akshare库，无法获取财务报表数据"}
 
+    # 财务报表最多按季度更新，优先使用磁盘缓存
+    cached = await run_blocking(financial_statement_cache.load, stock_code, period)
+    if cached:
+        return cached
+
     try:
-        # 获取各类财务报表
+        # 并发获取各类财务报表（akshare 接口为同步调用，在阻塞调用线程池中执行）
         print(f"获取 {stock_code} 的财务报表数据...")
-        balance_sheet = get_balance_sheet(stock_code, period)
-        income_statement = get_income_statement(stock_code, period)
-        cash_flow = get_cash_flow(stock_code, period)
+        balance_sheet, income_statement, cash_flow = await asyncio.gather(
+            run_blocking(get_balance_sheet, stock_code, period),
+            run_blocking(get_income_statement, stock_code, period),
+            run_blocking(get_cash_flow, stock_code, period),
+        )
 
         # 如果所有报表都为空，则返回错误
         if (
@@ -265,6 +312,13 @@ def get_financial_reports(stock_code, period="按年度"):
             else [],
         }
 
+        financial_reports["指标摘要"] = summarize_financial_ratios(
+            financial_reports["资产负债表"],
+            financial_reports["利润表"],
+            financial_reports["现金流量表"],
+        )
+
+        await run_blocking(financial_statement_cache.save, stock_code, period, financial_reports)
         print(f"成功获取 {stock_code} 的财务报表数据")
         return financial_reports
 
@@ -372,7 +426,7 @@ def get_all_stock_codes(csv_path=None):
         return []
 
 
-def get_risk_control_data(
+async def get_risk_control_data(
     stock_code,
     max_count=100,
     period="按年度",
@@ -399,25 +453,30 @@ def get_risk_control_data(
     last_exception = None
     for attempt in range(1, max_retry + 1):
         try:
-            # 获取公告数据（法务）
-            legal_data = None
-            if include_announcements:
-                legal_data = get_announcements_with_detail(stock_code, max_count)
-            # 获取财务数据
+            # 公告数据（法务）与财务数据并发获取
+            legal_task = (
+                asyncio.create_task(get_announcements_with_detail(stock_code, max_count))
+                if include_announcements
+                else None
+            )
             financial_data = None
             if include_financial:
-                financial_data = get_financial_reports(stock_code, period)
+                financial_data = await get_financial_reports(stock_code, period)
+            legal_data = await legal_task if legal_task else None
             # 直接返回拼接的json结构
-            # 仅保留 financial 元数据，减少返回体大小，且保证 legal 字段先出现，避免被截断
-            financial_meta = (
-                financial_data.get("元数据", {}) if isinstance(financial_data, dict) else {}
-            )
-            return {"legal": legal_data, "financial_meta": financial_meta}
+            # 仅保留 financial 元数据和指标摘要，减少返回体大小，且保证 legal 字段先出现，避免被截断
+            if not isinstance(financial_data, dict):
+                financial_data = {}
+            return {
+                "legal": legal_data,
+                "financial_meta": financial_data.get("元数据", {}),
+                "financial_summary": financial_data.get("指标摘要", {}),
+            }
         except Exception as e:
             last_exception = str(e)
             print(f"[第{attempt}次] 获取风控数据失败: {e}")
             if attempt < max_retry:
-                time.sleep(sleep_seconds)
+                await asyncio.sleep(sleep_seconds)
                 print(f"正在尝试第{attempt + 1}次获取...")
 
     print(f"获取风控数据达到最大重试次数 {max_retry}，获取失败")
@@ -6,18 +6,30 @@
 API: https://push2.eastmoney.com/api/qt/clist/get
 """
 
+import asyncio
 import json
+import math
 import re
 import time
 import traceback
 from datetime import datetime
+from typing import Dict, Optional
 
-import requests
+from src.tool.financial_deep_search.http_client import http_client, run_with_client
+from src.tool.financial_deep_search.market_snapshot import normalize_code
+from src.utils.cache import cached
+from src.utils.single_flight import single_flight
 
 
 # API URL - 个股资金流向
 STOCK_CAPITAL_FLOW_URL = "https://push2.eastmoney.com/api/qt/clist/get?fid=f62&po=1&pz=50&pn=1&np=1&fltt=2&invt=2&ut=8dec03ba335b81bf4ebdf7b29ec27d15&fs=m%3A0%2Bt%3A6%2Bf%3A!2%2Cm%3A0%2Bt%3A13%2Bf%3A!2%2Cm%3A0%2Bt%3A80%2Bf%3A!2%2Cm%3A1%2Bt%3A2%2Bf%3A!2%2Cm%3A1%2Bt%3A23%2Bf%3A!2%2Cm%3A0%2Bt%3A7%2Bf%3A!2%2Cm%3A1%2Bt%3A3%2Bf%3A!2&fields=f12%2Cf14%2Cf2%2Cf3%2Cf62%2Cf184%2Cf66%2Cf69%2Cf72%2Cf75%2Cf78%2Cf81%2Cf84%2Cf87%2Cf204%2Cf205%2Cf124%2Cf1%2Cf13"
 
+# API URL - 指定证券资金流向（不在排行榜中的股票使用）
+SECURITY_CAPITAL_FLOW_URL = "https://push2.eastmoney.com/api/qt/ulist.np/get?fltt=2&invt=2&ut=8dec03ba335b81bf4ebdf7b29ec27d15&fields=f12%2Cf14%2Cf2%2Cf3%2Cf62%2Cf184%2Cf66%2Cf69%2Cf72%2Cf75%2Cf78%2Cf81%2Cf84%2Cf87%2Cf204%2Cf205%2Cf124%2Cf1%2Cf13"
+
+# 全市场资金流向表的分页大小（服务端返回条数少于该值时按实际条数计算页数）
+CAPITAL_FLOW_PAGE_SIZE = 500
+
 # 请求头设置
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
@@ -43,7 +55,7 @@ def parse_jsonp(jsonp_str):
         return None
 
 
-def fetch_stock_list_capital_flow(
+async def fetch_stock_list_capital_flow(
     page_size=50, page_num=1, max_retries=3, retry_delay=2
 ):
     """
@@ -73,15 +85,15 @@ def fetch_stock_list_capital_flow(
     # 请求数据
     for attempt in range(1, max_retries + 1):
         try:
-            resp = requests.get(url, headers=HEADERS, timeout=15)
-            resp.raise_for_status()
+            text = await http_client.get_text(url, headers=HEADERS)
 
             # 解析响应数据
-            data = parse_jsonp(resp.text)
+            data = parse_jsonp(text)
             if not data:
                 print(f"解析个股资金流向数据失败 (第{attempt}次尝试)")
-                if attempt < max_retries:
-                    time.sleep(retry_delay)
+                if attempt < max_retries and await http_client.backoff(
+                    attempt, retry_delay
+                ):
                     continue
                 return None
 
@@ -89,8 +101,9 @@ def fetch_stock_list_capital_flow(
             stock_list = data.get("data", {}).get("diff", [])
             if not stock_list:
                 print(f"未获取到个股资金流向数据 (第{attempt}次尝试)")
-                if attempt < max_retries:
-                    time.sleep(retry_delay)
+                if attempt < max_retries and await http_client.backoff(
+                    attempt, retry_delay
+                ):
                     continue
                 return None
 
@@ -101,16 +114,92 @@ def fetch_stock_list_capital_flow(
 
         except Exception as e:
             print(f"获取个股资金流向数据失败: {e} (第{attempt}次尝试)")
-            if attempt < max_retries:
-                time.sleep(retry_delay)
-            else:
+            if attempt == max_retries or not await http_client.backoff(
+                attempt, retry_delay
+            ):
+                return None
+
+
+@cached("capital_flow", cache_if=bool)
+async def fetch_capital_flow_table() -> Dict[str, dict]:
+    """
+    获取全市场个股资金流向表并按股票代码建立索引
+
+    首页确定总数后并发抓取其余分页；在缓存有效期内只抓取一次，
+    个股查询直接读取内存。
+
+    返回:
+        dict: 股票代码 -> 资金流向数据，获取失败时返回空字典
+    """
+    first_page = await fetch_stock_list_capital_flow(CAPITAL_FLOW_PAGE_SIZE, 1)
+    if not first_page:
+        return {}
+
+    stock_list = list(first_page.get("股票列表", []))
+    rows_per_page = len(stock_list)
+    total = first_page.get("总数", 0) or rows_per_page
+    page_count = math.ceil(total / rows_per_page) if rows_per_page else 1
+
+    pages = await asyncio.gather(
+        *(
+            fetch_stock_list_capital_flow(CAPITAL_FLOW_PAGE_SIZE, page_num)
+            for page_num in range(2, page_count + 1)
+        )
+    )
+    missing = 0
+    for page in pages:
+        if page:
+            stock_list.extend(page.get("股票列表", []))
+        else:
+            missing += 1
+    if missing:
+        print(f"全市场资金流向表有{missing}页获取失败，使用部分数据")
+
+    return {
+        stock["股票代码"]: stock for stock in stock_list if stock.get("股票代码")
+    }
+
+
+async def fetch_security_capital_flow(
+    stock_code, max_retries=3, retry_delay=2
+) -> Optional[dict]:
+    """
+    直接查询单只股票的资金流向（用于不在全市场排行中的股票）
+
+    返回:
+        dict: 资金流向数据，获取失败时返回None
+    """
+    market = "1" if stock_code.startswith(("5", "6", "9")) else "0"
+    url = f"{SECURITY_CAPITAL_FLOW_URL}&secids={market}.{stock_code}&_={int(time.time() * 1000)}"
+
+    for attempt in range(1, max_retries + 1):
+        try:
+            text = await http_client.get_text(url, headers=HEADERS)
+            data = parse_jsonp(text) or {}
+            stock_list = (data.get("data") or {}).get("diff") or []
+            if not stock_list:
+                print(f"未获取到股票{stock_code}的资金流向数据 (第{attempt}次尝试)")
+                if attempt < max_retries and await http_client.backoff(
+                    attempt, retry_delay
+                ):
+                    continue
+                return None
+            return process_stock_list_data(stock_list, len(stock_list))["股票列表"][0]
+
+        except Exception as e:
+            print(f"获取股票{stock_code}资金流向数据失败: {e} (第{attempt}次尝试)")
+            if attempt == max_retries or not await http_client.backoff(
+                attempt, retry_delay
+            ):
                 return None
 
 
-def fetch_single_stock_capital_flow(stock_code, max_retries=3, retry_delay=2):
+async def fetch_single_stock_capital_flow(stock_code, max_retries=3, retry_delay=2):
     """
     获取单个股票的资金流向数据
 
+    优先从全市场资金流向表中读取，表中没有时直接查询该股票。
+
     参数:
         stock_code: 股票代码，如"000001"
         max_retries: 最大重试次数
@@ -119,24 +208,19 @@ def fetch_single_stock_capital_flow(stock_code, max_retries=3, retry_delay=2):
     返回:
         dict: 包含单个股票资金流向数据的字典，如果未找到则返回None
     """
-    # 获取股票列表数据（多页搜索需要实现分页循环）
-    for page in range(1, 10):  # 最多查找10页
-        stock_list = fetch_stock_list_capital_flow(50, page)
-        if not stock_list:
-            break
-
-        # 在列表中查找指定股票
-        for stock in stock_list.get("股票列表", []):
-            if stock.get("股票代码") == stock_code:
-                return {
-                    "success": True,
-                    "message": f"成功获取股票{stock.get('股票名称')}({stock_code})资金流向数据",
-                    "last_updated": datetime.now().isoformat(),
-                    "data": stock,
-                }
-
-    # 如果未找到目标股票，使用精确查询
-    # 这里可以实现具体股票的接口查询，暂不实现
+    stock_code = normalize_code(stock_code)
+    table = await fetch_capital_flow_table()
+    stock = table.get(stock_code)
+    if stock is None:
+        stock = await fetch_security_capital_flow(stock_code, max_retries, retry_delay)
+
+    if stock:
+        return {
+            "success": True,
+            "message": f"成功获取股票{stock.get('股票名称')}({stock_code})资金流向数据",
+            "last_updated": datetime.now().isoformat(),
+            "data": stock,
+        }
 
     return {"success": False, "message": f"未找到股票{stock_code}的资金流向数据", "data": {}}
 
@@ -236,7 +320,8 @@ def process_stock_list_data(stock_list, total_count):
     return result
 
 
-def get_stock_capital_flow(page_size=50, page_num=1, stock_code=None):
+@single_flight(normalize={"stock_code": normalize_code})
+async def get_stock_capital_flow(page_size=50, page_num=1, stock_code=None):
     """
     获取股票资金流向数据，支持获取列表或单只股票数据
 
@@ -251,9 +336,9 @@ def get_stock_capital_flow(page_size=50, page_num=1, stock_code=None):
     try:
         # 获取数据（单只股票或列表）
         if stock_code:
-            result = fetch_single_stock_capital_flow(stock_code)
+            result = await fetch_single_stock_capital_flow(stock_code)
         else:
-            flow_data = fetch_stock_list_capital_flow(page_size, page_num)
+            flow_data = await fetch_stock_list_capital_flow(page_size, page_num)
             if not flow_data:
                 return {"success": False, "message": f"获取股票资金流向数据失败", "data": {}}
 
@@ -289,9 +374,11 @@ def main():
     args = parser.parse_args()
 
     if args.code:
-        result = get_stock_capital_flow(stock_code=args.code)
+        result = run_with_client(get_stock_capital_flow(stock_code=args.code))
     else:
-        result = get_stock_capital_flow(page_size=args.size, page_num=args.page)
+        result = run_with_client(
+            get_stock_capital_flow(page_size=args.size, page_num=args.page)
+        )
 
     # 打印结果
     print(json.dumps(result, ensure_ascii=False, indent=2))
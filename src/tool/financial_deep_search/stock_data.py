@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+个股数据
+个股资金流历史、基本信息和实时行情的抓取入口，结果写入分层数据缓存，
+各工具与多个分析流程共享，过期数据在上游失败时作为兜底。
+"""
+
+from typing import Any, Dict
+
+import pandas as pd
+
+from src.tool.financial_deep_search.market_snapshot import normalize_code
+from src.utils.cache import cached
+from src.utils.rate_limit import EASTMONEY_HIS, EASTMONEY_PUSH, host_limiter
+
+
+try:
+    import akshare as ak
+except ImportError:
+    ak = None
+
+try:
+    import efinance as ef
+except ImportError:
+    ef = None
+
+
+def _is_frame(value) -> bool:
+    return isinstance(value, pd.DataFrame) and not value.empty
+
+
+def market_of(stock_code: str) -> str:
+    """股票代码所属交易所（sh / sz / bj）"""
+    code = normalize_code(stock_code)
+    if code.startswith(("6", "9")):
+        return "sh"
+    if code.startswith(("4", "8")):
+        return "bj"
+    return "sz"
+
+
+@cached("stock_daily", cache_if=_is_frame)
+def fetch_stock_fund_flow(stock_code: str) -> pd.DataFrame:
+    """获取个股近期每日资金流向"""
+    code = normalize_code(stock_code)
+    host_limiter.acquire_sync(EASTMONEY_HIS)
+    return ak.stock_individual_fund_flow(stock=code, market=market_of(code))
+
+
+@cached("stock_daily", cache_if=lambda value: value is not None)
+def fetch_stock_base_info(stock_code: str) -> Any:
+    """获取个股基本信息"""
+    host_limiter.acquire_sync(EASTMONEY_PUSH)
+    return ef.stock.get_base_info(stock_code)
+
+
+@cached("quotes", cache_if=bool)
+def fetch_realtime_quote(stock_code: str) -> Dict[str, Any]:
+    """获取单只股票的实时行情（全市场快照不可用时使用）"""
+    code = normalize_code(stock_code)
+    if code.startswith(("6", "0", "3")):
+        code = f"{market_of(code)}{code}"
+    host_limiter.acquire_sync(EASTMONEY_PUSH)
+    quotes_df = ef.stock.get_realtime_quotes(code)
+
+    if isinstance(quotes_df, pd.DataFrame):
+        records = quotes_df.to_dict(orient="records")
+        return records[0] if records else {}
+    if isinstance(quotes_df, pd.Series):
+        return quotes_df.to_dict()
+    return {}
@@ -1,17 +1,21 @@
 import asyncio
 import json
 from datetime import datetime
+from functools import partial
 from typing import Optional
 
-import efinance as ef
 import pandas as pd
-from pydantic import Field
 
+from src.config import config
 from src.logger import logger
 from src.tool.base import BaseTool, ToolResult, get_recent_trading_day
 from src.tool.financial_deep_search.get_section_data import get_all_section
 from src.tool.financial_deep_search.index_capital import get_index_capital_flow
+from src.tool.financial_deep_search.market_data import fetch_daily_billboard
+from src.tool.financial_deep_search.market_snapshot import market_snapshot
 from src.tool.financial_deep_search.stock_capital import get_stock_capital_flow
+from src.tool.financial_deep_search.stock_data import fetch_realtime_quote
+from src.utils.executor import run_blocking
 
 
 _HOT_MONEY_DESCRIPTION = """
@@ -68,8 +72,6 @@ class HotMoneyTool(BaseTool):
         "required": ["stock_code"],
     }
 
-    lock: asyncio.Lock = Field(default_factory=asyncio.Lock)
-
     async def execute(
         self,
         stock_code: str,
@@ -95,61 +97,86 @@ class HotMoneyTool(BaseTool):
         Returns:
             ToolResult: Unified JSON format containing all data sources results or error message
         """
-        async with self.lock:
-            try:
-                date = date or get_recent_trading_day()
-                actual_index_code = index_code or stock_code
-
-                result = {
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "stock_code": stock_code,
-                    "date": date,
-                }
-                if index_code:
-                    result["index_code"] = index_code
-
-                # Get all data with retry mechanism
-                data_sources = {
-                    "stock_latest_info": lambda: ef.stock.get_realtime_quotes(
-                        stock_code
-                    ),
-                    "daily_top_list": lambda: ef.stock.get_daily_billboard(
-                        start_date=date, end_date=date
-                    ),
-                    "hot_section_data": lambda: get_all_section(
-                        sector_types=sector_types
-                    ),
-                    "stock_net_flow": lambda: get_stock_capital_flow(
-                        stock_code=stock_code
-                    ),
-                    "index_net_flow": lambda: get_index_capital_flow(
-                        index_code=actual_index_code
-                    ),
-                }
-
-                # Retrieve each data source
-                for key, func in data_sources.items():
-                    result[key] = await self._get_data_with_retry(
-                        func, key, max_retry, sleep_seconds
+        try:
+            date = date or get_recent_trading_day()
+            actual_index_code = index_code or stock_code
+
+            result = {
+                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "stock_code": stock_code,
+                "date": date,
+            }
+            if index_code:
+                result["index_code"] = index_code
+
+            # Get all data with retry mechanism
+            data_sources = {
+                "stock_latest_info": partial(self._get_latest_info, stock_code),
+                "daily_top_list": lambda: fetch_daily_billboard(date),
+                "hot_section_data": partial(get_all_section, sector_types=sector_types),
+                "stock_net_flow": partial(
+                    get_stock_capital_flow, stock_code=stock_code
+                ),
+                "index_net_flow": partial(
+                    get_index_capital_flow, index_code=actual_index_code
+                ),
+            }
+
+            # Retrieve all data sources concurrently; a failed source yields None
+            # and does not hold up the others
+            values = await asyncio.gather(
+                *(
+                    self._get_data_with_retry(
+                        func,
+                        key,
+                        max_retry,
+                        sleep_seconds,
+                        config.data_config.source_timeout,
                     )
+                    for key, func in data_sources.items()
+                )
+            )
+            result.update(zip(data_sources.keys(), values))
 
-                return ToolResult(output=result)
+            failed_sources = [
+                key for key, value in zip(data_sources, values) if value is None
+            ]
+            if failed_sources:
+                result["failed_sources"] = failed_sources
 
-            except Exception as e:
-                error_msg = f"Failed to get hot money data: {str(e)}"
-                logger.error(error_msg)
-                return ToolResult(error=error_msg)
+            return ToolResult(output=result)
+
+        except Exception as e:
+            error_msg = f"Failed to get hot money data: {str(e)}"
+            logger.error(error_msg)
+            return ToolResult(error=error_msg)
+
+    @staticmethod
+    def _get_latest_info(stock_code: str) -> dict:
+        """Get the latest quote, falling back to a per-stock fetch on a snapshot miss"""
+        snapshot = market_snapshot.get(stock_code)
+        if snapshot:
+            return snapshot
+
+        quote = fetch_realtime_quote(stock_code)
+        if not quote:
+            # Raise so the retry loop runs instead of recording an empty success
+            raise ValueError(f"No quote returned for {stock_code}")
+        return quote
 
     @staticmethod
-    async def _get_data_with_retry(func, data_name, max_retry=3, sleep_seconds=1):
+    async def _get_data_with_retry(
+        func, data_name, max_retry=3, sleep_seconds=1, timeout=None
+    ):
         """
         Get data with retry mechanism.
 
         Args:
-            func: Function to call
+            func: Function or coroutine function to call
             data_name: Data name (for logging)
             max_retry: Maximum retry attempts
             sleep_seconds: Seconds to wait between retries
+            timeout: Seconds allowed for each attempt (None for no limit)
 
         Returns:
             Function return data or None
@@ -157,8 +184,12 @@ class HotMoneyTool(BaseTool):
         last_error = None
         for attempt in range(1, max_retry + 1):
             try:
-                # Use asyncio.to_thread for synchronous operations
-                data = await asyncio.to_thread(func)
+                # Await async fetchers directly, run synchronous ones in a thread
+                if asyncio.iscoroutinefunction(func):
+                    call = func()
+                else:
+                    call = run_blocking(func)
+                data = await asyncio.wait_for(call, timeout)
 
                 # Convert data based on type
                 if isinstance(data, pd.DataFrame):
@@ -172,7 +203,7 @@ class HotMoneyTool(BaseTool):
                 return data
 
             except Exception as e:
-                last_error = str(e)
+                last_error = str(e) or type(e).__name__
                 logger.warning(f"[{data_name}][Attempt {attempt}] Failed: {e}")
 
                 if attempt < max_retry:
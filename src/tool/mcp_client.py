@@ -1,3 +1,4 @@
+import json
 from contextlib import AsyncExitStack
 from typing import Dict, List, Optional
 
@@ -30,10 +31,21 @@ class MCPClientTool(BaseTool):
             content_str = ", ".join(
                 item.text for item in result.content if isinstance(item, TextContent)
             )
-            return ToolResult(output=content_str or "No output returned.")
+            return self._to_result(content_str)
         except Exception as e:
             return ToolResult(error=f"Error executing tool: {str(e)}")
 
+    @staticmethod
+    def _to_result(content: str) -> ToolResult:
+        """Rebuild the ToolResult serialized by the MCP server; plain text becomes the output."""
+        try:
+            data = json.loads(content)
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and "output" in data and set(data) <= set(ToolResult.model_fields):
+            return ToolResult(**data)
+        return ToolResult(output=content or "No output returned.")
+
 
 class MCPClients(ToolCollection):
     """
@@ -68,9 +68,7 @@ class RiskControlTool(BaseTool):
             ToolResult: Result containing risk control data
         """
         try:
-            # Execute synchronous operation in thread pool to avoid blocking event loop
-            result = await asyncio.to_thread(
-                get_risk_control_data,
+            result = await get_risk_control_data(
                 stock_code=stock_code,
                 max_count=max_count,
                 period=period,
@@ -108,7 +106,7 @@ if __name__ == "__main__":
         output = result.output
         print(f"Success!")
         print(
-            f"- Financial Data: {'Retrieved' if output['financial'] else 'Not Retrieved'}"
+            f"- Financial Data: {'Retrieved' if output.get('financial_summary') else 'Not Retrieved'}"
         )
         if output['legal']:
             legal_info = f"Retrieved ({len(output['legal'])} items)"
@@ -57,9 +57,7 @@ class SentimentTool(BaseTool):
             ToolResult: Result containing market data
         """
         try:
-            # Execute synchronous operation in thread pool to avoid blocking event loop
-            result = await asyncio.to_thread(
-                self._get_market_data,
+            result = await self._get_market_data(
                 index_code=index_code,
                 sector_types=sector_types,
                 max_retry=max_retry,
@@ -77,7 +75,7 @@ class SentimentTool(BaseTool):
             logger.error(error_msg)
             return ToolResult(error=error_msg)
 
-    def _get_market_data(
+    async def _get_market_data(
         self,
         index_code: str,
         sector_types: str = "all",
@@ -91,11 +89,11 @@ class SentimentTool(BaseTool):
         for attempt in range(1, max_retry + 1):
             try:
                 # 1. Get hot sector data
-                section_data = get_all_section(sector_types=sector_types)
+                section_data = await get_all_section(sector_types=sector_types)
                 logger.info(f"[Attempt {attempt}] Retrieved hot sector data")
 
                 # 2. Get index capital flow
-                index_flow = get_index_capital_flow(index_code=index_code)
+                index_flow = await get_index_capital_flow(index_code=index_code)
                 logger.info(f"[Attempt {attempt}] Retrieved index capital flow data")
 
                 # 3. Combine data and return
@@ -111,7 +109,7 @@ class SentimentTool(BaseTool):
                 logger.warning(f"[Attempt {attempt}] Failed to get market data: {e}")
                 if attempt < max_retry:
                     logger.info(f"Waiting {sleep_seconds} seconds before retry...")
-                    time.sleep(sleep_seconds)
+                    await asyncio.sleep(sleep_seconds)
                 else:
                     logger.error(f"Max retries ({max_retry}) reached, failed")
                     return {"error": f"Failed to get market data: {str(e)}"}
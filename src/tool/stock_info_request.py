@@ -2,11 +2,12 @@ import asyncio
 import datetime
 from typing import Any, Dict
 
-import efinance as ef
 import pandas as pd
 from pydantic import Field
 
 from src.tool.base import BaseTool, ToolResult, get_recent_trading_day
+from src.tool.financial_deep_search.stock_data import fetch_stock_base_info
+from src.utils.executor import run_blocking
 
 
 class StockInfoResponse(ToolResult):
@@ -55,7 +56,7 @@ class StockInfoRequest(BaseTool):
                 trading_day = get_recent_trading_day()
 
                 # Fetch stock information
-                data = ef.stock.get_base_info(stock_code)
+                data = await run_blocking(fetch_stock_base_info, stock_code)
 
                 # Convert data to dict format based on its type
                 basic_info = self._format_data(data)
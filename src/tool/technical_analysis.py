@@ -2,20 +2,29 @@ import asyncio
 import json
 import sys
 import time
-from typing import Any, Dict
-
-import efinance as ef
+from functools import partial
+from typing import Any, Dict, Optional, Tuple
 
+from src.config import config
 from src.logger import logger
 from src.tool.base import BaseTool, ToolResult
+from src.tool.financial_deep_search.bar_store import bar_store
+from src.tool.financial_deep_search.indicators import indicator_snapshot
+from src.tool.financial_deep_search.market_snapshot import market_snapshot
 from src.tool.financial_deep_search.stock_capital import get_stock_capital_flow
+from src.tool.financial_deep_search.stock_data import fetch_realtime_quote
+from src.utils.executor import run_blocking
+
+
+# 计算分钟K线指标使用的K线条数（一个交易日）
+MINUTE_KLINE_COUNT = 240
 
 
 class TechnicalAnalysisTool(BaseTool):
     """Tool for retrieving technical data for stocks."""
 
     name: str = "technical_analysis_tool"
-    description: str = "获取股票技术面数据，包括实时行情、日K线、分钟K线和资金流向。支持最大重试机制，适合大模型自动调用。返回结构化字典。"
+    description: str = "获取股票技术面数据，包括实时行情、日K线与分钟K线的技术指标快照（均线、MACD、RSI、KDJ、布林带、ATR、量比、支撑阻力位及信号）和资金流向。支持最大重试机制，适合大模型自动调用。返回结构化字典。"
     parameters: dict = {
         "type": "object",
         "properties": {
@@ -30,12 +39,12 @@ class TechnicalAnalysisTool(BaseTool):
             },
             "need_daily_kline": {
                 "type": "boolean",
-                "description": "是否获取日K线历史数据，包括开盘价、最高价、最低价、收盘价等OHLC数据",
+                "description": "是否获取日K线技术指标快照，包括均线、MACD、RSI、KDJ、布林带、ATR、量比、支撑阻力位及最近几日走势",
                 "default": True,
             },
             "need_minute_kline": {
                 "type": "boolean",
-                "description": "是否获取分钟级K线数据，用于分析盘中短期价格走势与波动",
+                "description": "是否获取分钟K线技术指标快照，用于分析盘中短期价格走势与波动",
                 "default": True,
             },
             "need_capital_flow": {
@@ -45,8 +54,8 @@ class TechnicalAnalysisTool(BaseTool):
             },
             "kline_count": {
                 "type": "integer",
-                "description": "K线数据获取条数，范围10-200，控制历史数据回溯深度",
-                "default": 30,
+                "description": "计算日K线技术指标使用的K线条数，范围60-500，控制历史数据回溯深度",
+                "default": 250,
             },
             "max_retry": {
                 "type": "integer",
@@ -64,7 +73,7 @@ class TechnicalAnalysisTool(BaseTool):
         need_daily_kline: bool = True,
         need_minute_kline: bool = True,
         need_capital_flow: bool = True,
-        kline_count: int = 30,
+        kline_count: int = 250,
         max_retry: int = 3,
         sleep_seconds: int = 1,
         **kwargs,
@@ -75,10 +84,10 @@ class TechnicalAnalysisTool(BaseTool):
         Args:
             stock_code: Stock code
             need_realtime: Whether to get real-time quotes
-            need_daily_kline: Whether to get daily K-line data
-            need_minute_kline: Whether to get minute K-line data
+            need_daily_kline: Whether to get daily K-line indicators
+            need_minute_kline: Whether to get minute K-line indicators
             need_capital_flow: Whether to get capital flow data
-            kline_count: Number of K-line data points to retrieve
+            kline_count: Number of daily bars the indicators are computed over
             max_retry: Maximum retry attempts
             sleep_seconds: Seconds to wait between retries
             **kwargs: Additional parameters
@@ -87,22 +96,47 @@ class TechnicalAnalysisTool(BaseTool):
             ToolResult: Result containing technical data
         """
         try:
-            # Execute synchronous operation in thread pool to avoid blocking event loop
-            result = await asyncio.to_thread(
-                self._get_tech_data,
-                stock_code=stock_code,
-                need_realtime=need_realtime,
-                need_daily_kline=need_daily_kline,
-                need_minute_kline=need_minute_kline,
-                need_capital_flow=need_capital_flow,
-                kline_count=kline_count,
-                max_retry=max_retry,
-                sleep_seconds=sleep_seconds,
-            )
+            sources = {}
+            if need_realtime:
+                sources["realtime_quotes"] = partial(self._get_realtime_quotes, stock_code)
+            if need_daily_kline:
+                sources["daily_indicators"] = partial(
+                    self._get_daily_indicators, stock_code, count=kline_count
+                )
+            if need_minute_kline:
+                sources["minute_indicators"] = partial(
+                    self._get_minute_indicators, stock_code
+                )
+            if need_capital_flow:
+                sources["capital_flow"] = partial(self._get_capital_flow, stock_code)
+
+            # Fetch all sources in parallel; each source retries on its own
+            fetched, errors = {}, {}
+            for next_source in asyncio.as_completed(
+                [
+                    self._fetch_with_retry(func, key, stock_code, max_retry, sleep_seconds)
+                    for key, func in sources.items()
+                ]
+            ):
+                key, data, error = await next_source
+                if error is None:
+                    fetched[key] = data
+                else:
+                    errors[key] = error
+
+            if sources and not fetched:
+                return ToolResult(
+                    error=f"Failed to get technical data: {'; '.join(errors.values())}"
+                )
 
-            # Check if result contains error
-            if "error" in result:
-                return ToolResult(error=result["error"])
+            # Build result dictionary in request order
+            result = {
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "stock_code": stock_code,
+            }
+            result.update((key, fetched[key]) for key in sources if key in fetched)
+            if errors:
+                result["errors"] = errors
 
             # Return success result
             return ToolResult(output=result)
@@ -112,150 +146,79 @@ class TechnicalAnalysisTool(BaseTool):
             logger.error(error_msg)
             return ToolResult(error=error_msg)
 
-    def _get_tech_data(
-        self,
+    @staticmethod
+    async def _fetch_with_retry(
+        func,
+        data_name: str,
         stock_code: str,
-        need_realtime: bool = True,
-        need_daily_kline: bool = True,
-        need_minute_kline: bool = True,
-        need_capital_flow: bool = True,
-        kline_count: int = 30,
         max_retry: int = 3,
         sleep_seconds: int = 1,
-    ):
+    ) -> Tuple[str, Any, Optional[str]]:
         """
-        Get technical data including real-time quotes, K-line data and capital flow.
-        Supports maximum retry mechanism.
+        Fetch one data source, retrying only that source on failure.
+
+        Returns:
+            Tuple of (data name, data, error message or None)
         """
+        last_error = None
         for attempt in range(1, max_retry + 1):
             try:
-                # Build result dictionary
-                result = {
-                    "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "stock_code": stock_code,
-                }
-
-                # 1. Get real-time quotes
-                if need_realtime:
-                    realtime_data = self._get_realtime_quotes(stock_code)
-                    result["realtime_quotes"] = realtime_data
-                    logger.info(
-                        f"[Attempt {attempt}] Retrieved real-time quotes for {stock_code}"
-                    )
-
-                # 2. Get daily K-line data
-                if need_daily_kline:
-                    daily_kline = self._get_daily_kline(stock_code, count=kline_count)
-                    result["daily_kline"] = daily_kline
-                    logger.info(
-                        f"[Attempt {attempt}] Retrieved daily K-line data for {stock_code}"
-                    )
-
-                # 3. Get minute K-line data
-                if need_minute_kline:
-                    minute_kline = self._get_minute_kline(stock_code, count=kline_count)
-                    result["minute_kline"] = minute_kline
-                    logger.info(
-                        f"[Attempt {attempt}] Retrieved minute K-line data for {stock_code}"
-                    )
-
-                # 4. Get stock capital flow data
-                if need_capital_flow:
-                    capital_flow = self._get_capital_flow(stock_code)
-                    result["capital_flow"] = capital_flow
-                    logger.info(
-                        f"[Attempt {attempt}] Retrieved capital flow data for {stock_code}"
-                    )
-
-                return result
+                # Await async fetchers directly, run synchronous ones on the blocking executor
+                if asyncio.iscoroutinefunction(func):
+                    call = func()
+                else:
+                    call = run_blocking(func)
+                data = await asyncio.wait_for(call, config.data_config.source_timeout)
+                logger.info(f"[Attempt {attempt}] Retrieved {data_name} for {stock_code}")
+                return data_name, data, None
 
             except Exception as e:
+                last_error = str(e) or type(e).__name__
                 logger.warning(
-                    f"[Attempt {attempt}] Failed to get technical data for {stock_code}: {e}"
+                    f"[Attempt {attempt}] Failed to get {data_name} for {stock_code}: {e}"
                 )
                 if attempt < max_retry:
                     logger.info(f"Waiting {sleep_seconds} seconds before retry...")
-                    time.sleep(sleep_seconds)
-                else:
-                    logger.error(f"Max retries ({max_retry}) reached, failed")
-                    return {"error": f"Failed to get technical data: {str(e)}"}
+                    await asyncio.sleep(sleep_seconds)
+
+        logger.error(f"[{data_name}] Max retries ({max_retry}) reached, failed")
+        return data_name, None, f"{data_name}: {last_error}"
 
     @staticmethod
     def _get_realtime_quotes(stock_code: str) -> Dict[str, Any]:
         """Get real-time quotes data"""
-        try:
-            # Format stock code according to market
-            if stock_code.startswith("6"):
-                formatted_code = f"sh{stock_code}"
-            elif stock_code.startswith(("0", "3")):
-                formatted_code = f"sz{stock_code}"
-            else:
-                formatted_code = stock_code
-
-            quotes_df = ef.stock.get_realtime_quotes(formatted_code)
+        # Serve from the shared market snapshot when possible
+        snapshot = market_snapshot.get(stock_code)
+        if snapshot:
+            return snapshot
 
-            # Process returned DataFrame
-            if quotes_df is not None and not quotes_df.empty:
-                if hasattr(quotes_df, "to_dict"):
-                    if hasattr(quotes_df, "shape") and len(quotes_df.shape) > 1:
-                        # DataFrame
-                        records = quotes_df.to_dict(orient="records")
-                        if records:
-                            return records[0]  # Return first record
-                    else:
-                        # Series
-                        return quotes_df.to_dict()
-            return {}
-        except Exception as e:
-            logger.error(f"Failed to get real-time quotes: {e}")
-            return {"error": str(e)}
+        return fetch_realtime_quote(stock_code)
 
     @staticmethod
-    def _get_daily_kline(stock_code: str, count: int = 30) -> list:
-        """Get daily K-line data"""
-        try:
-            kline_df = ef.stock.get_quote_history(stock_code, klt=101)
-
-            if kline_df is not None and not kline_df.empty:
-                # Keep only the most recent count records
-                if len(kline_df) > count:
-                    kline_df = kline_df.tail(count)
-
-                # Convert to list of dictionaries
-                if hasattr(kline_df, "to_dict"):
-                    return kline_df.to_dict(orient="records")
-            return []
-        except Exception as e:
-            logger.error(f"Failed to get daily K-line data: {e}")
-            return []
+    def _get_daily_indicators(stock_code: str, count: int = 250) -> Dict[str, Any]:
+        """Get the indicator snapshot computed over daily K-line history"""
+        # Served from the local bar store, which only downloads bars it does not have
+        bars = bar_store.tail(stock_code, "daily", count=count)
+        if bars.empty:
+            raise ValueError("daily K-line unavailable")
+        return indicator_snapshot(bars)
 
     @staticmethod
-    def _get_minute_kline(stock_code: str, count: int = 30) -> list:
-        """Get minute K-line data"""
-        try:
-            kline_df = ef.stock.get_quote_history(stock_code, klt=1)
-
-            if kline_df is not None and not kline_df.empty:
-                # Keep only the most recent count records
-                if len(kline_df) > count:
-                    kline_df = kline_df.tail(count)
-
-                # Convert to list of dictionaries
-                if hasattr(kline_df, "to_dict"):
-                    return kline_df.to_dict(orient="records")
-            return []
-        except Exception as e:
-            logger.error(f"Failed to get minute K-line data: {e}")
-            return []
+    def _get_minute_indicators(stock_code: str, count: int = MINUTE_KLINE_COUNT) -> Dict[str, Any]:
+        """Get the indicator snapshot computed over minute K-line history"""
+        # Served from the local bar store, which only downloads bars it does not have
+        bars = bar_store.tail(stock_code, "1min", count=count)
+        if bars.empty:
+            raise ValueError("minute K-line unavailable")
+        return indicator_snapshot(bars)
 
     @staticmethod
-    def _get_capital_flow(stock_code: str) -> Dict[str, Any]:
+    async def _get_capital_flow(stock_code: str) -> Dict[str, Any]:
         """Get stock capital flow data"""
-        try:
-            return get_stock_capital_flow(stock_code=stock_code)
-        except Exception as e:
-            logger.error(f"Failed to get capital flow data: {e}")
-            return {}
+        result = await get_stock_capital_flow(stock_code=stock_code)
+        if not result.get("success"):
+            raise ValueError(result.get("message", "capital flow unavailable"))
+        return result
 
 
 if __name__ == "__main__":
@@ -275,12 +238,10 @@ if __name__ == "__main__":
         print(f"Stock Code: {output['stock_code']}")
 
         # Check if each data item was successfully retrieved
-        for key in ["realtime_quotes", "daily_kline", "minute_kline", "capital_flow"]:
+        for key in ["realtime_quotes", "daily_indicators", "minute_indicators", "capital_flow"]:
             if key in output:
-                item_count = 0
-                if isinstance(output[key], list):
-                    item_count = len(output[key])
-                    status = f"Retrieved ({item_count} items)"
+                if isinstance(output[key], dict) and "bars" in output[key]:
+                    status = f"Retrieved ({output[key]['bars']} bars)"
                 else:
                     status = "Retrieved" if output[key] else "Not Retrieved"
                 print(f"- {key}: {status}")
@@ -0,0 +1,548 @@
+"""
+分层数据缓存
+内存 LRU（按估算字节数淘汰）在前，SQLite 压缩存储在后；按数据类型配置新鲜期和最长保留期，
+过期但未超过最长保留期的数据在上游失败时作为兜底返回。命中/未命中按数据类型统计。
+"""
+
+import functools
+import inspect
+import itertools
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Optional, Tuple
+
+from src.config import config
+from src.logger import logger
+from src.utils.executor import run_blocking
+from src.utils.single_flight import call_key, flights
+
+
+# 查询结果状态
+MEMORY_HIT = "memory_hit"
+DISK_HIT = "disk_hit"
+STALE = "stale"
+MISS = "miss"
+
+_FRESH = (MEMORY_HIT, DISK_HIT)
+
+# 统计项
+_METRICS = (MEMORY_HIT, DISK_HIT, "stale_hit", MISS, "eviction")
+
+# set() 未指定 ttl 时使用数据类型的默认新鲜期
+_POLICY_TTL = object()
+
+# 内存中未找到、需要查询磁盘层
+_NEED_DISK = object()
+
+# 估算容器大小时抽样的元素个数与递归深度
+_SAMPLE_ITEMS = 64
+_SAMPLE_DEPTH = 3
+_CONTAINERS = (dict, list, tuple, set, frozenset)
+
+
+class CachePolicy(NamedTuple):
+    """数据类型的缓存策略（None 表示不过期）"""
+
+    ttl: Optional[float]  # 新鲜期（秒）
+    max_age: Optional[float]  # 最长保留期（秒），超过新鲜期后仅作为失败兜底
+    disk: bool = False  # 是否写入磁盘（进程重启后仍可用）
+
+
+def _default_policies() -> Dict[str, CachePolicy]:
+    market_ttl = config.data_config.market_data_ttl
+    return {
+        # 实时行情
+        "quotes": CachePolicy(ttl=config.data_config.snapshot_interval, max_age=300),
+        # 全市场数据：龙虎榜、大单、资金流排行
+        "market": CachePolicy(ttl=market_ttl, max_age=market_ttl * 3),
+        "sectors": CachePolicy(ttl=market_ttl, max_age=market_ttl * 3),
+        "capital_flow": CachePolicy(ttl=market_ttl, max_age=market_ttl * 3),
+        # K线由本地K线存储保存，这里只统计其命中情况
+        "kline": CachePolicy(ttl=config.data_config.bar_refresh_interval, max_age=None),
+        # 个股日级数据：资金流历史、筹码分布、基本信息
+        "stock_daily": CachePolicy(ttl=1800, max_age=86400, disk=True),
+        # 财务报表按报告期缓存，是否完整由调用方指定新鲜期
+        "statements": CachePolicy(ttl=None, max_age=None, disk=True),
+        # 公告发布后内容不再变化
+        "announcements": CachePolicy(ttl=None, max_age=None, disk=True),
+    }
+
+
+class _Entry(NamedTuple):
+    value: Any
+    size: int
+    fresh_until: Optional[float]
+    usable_until: Optional[float]
+
+
+def _estimate_size(value: Any, depth: int = 0) -> int:
+    """估算对象占用的内存字节数（容器按抽样元素外推，不做序列化）"""
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage):
+        try:
+            usage = memory_usage(deep=True)
+            return int(getattr(usage, "sum", lambda: usage)())
+        except Exception:
+            pass
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+
+    try:
+        size = sys.getsizeof(value)
+    except TypeError:
+        size = 0
+    if depth >= _SAMPLE_DEPTH or not isinstance(value, _CONTAINERS):
+        return size
+    if not value:
+        return size
+
+    items = value.items() if isinstance(value, dict) else value
+    sample = list(itertools.islice(items, _SAMPLE_ITEMS))
+    sampled = sum(_estimate_size(item, depth + 1) for item in sample)
+    return size + sampled * len(value) // len(sample)
+
+
+def _expired(deadline: Optional[float], now: float) -> bool:
+    return deadline is not None and now >= deadline
+
+
+_pin_lock = threading.Lock()
+_pin_depth = 0
+
+
+@contextmanager
+def pin_cache():
+    """在上下文期间已缓存的结果视为新鲜（批量分析时使全市场数据只抓取一次）"""
+    global _pin_depth
+    with _pin_lock:
+        _pin_depth += 1
+    try:
+        yield
+    finally:
+        with _pin_lock:
+            _pin_depth -= 1
+
+
+def _is_pinned() -> bool:
+    return _pin_depth > 0
+
+
+class TieredCache:
+    """内存 LRU + SQLite 磁盘存储的两级缓存"""
+
+    def __init__(
+        self, memory_max_bytes: Optional[int] = None, db_path: Optional[Path] = None
+    ):
+        cache_config = config.cache_config
+        self.memory_max_bytes = int(
+            memory_max_bytes
+            if memory_max_bytes is not None
+            else cache_config.memory_max_mb * 1024 * 1024
+        )
+        self.db_path = Path(
+            db_path or config.workspace_root / "cache" / "data_cache.db"
+        )
+        self._policies: Optional[Dict[str, CachePolicy]] = None
+        self._memory: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._memory_bytes = 0
+        # 内存层与统计的锁只保护字典操作；SQLite 读写与序列化在锁外进行
+        self._lock = threading.RLock()
+        self._disk_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._metrics: Dict[str, Dict[str, int]] = {}
+
+    def policy(self, data_type: str) -> CachePolicy:
+        if self._policies is None:
+            policies = _default_policies()
+            for name, override in config.cache_config.policies.items():
+                base = policies.get(name, CachePolicy(ttl=None, max_age=None))
+                policies[name] = base._replace(**override)
+            self._policies = policies
+        try:
+            return self._policies[data_type]
+        except KeyError:
+            raise ValueError(f"Unknown cache data type: {data_type}")
+
+    @staticmethod
+    def _key(data_type: str, key: str) -> str:
+        return f"{data_type}:{key}"
+
+    # ---- 统计 ----
+
+    def record(self, data_type: str, event: str, count: int = 1) -> None:
+        """记录一次命中/未命中等事件"""
+        with self._lock:
+            metrics = self._metrics.setdefault(data_type, dict.fromkeys(_METRICS, 0))
+            metrics[event] += count
+
+    def stats(self) -> Dict[str, Any]:
+        """按数据类型返回命中统计，以及内存占用"""
+        with self._lock:
+            by_type = {name: dict(metrics) for name, metrics in self._metrics.items()}
+            for metrics in by_type.values():
+                hits = metrics[MEMORY_HIT] + metrics[DISK_HIT] + metrics["stale_hit"]
+                total = hits + metrics[MISS]
+                metrics["hit_rate"] = round(hits / total, 4) if total else 0.0
+            return {
+                "types": by_type,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_max_bytes": self.memory_max_bytes,
+            }
+
+    def summary(self) -> str:
+        """单行命中统计，用于日志"""
+        stats = self.stats()
+        parts = [
+            f"{name} {m[MEMORY_HIT] + m[DISK_HIT]}命中/{m[MISS]}未命中"
+            + (f"/{m['stale_hit']}兜底" if m["stale_hit"] else "")
+            for name, m in sorted(stats["types"].items())
+        ]
+        memory_mb = stats["memory_bytes"] / 1024 / 1024
+        return f"{'，'.join(parts) or '无缓存访问'}（内存 {memory_mb:.1f}MB）"
+
+    # ---- 内存层 ----
+
+    def _memory_put(self, full_key: str, entry: _Entry) -> None:
+        old = self._memory.pop(full_key, None)
+        if old is not None:
+            self._memory_bytes -= old.size
+        if entry.size > self.memory_max_bytes:
+            return
+        self._memory[full_key] = entry
+        self._memory_bytes += entry.size
+        while self._memory_bytes > self.memory_max_bytes:
+            evicted_key, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.size
+            self.record(evicted_key.split(":", 1)[0], "eviction")
+
+    def _memory_drop(self, full_key: str) -> None:
+        old = self._memory.pop(full_key, None)
+        if old is not None:
+            self._memory_bytes -= old.size
+
+    # ---- 磁盘层 ----
+
+    def _connect(self) -> sqlite3.Connection:
+        """调用方需持有 _disk_lock"""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entry ("
+                "key TEXT PRIMARY KEY, fresh_until REAL, usable_until REAL, "
+                "value BLOB NOT NULL)"
+            )
+            conn.execute(
+                "DELETE FROM cache_entry WHERE usable_until IS NOT NULL AND usable_until < ?",
+                (time.time(),),
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _disk_get(self, full_key: str) -> Optional[_Entry]:
+        try:
+            with self._disk_lock:
+                row = (
+                    self._connect()
+                    .execute(
+                        "SELECT fresh_until, usable_until, value FROM cache_entry WHERE key = ?",
+                        (full_key,),
+                    )
+                    .fetchone()
+                )
+            if row is None:
+                return None
+            fresh_until, usable_until, blob = row
+            value = pickle.loads(zlib.decompress(blob))
+            return _Entry(value, _estimate_size(value), fresh_until, usable_until)
+        except Exception as e:
+            logger.warning(f"读取磁盘缓存失败 {full_key}: {e}")
+            return None
+
+    def _disk_put(self, full_key: str, entry: _Entry) -> None:
+        try:
+            blob = zlib.compress(
+                pickle.dumps(entry.value, protocol=pickle.HIGHEST_PROTOCOL)
+            )
+            with self._disk_lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entry (key, fresh_until, usable_until, value) "
+                    "VALUES (?, ?, ?, ?)",
+                    (
+                        full_key,
+                        entry.fresh_until,
+                        entry.usable_until,
+                        sqlite3.Binary(blob),
+                    ),
+                )
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"写入磁盘缓存失败 {full_key}: {e}")
+
+    def _disk_delete(self, full_key: Optional[str] = None, prefix: str = "") -> None:
+        try:
+            with self._disk_lock:
+                conn = self._connect()
+                if full_key is not None:
+                    conn.execute("DELETE FROM cache_entry WHERE key = ?", (full_key,))
+                else:
+                    conn.execute(
+                        "DELETE FROM cache_entry WHERE substr(key, 1, ?) = ?",
+                        (len(prefix), prefix),
+                    )
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"删除磁盘缓存失败: {e}")
+
+    # ---- 读写 ----
+
+    @staticmethod
+    def _classify(status: str, entry: _Entry, now: float) -> Tuple[str, Any]:
+        if _is_pinned() or not _expired(entry.fresh_until, now):
+            return status, entry.value
+        return STALE, entry.value
+
+    def _lookup_memory(self, data_type: str, key: str) -> Tuple[Any, Any]:
+        """只查询内存层；未找到且数据类型落盘时返回 (_NEED_DISK, None)"""
+        policy = self.policy(data_type)
+        full_key = self._key(data_type, key)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(full_key)
+            if entry is not None:
+                if _expired(entry.usable_until, now):
+                    # 磁盘中的副本同样已过期，由磁盘层查询时删除
+                    self._memory_drop(full_key)
+                    entry = None
+                else:
+                    self._memory.move_to_end(full_key)
+        if entry is not None:
+            return self._classify(MEMORY_HIT, entry, now)
+        return (_NEED_DISK, None) if policy.disk else (MISS, None)
+
+    def _lookup_disk(self, data_type: str, key: str) -> Tuple[str, Any]:
+        """查询磁盘层（阻塞），命中后写回内存层"""
+        full_key = self._key(data_type, key)
+        entry = self._disk_get(full_key)
+        if entry is None:
+            return MISS, None
+        now = time.time()
+        if _expired(entry.usable_until, now):
+            self._disk_delete(full_key)
+            return MISS, None
+        with self._lock:
+            if full_key not in self._memory:
+                self._memory_put(full_key, entry)
+        return self._classify(DISK_HIT, entry, now)
+
+    def lookup(self, data_type: str, key: str) -> Tuple[str, Any]:
+        """
+        查询缓存（不计入统计，磁盘层在当前线程中读取）
+
+        Returns:
+            tuple: (状态, 值)，状态为 MEMORY_HIT / DISK_HIT / STALE / MISS
+        """
+        status, value = self._lookup_memory(data_type, key)
+        if status is _NEED_DISK:
+            return self._lookup_disk(data_type, key)
+        return status, value
+
+    async def alookup(self, data_type: str, key: str) -> Tuple[str, Any]:
+        """lookup 的协程版本：磁盘层在阻塞调用线程池中读取，不阻塞事件循环"""
+        status, value = self._lookup_memory(data_type, key)
+        if status is _NEED_DISK:
+            return await run_blocking(self._lookup_disk, data_type, key)
+        return status, value
+
+    def _count(self, data_type: str, status: str, value: Any, default: Any) -> Any:
+        if status in _FRESH:
+            self.record(data_type, status)
+            return value
+        self.record(data_type, MISS)
+        return default
+
+    def get(self, data_type: str, key: str, default: Any = None) -> Any:
+        """读取新鲜的缓存值并计入统计，未命中或已过期时返回 default"""
+        return self._count(data_type, *self.lookup(data_type, key), default)
+
+    async def aget(self, data_type: str, key: str, default: Any = None) -> Any:
+        """get 的协程版本"""
+        return self._count(data_type, *(await self.alookup(data_type, key)), default)
+
+    def _set_memory(
+        self, data_type: str, key: str, value: Any, ttl: Any
+    ) -> Tuple[str, _Entry, bool]:
+        """写入内存层，返回 (完整键, 条目, 是否需要落盘)"""
+        policy = self.policy(data_type)
+        ttl = policy.ttl if ttl is _POLICY_TTL else ttl
+        now = time.time()
+        fresh_until = None if ttl is None else now + ttl
+        usable_until = None if policy.max_age is None else now + policy.max_age
+        if fresh_until is not None and usable_until is not None:
+            usable_until = max(usable_until, fresh_until)
+        elif fresh_until is None:
+            usable_until = None
+
+        entry = _Entry(value, _estimate_size(value), fresh_until, usable_until)
+        full_key = self._key(data_type, key)
+        with self._lock:
+            self._memory_put(full_key, entry)
+        return full_key, entry, policy.disk
+
+    def set(self, data_type: str, key: str, value: Any, ttl: Any = _POLICY_TTL) -> None:
+        """
+        写入缓存（磁盘层在当前线程中写入）
+
+        Args:
+            ttl: 本条目的新鲜期（秒，None 为不过期），默认使用数据类型的策略
+        """
+        full_key, entry, disk = self._set_memory(data_type, key, value, ttl)
+        if disk:
+            self._disk_put(full_key, entry)
+
+    async def aset(
+        self, data_type: str, key: str, value: Any, ttl: Any = _POLICY_TTL
+    ) -> None:
+        """set 的协程版本：磁盘层在阻塞调用线程池中写入"""
+        full_key, entry, disk = self._set_memory(data_type, key, value, ttl)
+        if disk:
+            await run_blocking(self._disk_put, full_key, entry)
+
+    def delete(self, data_type: str, key: str) -> None:
+        full_key = self._key(data_type, key)
+        with self._lock:
+            self._memory_drop(full_key)
+        if self.policy(data_type).disk:
+            self._disk_delete(full_key)
+
+    def clear(self, data_type: Optional[str] = None, prefix: str = "") -> None:
+        """清空某一数据类型（默认全部）中键以 prefix 开头的缓存"""
+        full_prefix = "" if data_type is None else self._key(data_type, prefix)
+        with self._lock:
+            for full_key in list(self._memory):
+                if full_key.startswith(full_prefix):
+                    self._memory_drop(full_key)
+        if data_type is None or self.policy(data_type).disk:
+            self._disk_delete(prefix=full_prefix)
+
+
+# 全局数据缓存实例
+data_cache = TieredCache()
+
+
+def cached(
+    data_type: str,
+    cache_if: Callable[[Any], bool] = lambda v: v is not None,
+    skip_args: int = 0,
+    normalize: Optional[Mapping[str, Callable[[Any], Any]]] = None,
+):
+    """
+    缓存函数结果的装饰器（同时支持普通函数与协程函数）
+
+    未命中时同一参数的并发调用合并为一次上游请求（见 single_flight）；cache_if 返回 False
+    的结果（如失败结果）不会被缓存。上游抛出异常或返回失败结果时，若有过期但未超过最长
+    保留期的缓存，则返回该缓存。
+
+    Args:
+        data_type: 数据类型，决定新鲜期、最长保留期和是否落盘
+        cache_if: 判断结果是否可缓存的函数
+        skip_args: 生成缓存键时跳过的前置位置参数个数（如方法的 self）
+        normalize: 参数名 -> 规范化函数，规范化后相同的参数共享缓存
+    """
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        def _key(args: Tuple, kwargs: Dict[str, Any]) -> str:
+            return f"{name}{call_key(func, args, kwargs, skip_args, normalize)!r}"
+
+        def _fresh(key: str):
+            status, value = data_cache.lookup(data_type, key)
+            if status in _FRESH:
+                data_cache.record(data_type, status)
+            return status, value
+
+        def _complete(key: str, status: str, stale: Any, value: Any):
+            if cache_if(value):
+                data_cache.set(data_type, key, value)
+                return value
+            if status == STALE:
+                data_cache.record(data_type, "stale_hit")
+                return stale
+            return value
+
+        def _fallback(key: str, status: str, stale: Any, error: Exception):
+            if status != STALE:
+                raise error
+            logger.warning(f"{name} 获取失败，使用过期缓存: {error}")
+            data_cache.record(data_type, "stale_hit")
+            return stale
+
+        def cache_clear():
+            data_cache.clear(data_type, prefix=name)
+
+        if inspect.iscoroutinefunction(func):
+
+            async def _afresh(key: str):
+                status, value = await data_cache.alookup(data_type, key)
+                if status in _FRESH:
+                    data_cache.record(data_type, status)
+                return status, value
+
+            async def _load(key: str, status: str, stale: Any, args, kwargs):
+                data_cache.record(data_type, MISS)
+                try:
+                    value = await func(*args, **kwargs)
+                except Exception as e:
+                    return _fallback(key, status, stale, e)
+                if cache_if(value):
+                    await data_cache.aset(data_type, key, value)
+                    return value
+                return _complete(key, status, stale, value)
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = _key(args, kwargs)
+                status, value = await _afresh(key)
+                if status in _FRESH:
+                    return value
+                return await flights.do(
+                    (name, key), lambda: _load(key, status, value, args, kwargs)
+                )
+
+            async_wrapper.cache_clear = cache_clear
+            return async_wrapper
+
+        def _load_sync(key: str, status: str, stale: Any, args, kwargs):
+            data_cache.record(data_type, MISS)
+            try:
+                value = func(*args, **kwargs)
+            except Exception as e:
+                return _fallback(key, status, stale, e)
+            return _complete(key, status, stale, value)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = _key(args, kwargs)
+            status, value = _fresh(key)
+            if status in _FRESH:
+                return value
+            return flights.do_sync(
+                (name, key), lambda: _load_sync(key, status, value, args, kwargs)
+            )
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
@@ -0,0 +1,122 @@
+"""
+分析阶段检查点
+按 股票代码 + 交易日 + 配置哈希 持久化研究结果与辩论结果，
+使调整辩论轮次或重新生成报告时无需重新执行研究阶段。
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.config import config
+from src.logger import logger
+from src.tool.base import get_recent_trading_day
+
+
+# 检查点格式版本，格式不兼容时递增，旧版本检查点将被忽略
+CHECKPOINT_VERSION = 1
+
+# 分析阶段（按执行顺序）
+PHASES = ("research", "battle", "report")
+
+
+def config_hash(params: Dict[str, Any]) -> str:
+    """计算阶段配置的短哈希"""
+    payload = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+class PhaseCheckpointStore:
+    """阶段检查点存储"""
+
+    def __init__(self, base_dir: Optional[Path] = None):
+        self.base_dir = Path(base_dir or config.workspace_root / "checkpoints")
+
+    def get_path(self, phase: str, stock_code: str, trading_day: str, params: Dict[str, Any]) -> Path:
+        """获取检查点文件路径"""
+        day = trading_day.replace("-", "")
+        return self.base_dir / f"{stock_code}_{day}_{phase}_{config_hash(params)}.json"
+
+    def save(
+        self,
+        phase: str,
+        stock_code: str,
+        data: Dict[str, Any],
+        params: Dict[str, Any],
+        trading_day: Optional[str] = None,
+    ) -> Optional[Path]:
+        """
+        保存阶段结果
+
+        Args:
+            phase: 阶段名称（research / battle）
+            stock_code: 股票代码
+            data: 阶段结果
+            params: 影响该阶段结果的配置，用于计算哈希
+            trading_day: 交易日，默认最近交易日
+
+        Returns:
+            Path: 检查点文件路径，保存失败时返回 None
+        """
+        trading_day = trading_day or get_recent_trading_day()
+        path = self.get_path(phase, stock_code, trading_day, params)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            payload = {
+                "version": CHECKPOINT_VERSION,
+                "phase": phase,
+                "stock_code": stock_code,
+                "trading_day": trading_day,
+                "config_hash": config_hash(params),
+                "params": params,
+                "created_at": datetime.now().isoformat(),
+                "data": data,
+            }
+            # 先写临时文件再替换，避免中断时留下不完整的检查点
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, indent=2, default=str)
+            tmp_path.replace(path)
+            logger.info(f"保存{phase}检查点成功: {path}")
+            return path
+        except Exception as e:
+            logger.error(f"保存{phase}检查点失败: {str(e)}")
+            return None
+
+    def load(
+        self,
+        phase: str,
+        stock_code: str,
+        params: Dict[str, Any],
+        trading_day: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        加载阶段结果
+
+        Returns:
+            dict: 阶段结果；不存在、版本不符或读取失败时返回 None
+        """
+        trading_day = trading_day or get_recent_trading_day()
+        path = self.get_path(phase, stock_code, trading_day, params)
+        if not path.exists():
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except Exception as e:
+            logger.warning(f"读取{phase}检查点失败: {path}, {str(e)}")
+            return None
+
+        if payload.get("version") != CHECKPOINT_VERSION:
+            logger.warning(f"忽略版本不兼容的{phase}检查点: {path}")
+            return None
+
+        logger.info(f"加载{phase}检查点: {path}")
+        return payload.get("data")
+
+
+# 全局检查点存储实例
+checkpoint_store = PhaseCheckpointStore()
@@ -0,0 +1,49 @@
+"""
+阻塞调用执行器
+akshare / efinance 等同步数据接口在专用的有界线程池中执行，不阻塞事件循环；
+与 asyncio 默认线程池分开，慢接口排队时不影响文件写入等短任务。
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from src.config import config
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=config.data_config.blocking_workers,
+                thread_name_prefix="blocking-io",
+            )
+        return _executor
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    在专用线程池中执行阻塞调用（保留当前上下文变量）
+
+    线程池已满时调用在队列中等待，事件循环不受影响。
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    return await loop.run_in_executor(_get_executor(), call)
+
+
+def shutdown_blocking_executor(wait: bool = False) -> None:
+    """关闭线程池（下次调用时重新创建）"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
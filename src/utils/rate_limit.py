@@ -0,0 +1,69 @@
+"""
+上游主机限流器
+按主机维护最小请求间隔，替代各专家之间固定的 sleep 等待。
+同时支持协程（acquire）与线程（acquire_sync）两种调用方式。
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from src.config import config
+
+
+# 常用上游主机
+EASTMONEY_PUSH = "push2.eastmoney.com"
+EASTMONEY_HIS = "push2his.eastmoney.com"
+EASTMONEY_DATA = "datacenter-web.eastmoney.com"
+THS_DATA = "data.10jqka.com.cn"
+THS_BASIC = "basic.10jqka.com.cn"
+
+
+class HostRateLimiter:
+    """按上游主机限流：同一主机的两次请求之间至少间隔 min_interval 秒"""
+
+    def __init__(
+        self, default_interval: float = 0.3, intervals: Optional[Dict[str, float]] = None
+    ):
+        self.default_interval = default_interval
+        self.intervals = dict(intervals or {})
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_of(target: str) -> str:
+        """从URL或主机名中提取主机"""
+        if "://" in target:
+            return urlparse(target).netloc
+        return target
+
+    def _reserve(self, target: str) -> float:
+        """为本次请求预留时间槽，返回需要等待的秒数"""
+        host = self.host_of(target)
+        interval = self.intervals.get(host, self.default_interval)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + interval
+        return slot - now
+
+    async def acquire(self, target: str) -> None:
+        """协程中等待直到可以向目标主机发起请求"""
+        delay = self._reserve(target)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_sync(self, target: str) -> None:
+        """线程中等待直到可以向目标主机发起请求"""
+        delay = self._reserve(target)
+        if delay > 0:
+            time.sleep(delay)
+
+
+# 全局限流器实例
+host_limiter = HostRateLimiter(
+    default_interval=config.research_config.host_min_interval,
+    intervals=config.research_config.host_intervals,
+)
@@ -0,0 +1,179 @@
+"""
+请求合并（single-flight）
+同一 (接口, 规范化参数) 的并发请求共享同一个进行中的调用，结果（或异常）分发给所有等待方；
+调用结束后立即移除，不做任何结果缓存。
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, Optional, Tuple
+
+
+def freeze(value: Any) -> Hashable:
+    """将列表、字典等参数转换为可哈希的形式"""
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), freeze(v)) for k, v in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(item) for item in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def call_key(
+    func: Callable,
+    args: Tuple,
+    kwargs: Dict[str, Any],
+    skip_args: int = 0,
+    normalize: Optional[Mapping[str, Callable[[Any], Any]]] = None,
+) -> Tuple[Tuple[str, Any], ...]:
+    """
+    按函数签名规范化调用参数（位置/关键字写法和默认值不影响结果）
+
+    Args:
+        skip_args: 跳过的前置位置参数个数（如方法的 self）
+        normalize: 参数名 -> 规范化函数（如去掉股票代码的交易所前缀）
+    """
+    try:
+        bound = inspect.signature(func).bind(*args, **kwargs)
+        bound.apply_defaults()
+        items = list(bound.arguments.items())[skip_args:]
+    except (TypeError, ValueError):
+        items = [(str(i), arg) for i, arg in enumerate(args[skip_args:])]
+        items += sorted(kwargs.items())
+
+    normalize = normalize or {}
+    return tuple(
+        (
+            name,
+            freeze(
+                normalize[name](value) if name in normalize and value is not None else value
+            ),
+        )
+        for name, value in items
+    )
+
+
+class SingleFlight:
+    """进行中的调用表，按键合并并发请求（协程与线程各一张表）"""
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._tasks: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Task] = {}
+        self._futures: Dict[Hashable, concurrent.futures.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _record(self, key: Hashable, leader: bool) -> None:
+        endpoint = str(key[0] if isinstance(key, tuple) and key else key)
+        stats = self._stats.setdefault(endpoint, {"calls": 0, "shared": 0})
+        stats["calls" if leader else "shared"] += 1
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """按接口返回实际调用次数和合并的请求数"""
+        with self._guard:
+            return {endpoint: dict(stats) for endpoint, stats in self._stats.items()}
+
+    def summary(self) -> str:
+        """单行合并统计，用于日志"""
+        stats = self.stats().values()
+        calls = sum(item["calls"] for item in stats)
+        shared = sum(item["shared"] for item in stats)
+        return f"实际请求 {calls} 次，合并重复请求 {shared} 次"
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行协程调用，同一事件循环中相同 key 的并发调用共享结果
+
+        调用在独立任务中执行，某个等待方被取消不会影响其他等待方。
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        with self._guard:
+            task = self._tasks.get(flight_key)
+            leader = task is None
+            if leader:
+                task = loop.create_task(fn())
+                self._tasks[flight_key] = task
+                task.add_done_callback(lambda _: self._forget_task(flight_key, task))
+            self._record(key, leader)
+        return await asyncio.shield(task)
+
+    def _forget_task(self, flight_key, task: asyncio.Task) -> None:
+        with self._guard:
+            if self._tasks.get(flight_key) is task:
+                del self._tasks[flight_key]
+        # 所有等待方都已取消时避免 "exception was never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+    def do_sync(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """执行同步调用，相同 key 的并发调用（其他线程）等待第一个调用并共享结果"""
+        with self._guard:
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._futures[key] = future
+            self._record(key, leader)
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._guard:
+                self._futures.pop(key, None)
+
+
+# 全局请求合并实例
+flights = SingleFlight()
+
+
+def single_flight(
+    endpoint: Optional[str] = None,
+    skip_args: int = 0,
+    normalize: Optional[Mapping[str, Callable[[Any], Any]]] = None,
+):
+    """
+    请求合并装饰器（同时支持普通函数与协程函数）
+
+    Args:
+        endpoint: 接口名，默认使用函数的完整名称
+        skip_args: 生成键时跳过的前置位置参数个数（如方法的 self）
+        normalize: 参数名 -> 规范化函数
+    """
+
+    def decorator(func):
+        name = endpoint or f"{func.__module__}.{func.__qualname__}"
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = (name, call_key(func, args, kwargs, skip_args, normalize))
+                return await flights.do(key, lambda: func(*args, **kwargs))
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (name, call_key(func, args, kwargs, skip_args, normalize))
+            return flights.do_sync(key, lambda: func(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+
+# 以仓库根目录为导入根，使测试可以 `import src...`
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
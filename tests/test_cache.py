@@ -0,0 +1,164 @@
+import pytest
+
+import src.utils.cache as cache_module
+from src.utils.cache import (
+    DISK_HIT,
+    MEMORY_HIT,
+    MISS,
+    STALE,
+    CachePolicy,
+    TieredCache,
+    cached,
+    pin_cache,
+)
+
+
+POLICIES = {
+    "fresh": CachePolicy(ttl=60, max_age=120),
+    # ttl=0：写入后立即过期，但在最长保留期内可作为兜底
+    "stale": CachePolicy(ttl=0, max_age=3600),
+    # 写入后立即超过最长保留期
+    "expired": CachePolicy(ttl=0, max_age=0),
+    "disk": CachePolicy(ttl=60, max_age=120, disk=True),
+}
+
+# 每个值约 433 字节，内存层只能容纳两个
+BLOB = b"x" * 400
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = TieredCache(memory_max_bytes=1000, db_path=tmp_path / "cache.db")
+    cache._policies = dict(POLICIES)
+    monkeypatch.setattr(cache_module, "data_cache", cache)
+    return cache
+
+
+def _counting(result):
+    """返回被调用次数可查询的加载函数"""
+    calls = []
+
+    def load(code):
+        calls.append(code)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return load, calls
+
+
+def test_eviction_drops_least_recently_used(cache):
+    cache.set("fresh", "a", BLOB)
+    cache.set("fresh", "b", BLOB)
+    # 访问 a 后 b 成为最久未使用的条目
+    assert cache.lookup("fresh", "a") == (MEMORY_HIT, BLOB)
+
+    cache.set("fresh", "c", BLOB)
+
+    assert cache.lookup("fresh", "b") == (MISS, None)
+    assert cache.lookup("fresh", "a")[0] == MEMORY_HIT
+    assert cache.lookup("fresh", "c")[0] == MEMORY_HIT
+    stats = cache.stats()
+    assert stats["types"]["fresh"]["eviction"] == 1
+    assert stats["memory_bytes"] <= cache.memory_max_bytes
+
+
+def test_oversized_value_is_not_kept_in_memory(cache):
+    cache.set("fresh", "big", b"x" * 2000)
+
+    assert cache.lookup("fresh", "big") == (MISS, None)
+    assert cache.stats()["memory_bytes"] == 0
+
+
+def test_stale_entry_served_when_loader_raises(cache):
+    results = iter([{"price": 1.0}, RuntimeError("upstream down")])
+
+    @cached("stale")
+    def load(code):
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    assert load("600519") == {"price": 1.0}
+    assert load("600519") == {"price": 1.0}
+    assert cache.stats()["types"]["stale"]["stale_hit"] == 1
+
+
+def test_loader_error_without_stale_entry_is_raised(cache):
+    load, calls = _counting(RuntimeError("upstream down"))
+    wrapped = cached("stale")(load)
+
+    with pytest.raises(RuntimeError):
+        wrapped("600519")
+    assert calls == ["600519"]
+
+
+def test_falsy_result_is_not_cached(cache):
+    load, calls = _counting({})
+    wrapped = cached("fresh", cache_if=bool)(load)
+
+    assert wrapped("600519") == {}
+    assert wrapped("600519") == {}
+
+    assert calls == ["600519", "600519"]
+    assert cache.stats()["memory_entries"] == 0
+    assert cache.stats()["types"]["fresh"][MISS] == 2
+
+
+def test_none_result_is_not_cached_by_default(cache):
+    load, calls = _counting(None)
+    wrapped = cached("fresh")(load)
+
+    wrapped("600519")
+    wrapped("600519")
+
+    assert len(calls) == 2
+
+
+def test_fresh_result_is_served_from_cache(cache):
+    load, calls = _counting({"price": 1.0})
+    wrapped = cached("fresh")(load)
+
+    assert wrapped("600519") == wrapped(code="600519") == {"price": 1.0}
+
+    assert calls == ["600519"]
+    assert cache.stats()["types"]["fresh"][MEMORY_HIT] == 1
+
+
+def test_pin_cache_serves_expired_entry_as_fresh(cache):
+    cache.set("stale", "k", 1)
+    assert cache.lookup("stale", "k") == (STALE, 1)
+
+    with pin_cache():
+        assert cache.lookup("stale", "k") == (MEMORY_HIT, 1)
+
+    assert cache.lookup("stale", "k") == (STALE, 1)
+
+
+def test_pin_cache_does_not_revive_entry_past_max_age(cache):
+    cache.set("expired", "k", 1)
+
+    with pin_cache():
+        assert cache.lookup("expired", "k") == (MISS, None)
+
+
+def test_disk_hit_after_memory_is_cleared(cache, tmp_path):
+    cache.set("disk", "k", {"rows": [1, 2, 3]})
+
+    # 新实例共用同一个数据库，相当于进程重启后内存层为空
+    restarted = TieredCache(memory_max_bytes=1000, db_path=tmp_path / "cache.db")
+    restarted._policies = dict(POLICIES)
+
+    assert restarted.get("disk", "k") == {"rows": [1, 2, 3]}
+    assert restarted.stats()["types"]["disk"][DISK_HIT] == 1
+    # 磁盘命中后写回内存层
+    assert restarted.lookup("disk", "k")[0] == MEMORY_HIT
+
+
+def test_clear_removes_disk_entries(cache):
+    cache.set("disk", "k", 1)
+
+    cache.clear("disk")
+
+    assert cache.lookup("disk", "k") == (MISS, None)
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tool.financial_deep_search.cyq import (
+    _daily_profiles,
+    _decay_weights,
+    _price_grid,
+    chip_distribution,
+    compute_cyq,
+)
+
+
+def _bars(rows):
+    """rows: (开盘, 收盘, 最高, 最低, 换手率%)"""
+    frame = pd.DataFrame(rows, columns=["开盘", "收盘", "最高", "最低", "换手率"])
+    frame.insert(0, "日期", [f"2024-01-{day:02d}" for day in range(1, len(rows) + 1)])
+    return frame
+
+
+def test_daily_profiles_sum_to_one():
+    low = np.array([10.0, 10.5, 11.0, 9.8])
+    high = np.array([12.0, 11.5, 11.0, 10.6])
+    avg = np.array([11.2, 11.0, 11.0, 10.1])
+    grid = _price_grid(low, high, 50)
+
+    profiles = _daily_profiles(low, high, avg, grid)
+
+    assert profiles.shape == (4, 50)
+    assert np.allclose(profiles.sum(axis=1), 1.0)
+    assert (profiles >= 0).all()
+    # 有价格区间的交易日，筹码只落在当日最低价与最高价之间
+    # （一字板落在最接近的档位，见 test_single_price_day_goes_to_nearest_bin）
+    for day in np.flatnonzero(high > low):
+        outside = (grid < low[day] - 1e-9) | (grid > high[day] + 1e-9)
+        assert profiles[day, outside].sum() == 0
+
+
+def test_single_price_day_goes_to_nearest_bin():
+    low = np.array([10.0, 11.03])
+    high = np.array([12.0, 11.03])
+    avg = np.array([11.0, 11.03])
+    grid = _price_grid(low, high, 30)
+
+    profiles = _daily_profiles(low, high, avg, grid)
+
+    assert profiles[1].sum() == pytest.approx(1.0)
+    assert profiles[1].argmax() == np.abs(grid - 11.03).argmin()
+    assert np.count_nonzero(profiles[1]) == 1
+
+
+def test_decay_weights_match_turnover_product():
+    turnover = np.array([0.1, 0.2, 0.5, 0.05, 0.3])
+    targets = np.arange(len(turnover))
+
+    weights = _decay_weights(turnover, targets)
+
+    expected = np.zeros((len(targets), len(turnover)))
+    for k in targets:
+        for i in range(k + 1):
+            expected[k, i] = turnover[i] * np.prod(1 - turnover[i + 1 : k + 1])
+    assert np.allclose(weights, expected)
+    # 手算：第 3 日（下标 2）收盘后首日筹码剩余 0.1 * 0.8 * 0.5
+    assert weights[2, 0] == pytest.approx(0.04)
+
+
+def test_profit_ratio_zero_at_bottom_of_range():
+    bars = _bars(
+        [
+            (11.0, 11.5, 12.0, 10.0, 5.0),
+            (11.5, 11.8, 12.5, 11.0, 4.0),
+            (11.8, 11.2, 12.0, 10.8, 6.0),
+            (9.5, 9.0, 9.5, 9.0, 8.0),
+        ]
+    )
+
+    metrics, _ = compute_cyq(bars, days=1)
+
+    assert metrics["获利比例"].iloc[-1] == pytest.approx(0.0, abs=1e-4)
+
+
+def test_profit_ratio_one_at_top_of_range():
+    bars = _bars(
+        [
+            (11.0, 11.5, 12.0, 10.0, 5.0),
+            (11.5, 11.8, 12.5, 11.0, 4.0),
+            (11.8, 11.2, 12.0, 10.8, 6.0),
+            (12.5, 13.0, 13.0, 12.5, 8.0),
+        ]
+    )
+
+    metrics, _ = compute_cyq(bars, days=1)
+
+    assert metrics["获利比例"].iloc[-1] == pytest.approx(1.0, abs=1e-4)
+
+
+def test_limit_locked_day_in_history():
+    bars = _bars(
+        [
+            (10.0, 10.5, 10.8, 9.9, 3.0),
+            (11.55, 11.55, 11.55, 11.55, 0.8),  # 一字涨停
+            (11.6, 12.0, 12.3, 11.4, 6.0),
+        ]
+    )
+
+    recent, grid, distributions = chip_distribution(bars, days=3, bins=40)
+
+    assert len(recent) == 3
+    assert np.isfinite(distributions).all()
+    assert np.allclose(distributions.sum(axis=1), 1.0)
+    # 一字板当日收盘后新增筹码集中在涨停价附近
+    locked_bin = np.abs(grid - 11.55).argmin()
+    assert distributions[1, locked_bin] > distributions[0, locked_bin]
+
+    metrics, profile = compute_cyq(bars, days=3)
+    assert metrics.notna().all().all()
+    assert sum(item["筹码占比"] for item in profile) <= 100.01
+
+
+def test_all_limit_locked_history():
+    bars = _bars([(10.0, 10.0, 10.0, 10.0, 1.0), (11.0, 11.0, 11.0, 11.0, 0.5)])
+
+    metrics, _ = compute_cyq(bars, days=2)
+
+    assert metrics.notna().all().all()
+    assert metrics["获利比例"].iloc[-1] == pytest.approx(1.0, abs=1e-4)
+
+
+def test_metric_columns_match_stock_cyq_em():
+    bars = _bars([(10.0, 10.5, 10.8, 9.9, 3.0), (10.5, 10.2, 10.6, 10.0, 2.0)])
+
+    metrics, _ = compute_cyq(bars, days=2)
+
+    assert list(metrics.columns) == [
+        "日期",
+        "获利比例",
+        "平均成本",
+        "90成本-低",
+        "90成本-高",
+        "90集中度",
+        "70成本-低",
+        "70成本-高",
+        "70集中度",
+    ]
+    assert ((metrics["获利比例"] >= 0) & (metrics["获利比例"] <= 1)).all()
+    assert (metrics["90成本-低"] <= metrics["70成本-低"]).all()
+    assert (metrics["70成本-高"] <= metrics["90成本-高"]).all()
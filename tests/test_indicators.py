@@ -0,0 +1,166 @@
+import math
+import statistics
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tool.financial_deep_search.indicators import (
+    compute_indicators,
+    indicator_snapshot,
+)
+
+
+# fmt: off
+CLOSES = [
+    10.00, 10.20, 10.10, 10.40, 10.60, 10.50, 10.80, 11.00, 10.90, 11.30,
+    11.20, 11.50, 11.40, 11.10, 11.60, 11.80, 11.70, 12.00, 12.20, 11.90,
+    12.30, 12.10, 12.50, 12.40, 12.80, 12.60, 12.90, 13.10, 12.70, 13.00,
+    13.20, 12.90, 13.40, 13.30, 13.60,
+]
+# fmt: on
+
+
+def _bars(closes):
+    closes = np.asarray(closes, dtype=float)
+    offsets = np.linspace(0.05, 0.25, len(closes))
+    return pd.DataFrame(
+        {
+            "日期": [
+                f"2024-{1 + i // 28:02d}-{1 + i % 28:02d}" for i in range(len(closes))
+            ],
+            "开盘": closes - 0.05,
+            "收盘": closes,
+            "最高": closes + offsets,
+            "最低": closes - offsets[::-1],
+            "成交量": 1000 + 10 * np.arange(len(closes)),
+        }
+    )
+
+
+# ---- 通达信公式的逐根递推实现，作为参照 ----
+
+
+def _tdx_ema(values, n):
+    out, prev = [], None
+    for x in values:
+        prev = x if prev is None else (2 * x + (n - 1) * prev) / (n + 1)
+        out.append(prev)
+    return out
+
+
+def _tdx_sma(values, n, m=1):
+    out, prev = [], None
+    for x in values:
+        prev = x if prev is None else (m * x + (n - m) * prev) / n
+        out.append(prev)
+    return out
+
+
+def test_ma_matches_reference():
+    frame = compute_indicators(_bars(CLOSES))
+
+    for window in (5, 10, 20):
+        for i in range(len(CLOSES)):
+            value = frame[f"MA{window}"].iloc[i]
+            if i < window - 1:
+                assert math.isnan(value)
+            else:
+                assert value == pytest.approx(
+                    sum(CLOSES[i - window + 1 : i + 1]) / window
+                )
+    # 手算：前 5 日收盘均值
+    assert frame["MA5"].iloc[4] == pytest.approx(10.26)
+
+
+def test_macd_matches_reference():
+    frame = compute_indicators(_bars(CLOSES))
+
+    dif = [a - b for a, b in zip(_tdx_ema(CLOSES, 12), _tdx_ema(CLOSES, 26))]
+    dea = _tdx_ema(dif, 9)
+    assert np.allclose(frame["DIF"], dif)
+    assert np.allclose(frame["DEA"], dea)
+    assert np.allclose(frame["MACD"], [2 * (a - b) for a, b in zip(dif, dea)])
+    # 手算：第二根K线 DIF = EMA12 - EMA26 = 10.2*2/13 + 10*11/13 - (10.2*2/27 + 10*25/27)
+    assert frame["DIF"].iloc[1] == pytest.approx(0.4 / 13 - 0.4 / 27)
+
+
+def test_rsi6_matches_reference():
+    frame = compute_indicators(_bars(CLOSES))
+
+    changes = [b - a for a, b in zip(CLOSES, CLOSES[1:])]
+    gains = _tdx_sma([max(c, 0) for c in changes], 6)
+    moves = _tdx_sma([abs(c) for c in changes], 6)
+    expected = [None] + [g / m * 100 for g, m in zip(gains, moves)]
+    for i in range(6, len(CLOSES)):
+        assert frame["RSI6"].iloc[i] == pytest.approx(expected[i])
+    assert frame["RSI6"].iloc[:6].isna().all()
+
+
+def test_rsi_of_rising_series_is_100():
+    frame = compute_indicators(_bars([10 + 0.1 * i for i in range(30)]))
+
+    assert frame["RSI6"].iloc[-1] == pytest.approx(100.0)
+
+
+def test_kdj_matches_reference():
+    bars = _bars(CLOSES)
+    frame = compute_indicators(bars)
+
+    highs, lows = bars["最高"].tolist(), bars["最低"].tolist()
+    k = d = 50.0
+    for i in range(8, len(CLOSES)):
+        lowest, highest = min(lows[i - 8 : i + 1]), max(highs[i - 8 : i + 1])
+        rsv = (CLOSES[i] - lowest) / (highest - lowest) * 100
+        k = (rsv + 2 * k) / 3
+        d = (k + 2 * d) / 3
+        assert frame["K"].iloc[i] == pytest.approx(k)
+        assert frame["D"].iloc[i] == pytest.approx(d)
+        assert frame["J"].iloc[i] == pytest.approx(3 * k - 2 * d)
+    assert frame["K"].iloc[:8].isna().all()
+
+
+def test_boll_matches_reference():
+    frame = compute_indicators(_bars(CLOSES))
+
+    for i in range(19, len(CLOSES)):
+        window = CLOSES[i - 19 : i + 1]
+        mid, std = statistics.mean(window), statistics.stdev(window)
+        assert frame["BOLL_MID"].iloc[i] == pytest.approx(mid)
+        assert frame["BOLL_UP"].iloc[i] == pytest.approx(mid + 2 * std)
+        assert frame["BOLL_LOW"].iloc[i] == pytest.approx(mid - 2 * std)
+    assert frame["BOLL_MID"].iloc[:19].isna().all()
+
+
+def test_short_history_is_nan_before_warm_up():
+    frame = compute_indicators(_bars(CLOSES[:5]))
+
+    warming_up = "MA10 MA20 MA60 RSI6 RSI24 K D J BOLL_UP ATR".split()
+    for column in warming_up:
+        assert frame[column].isna().all(), column
+    assert not frame["MA5"].isna().iloc[-1]
+
+
+def test_snapshot_with_short_history_returns_none_fields():
+    snapshot = indicator_snapshot(_bars(CLOSES[:5]))
+
+    assert snapshot["bars"] == 5
+    assert snapshot["ma"]["MA5"] is not None
+    assert snapshot["ma"]["MA20"] is None
+    assert snapshot["rsi"] == {"RSI6": None, "RSI12": None, "RSI24": None}
+    assert snapshot["kdj"] == {"K": None, "D": None, "J": None}
+    assert snapshot["boll"]["UP"] is None and snapshot["boll"]["position_pct"] is None
+    assert snapshot["atr"] == {"ATR": None, "atr_pct": None}
+    assert snapshot["signals"]["ma_alignment"] == "数据不足"
+    assert snapshot["signals"]["above_ma20"] is None
+    assert snapshot["signals"]["kdj_cross"] is None
+    assert snapshot["signals"]["rsi_zone"] is None
+
+
+def test_single_bar_and_empty_history():
+    assert indicator_snapshot(_bars(CLOSES[:0])) == {}
+
+    snapshot = indicator_snapshot(_bars(CLOSES[:1]))
+    assert snapshot["close"] == 10.0
+    assert snapshot["change_pct"]["1"] is None
+    assert snapshot["macd"]["DIF"] == 0.0
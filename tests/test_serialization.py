@@ -0,0 +1,135 @@
+import json
+
+import pytest
+
+from src.tool.base import (
+    MIN_TABLE_ROWS,
+    ToolResult,
+    _round_float,
+    _shrink_table,
+    serialize_output,
+)
+from src.tool.mcp_client import MCPClientTool
+
+
+def _records(count):
+    return [
+        {"日期": f"2024-01-{i:02d}", "收盘": 10 + i / 3, "备注": None, "空": ""}
+        for i in range(1, count + 1)
+    ]
+
+
+def test_records_fold_into_columns_and_rows():
+    text = serialize_output({"code": "600519", "hist": _records(3)})
+
+    data = json.loads(text)
+    assert data["code"] == "600519"
+    assert data["hist"]["columns"] == ["日期", "收盘"]
+    assert data["hist"]["rows"] == [
+        ["2024-01-01", 10.3333],
+        ["2024-01-02", 10.6667],
+        ["2024-01-03", 11],
+    ]
+
+
+def test_single_record_and_partly_null_columns_are_kept():
+    data = json.loads(serialize_output({"one": [{"a": None}], "two": [{"a": 1}, {"a": None}]}))
+
+    assert data["one"] == [{"a": None}]
+    assert data["two"] == {"columns": ["a"], "rows": [[1], [None]]}
+
+
+def test_nan_and_inf_become_null():
+    assert serialize_output([float("nan"), float("inf"), float("-inf"), 1.0]) == "[null,null,null,1]"
+
+
+def test_round_float_keeps_significant_digits():
+    assert _round_float(1.23456789) == 1.23457
+    assert _round_float(1234567.891) == 1234568
+    assert _round_float(0.000123456789) == 0.000123457
+    assert _round_float(0.0) == 0
+
+
+def test_shrink_table_keeps_head_and_tail():
+    table = {"columns": ["i"], "rows": [[i] for i in range(20)]}
+
+    _shrink_table(table)
+    assert table["rows"] == [[0], [1], [2], [3], [4], [15], [16], [17], [18], [19]]
+    assert table["omitted_rows"] == 10
+
+    _shrink_table(table)
+    assert len(table["rows"]) == 5
+    assert table["rows"][0] == [0] and table["rows"][-1] == [19]
+    assert table["omitted_rows"] == 15
+
+
+def test_budget_halves_largest_table():
+    value = {"small": _records(6), "large": _records(40)}
+    full = serialize_output(value)
+
+    text = serialize_output(value, budget=len(full) // 2, count_tokens=len)
+
+    assert len(text) <= len(full) // 2
+    data = json.loads(text)
+    large = data["large"]
+    assert large["omitted_rows"] == 40 - len(large["rows"])
+    assert large["rows"][0][0] == "2024-01-01"
+    assert large["rows"][-1][0] == "2024-01-40"
+    # 较小的表格在最大的表格缩减前保持不变
+    assert "omitted_rows" not in data["small"]
+
+
+def test_budget_cuts_text_when_tables_cannot_shrink():
+    text = serialize_output("x" * 1000, budget=50, count_tokens=len)
+
+    assert len(text) <= 50
+    assert text.endswith("...(truncated)")
+    assert text.startswith("x")
+
+
+def test_budget_cut_after_tables_reach_minimum():
+    value = {"rows_only": _records(MIN_TABLE_ROWS), "text": "y" * 500}
+
+    text = serialize_output(value, budget=120, count_tokens=len)
+
+    assert len(text) <= 120
+    assert text.endswith("...(truncated)")
+
+
+def test_json_string_output_is_recompacted():
+    raw = json.dumps({"hist": _records(2), "note": None}, ensure_ascii=False, indent=2)
+
+    data = json.loads(serialize_output(raw))
+
+    assert data["hist"]["columns"] == ["日期", "收盘"]
+    assert data["note"] is None
+
+
+def test_tool_result_error_observation():
+    assert ToolResult(error="boom").to_observation() == "Error: boom"
+
+
+@pytest.mark.parametrize(
+    "result",
+    [
+        ToolResult(error="upstream timeout"),
+        ToolResult(output={"hist": _records(3)}, system="note"),
+    ],
+)
+def test_mcp_round_trip(result):
+    rebuilt = MCPClientTool._to_result(serialize_output(result))
+
+    assert rebuilt.error == result.error
+    assert rebuilt.system == result.system
+    if result.output is None:
+        assert rebuilt.output is None
+        assert rebuilt.to_observation() == "Error: upstream timeout"
+    else:
+        assert rebuilt.output["hist"]["columns"] == ["日期", "收盘"]
+        assert len(rebuilt.output["hist"]["rows"]) == 3
+
+
+def test_mcp_plain_text_stays_output():
+    assert MCPClientTool._to_result("done").output == "done"
+    assert MCPClientTool._to_result('{"unrelated": 1}').output == '{"unrelated": 1}'
+    assert MCPClientTool._to_result("").output == "No output returned."